@@ -340,12 +340,19 @@ export default function AssignmentDetailPage() {
 
     const [loading, setLoading] = useState(true);
     const [data, setData] = useState<any>(null);
+    // Proctor logs are paginated server-side (newest first); older pages are fetched on demand
+    const [logs, setLogs] = useState<any[]>([]);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
+    const [severityFilter, setSeverityFilter] = useState<string>('');
+    const [loadingLogs, setLoadingLogs] = useState(false);
 
     useEffect(() => {
         const fetchDetail = async () => {
             try {
                 const res = await apiClient.getAssignmentDetailRecruiter(assignmentId);
                 setData(res);
+                setLogs(res.proctor_logs || []);
+                setNextCursor(res.proctor_logs_next_cursor || null);
             } catch (error) {
                 console.error(error);
             } finally {
@@ -355,6 +362,24 @@ export default function AssignmentDetailPage() {
         fetchDetail();
     }, [assignmentId]);
 
+    const loadLogs = async (severity: string, cursor: string | null) => {
+        setLoadingLogs(true);
+        try {
+            const page = await apiClient.getAssignmentProctorLogs(assignmentId, { severity, cursor });
+            setLogs(prev => cursor ? [...prev, ...page.items] : page.items);
+            setNextCursor(page.next_cursor || null);
+        } catch (error) {
+            console.error(error);
+        } finally {
+            setLoadingLogs(false);
+        }
+    };
+
+    const changeSeverityFilter = (severity: string) => {
+        setSeverityFilter(severity);
+        loadLogs(severity, null);
+    };
+
     if (loading) {
         return (
             <div className="flex items-center justify-center h-screen">
@@ -367,7 +392,9 @@ export default function AssignmentDetailPage() {
         return <div className="p-8">Assignment not found.</div>;
     }
 
-    const { assignment, test, submissions, proctor_logs } = data;
+    const { assignment, test, submissions, proctor_summary } = data;
+    const keyViolationTypes = ['ai_api_detected', 'screen_context_violation', 'extension_detected', 'confirmed_wrong_screen_shared', 'tab_switch', 'focus_lost_while_screen_sharing'];
+    const keyViolations = Object.keys(proctor_summary?.by_type || {}).filter(t => keyViolationTypes.includes(t));
 
     // Helper to find submission for a question
     const getSubmission = (qId: string) => submissions.find((s: any) => s.question_id === qId);
@@ -419,7 +446,7 @@ export default function AssignmentDetailPage() {
                                 <CardContent className="p-4 flex items-center gap-4">
                                     <Monitor className="w-8 h-8 text-blue-500" />
                                     <div>
-                                        <div className="text-2xl font-bold">{proctor_logs.length}</div>
+                                        <div className="text-2xl font-bold">{proctor_summary?.total ?? 0}</div>
                                         <div className="text-sm text-muted-foreground">Proctor Events</div>
                                     </div>
                                 </CardContent>
@@ -439,15 +466,14 @@ export default function AssignmentDetailPage() {
                                         : 'Critical security violation detected.'
                                     }
                                 </p>
-                                {proctor_logs.length > 0 && (
+                                {keyViolations.length > 0 && (
                                     <div className="text-sm">
                                         <span className="font-medium">Key Violations: </span>
-                                        {proctor_logs
-                                            .filter((l: any) => ['ai_api_detected', 'screen_context_violation', 'extension_detected', 'confirmed_wrong_screen_shared', 'tab_switch', 'focus_lost_while_screen_sharing'].includes(l.event_type))
+                                        {keyViolations
                                             .slice(0, 3)
-                                            .map((l: any, i: number) => (
+                                            .map((eventType: string, i: number) => (
                                                 <Badge key={i} variant="outline" className="mr-1 text-xs bg-red-50 text-red-600 border-red-200">
-                                                    {l.event_type.replace(/_/g, ' ')}
+                                                    {eventType.replace(/_/g, ' ')} ×{proctor_summary.by_type[eventType]}
                                                 </Badge>
                                             ))
                                         }
@@ -538,7 +564,36 @@ export default function AssignmentDetailPage() {
                                 </CardTitle>
                             </CardHeader>
                             <CardContent>
-                                <ProctorTimeline logs={proctor_logs} />
+                                <div className="flex flex-wrap items-center gap-2 mb-4">
+                                    {['', 'critical', 'high', 'medium', 'low'].map((severity) => (
+                                        <Button
+                                            key={severity || 'all'}
+                                            size="sm"
+                                            variant={severityFilter === severity ? "default" : "outline"}
+                                            onClick={() => changeSeverityFilter(severity)}
+                                            disabled={loadingLogs}
+                                        >
+                                            {severity ? severity.charAt(0).toUpperCase() + severity.slice(1) : 'All'}
+                                            <span className="ml-1 opacity-70">
+                                                {severity ? proctor_summary?.by_severity?.[severity] ?? 0 : proctor_summary?.total ?? 0}
+                                            </span>
+                                        </Button>
+                                    ))}
+                                    {proctor_summary?.archived > 0 && (
+                                        <span className="text-xs text-muted-foreground ml-auto">
+                                            {proctor_summary.archived} older events archived (counted above, not listed)
+                                        </span>
+                                    )}
+                                </div>
+                                {nextCursor && (
+                                    <div className="flex justify-center mb-2">
+                                        <Button variant="ghost" size="sm" onClick={() => loadLogs(severityFilter, nextCursor)} disabled={loadingLogs}>
+                                            {loadingLogs ? <Loader2 className="w-4 h-4 mr-2 animate-spin" /> : null}
+                                            Load older events
+                                        </Button>
+                                    </div>
+                                )}
+                                <ProctorTimeline logs={logs} />
                             </CardContent>
                         </Card>
                     </TabsContent>
@@ -1,8 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from core.database import get_db
-from core.auth import get_current_user
-from models.user import User
+from core.auth import get_current_user, Principal
+from core.db_router import get_read_db
 from models.candidate_profile import CandidateProfile
 from services.analytics_service import AnalyticsService
 
@@ -10,8 +9,8 @@ router = APIRouter()
 
 @router.get("/candidate/stats")
 def get_candidate_stats(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     if current_user.role != "candidate":
         raise HTTPException(status_code=403, detail="Not authorized")
@@ -31,8 +30,8 @@ def get_candidate_stats(
 
 @router.get("/recruiter/stats")
 def get_recruiter_stats(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     if current_user.role != "recruiter":
         raise HTTPException(status_code=403, detail="Not authorized")
@@ -42,8 +41,8 @@ def get_recruiter_stats(
 @router.get("/recruiter/jobs/{job_id}/analytics")
 def get_job_analytics(
     job_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     if current_user.role != "recruiter":
         raise HTTPException(status_code=403, detail="Not authorized")
@@ -4,8 +4,7 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import Optional
 from services.llm_service import llm_service
-from core.auth import get_current_user
-from models.user import User
+from core.auth import get_current_user, Principal
 
 router = APIRouter()
 
@@ -23,7 +22,7 @@ class GenerateResponse(BaseModel):
 @router.post("/generate", response_model=GenerateResponse)
 async def generate_text(
     request: GenerateRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     try:
         result = await llm_service.generate(
@@ -45,7 +44,7 @@ class AnalyzeResumeRequest(BaseModel):
 async def analyze_resume(
     request: AnalyzeResumeRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     try:
         system_prompt = """You are an expert Career Coach and Resume Doctor with 15+ years of experience in HR and recruitment. 
@@ -1,15 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Query, status, BackgroundTasks
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
 from typing import List, Optional
 from datetime import datetime, timedelta, timezone
 import json
 
-from core.database import get_db
+from core.database import get_async_db
 from core.auth import get_current_user
-from models.test_system import Test, TestAssignment, Submission, TestQuestion, ProctorLog
-from schemas.test_system import AssignmentCreate, AssignmentPublic, SubmissionCreate, SubmissionResult, TestPublic, QuestionPublic
-from services.judge_service import judge_service
-from core.security_utils import decrypt_payload
+from models.test_system import Test, TestAssignment, Submission, TestQuestion
+from schemas.test_system import AssignmentCreate, AssignmentPublic, SubmissionCreate, SubmissionResult, TestPublic, QuestionPublic, ProctorLogPage
+from core.proctor_constants import ProctorEventSeverity
+from services.proctor_log_query import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursor, proctor_log_page, proctor_log_summary
+from services.run_service import sample_run_service
+from core.security_utils import decrypt_question_payload
 from pydantic import BaseModel
 from workers.grading import grade_submission
 
@@ -23,14 +28,15 @@ class RunTestRequest(BaseModel):
 
 @router.get("/", response_model=List[AssignmentPublic])
 async def list_assignments(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     # Use eager loading to prevent N+1 queries
-    assignments = db.query(TestAssignment)\
-        .options(joinedload(TestAssignment.test).joinedload(Test.questions))\
-        .filter(TestAssignment.candidate_id == current_user.id)\
-        .all()
+    assignments = (await db.scalars(
+        select(TestAssignment)
+        .options(joinedload(TestAssignment.test).joinedload(Test.questions))
+        .filter(TestAssignment.candidate_id == current_user.id)
+    )).unique().all()
     
     results = []
     for a in assignments:
@@ -43,9 +49,6 @@ async def list_assignments(
             questions=[] 
         )
         
-        # Calculate score dynamically
-        current_score = sum([s.score for s in a.submissions]) if a.submissions else 0.0
-
         results.append(AssignmentPublic(
             id=a.id,
             test=test_public,
@@ -54,7 +57,7 @@ async def list_assignments(
             expires_at=a.expires_at,
             scheduled_at=a.scheduled_at,
             candidate_id=a.candidate_id,
-            score=current_score,
+            score=a.total_score or 0.0,
             attempt_count=a.attempt_count
         ))
     return results
@@ -62,17 +65,15 @@ async def list_assignments(
 @router.get("/{assignment_id}", response_model=AssignmentPublic)
 async def get_assignment_detail(
     assignment_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     # Use eager loading to prevent N+1 queries
-    assignment = db.query(TestAssignment)\
-        .options(
-            joinedload(TestAssignment.test).joinedload(Test.questions),
-            joinedload(TestAssignment.submissions)
-        )\
-        .filter(TestAssignment.id == assignment_id)\
-        .first()
+    assignment = (await db.scalars(
+        select(TestAssignment)
+        .options(joinedload(TestAssignment.test).joinedload(Test.questions))
+        .filter(TestAssignment.id == assignment_id)
+    )).unique().first()
     
     if not assignment:
         raise HTTPException(status_code=404, detail="Assignment not found")
@@ -84,8 +85,7 @@ async def get_assignment_detail(
     public_questions = []
     for q in assignment.test.questions:
         try:
-            decrypted_problem = decrypt_payload(q.encrypted_problem_payload)
-            problem_data = json.loads(decrypted_problem.decode())
+            problem_data = decrypt_question_payload(q.id, q.encrypted_problem_payload)
             
             public_questions.append(QuestionPublic(
                 id=q.id,
@@ -109,9 +109,6 @@ async def get_assignment_detail(
         questions=public_questions
     )
 
-    # Calculate score dynamically
-    current_score = sum([s.score for s in assignment.submissions]) if assignment.submissions else 0.0
-
     return AssignmentPublic(
         id=assignment.id,
         test=test_public,
@@ -120,17 +117,22 @@ async def get_assignment_detail(
         expires_at=assignment.expires_at,
         scheduled_at=assignment.scheduled_at,
         candidate_id=assignment.candidate_id,
-        score=current_score,
+        score=assignment.total_score or 0.0,
         attempt_count=assignment.attempt_count
     )
 
 @router.post("/{assignment_id}/start")
 async def start_test(
     assignment_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
-    assignment = db.query(TestAssignment).filter(TestAssignment.id == assignment_id).first()
+    # The test is needed for its duration; async sessions can't lazy-load it later
+    assignment = await db.scalar(
+        select(TestAssignment)
+        .options(joinedload(TestAssignment.test))
+        .filter(TestAssignment.id == assignment_id)
+    )
     if not assignment:
         raise HTTPException(status_code=404, detail="Assignment not found")
         
@@ -167,7 +169,7 @@ async def start_test(
          
     if assignment.expires_at and datetime.now(timezone.utc) > assignment.expires_at:
         assignment.status = "expired"
-        db.commit()
+        await db.commit()
         raise HTTPException(status_code=403, detail="Test time has expired")
 
     # Start Test Logic
@@ -180,67 +182,83 @@ async def start_test(
     
     # Increment attempt count
     assignment.attempt_count += 1
-    db.commit()
+    await db.commit()
     return {"status": "started", "starts_at": assignment.starts_at}
 
-@router.post("/{assignment_id}/run")
-async def run_test(
-    assignment_id: str,
-    run_req: RunTestRequest,
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
-):
-    assignment = db.query(TestAssignment).filter(TestAssignment.id == assignment_id).first()
-    if not assignment:
-        raise HTTPException(status_code=404, detail="Assignment not found")
-        
-    if str(assignment.candidate_id) != str(current_user.id):
+async def _load_sample_tests(db: AsyncSession, assignment_id: str, question_id: str, current_user) -> list:
+    """
+    Resolves assignment + question in ONE query (question must belong to the assigned test),
+    then serves the sample tests from the decrypted payload cache.
+    """
+    row = (await db.execute(
+        select(TestAssignment.candidate_id, TestQuestion.id, TestQuestion.encrypted_problem_payload)
+        .join(TestQuestion, TestQuestion.test_id == TestAssignment.test_id)
+        .filter(TestAssignment.id == assignment_id, TestQuestion.id == question_id)
+    )).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Assignment or question not found")
+
+    if str(row.candidate_id) != str(current_user.id):
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    question = db.query(TestQuestion).filter(TestQuestion.id == run_req.question_id).first()
-    if not question:
-        raise HTTPException(status_code=404, detail="Question not found")
+    if not sample_run_service.allow_run(current_user.id):
+        raise HTTPException(status_code=429, detail="Too many runs. Please wait a few seconds and try again.")
+
+    # Release the pooled connection now: the caller awaits Judge0 for a long time and never touches the DB again
+    await db.close()
 
-    # Decrypt problem payload to get sample tests
     try:
-        decrypted_problem = decrypt_payload(question.encrypted_problem_payload)
-        problem_data = json.loads(decrypted_problem.decode())
-        sample_tests = problem_data.get("sample_tests", [])
-    except Exception as e:
+        problem_data = decrypt_question_payload(row.id, row.encrypted_problem_payload)
+    except Exception:
         raise HTTPException(status_code=500, detail="Failed to decrypt question data")
+    return problem_data.get("sample_tests", [])
 
+@router.post("/{assignment_id}/run")
+async def run_test(
+    assignment_id: str,
+    run_req: RunTestRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    sample_tests = await _load_sample_tests(db, assignment_id, run_req.question_id, current_user)
     if not sample_tests:
         return {"results": [], "message": "No sample tests available"}
 
-    results = []
-    for test in sample_tests:
-        result = await judge_service.execute_code(
-            language=run_req.language,
-            code=run_req.code,
-            stdin=test.get("input", ""),
-            expected_output=test.get("output", "")
-        )
-        
-        # Add input/expected to result for UI display
-        result["input"] = test.get("input", "")
-        result["expected"] = test.get("output", "")
-        result["actual"] = result.get("stdout", "").strip()
-        
-        results.append(result)
-
+    results = await sample_run_service.run(run_req.question_id, run_req.language, run_req.code, sample_tests)
     return {"results": results}
 
+@router.post("/{assignment_id}/run/stream")
+async def run_test_stream(
+    assignment_id: str,
+    run_req: RunTestRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Same as /run, but streams NDJSON lines as each sample case finishes:
+    {"index": i, "total": n, "result": {...}} ... then {"done": true, "total": n}
+    """
+    sample_tests = await _load_sample_tests(db, assignment_id, run_req.question_id, current_user)
+    total = len(sample_tests)
+
+    async def ndjson():
+        async for index, result in sample_run_service.stream(run_req.question_id, run_req.language, run_req.code, sample_tests):
+            yield json.dumps({"index": index, "total": total, "result": result}, default=str) + "\n"
+        yield json.dumps({"done": True, "total": total}) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
 @router.patch("/{assignment_id}/draft")
 async def save_draft(
     assignment_id: str,
     submission_in: SubmissionCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """
     Save code as draft without grading.
     """
-    assignment = db.query(TestAssignment).filter(TestAssignment.id == assignment_id).first()
+    assignment = await db.scalar(select(TestAssignment).filter(TestAssignment.id == assignment_id))
     if not assignment:
         raise HTTPException(status_code=404, detail="Assignment not found")
         
@@ -248,15 +266,21 @@ async def save_draft(
         raise HTTPException(status_code=403, detail="Not authorized")
         
     # Check if submission exists for this question
-    submission = db.query(Submission).filter(
+    submission = await db.scalar(select(Submission).filter(
         Submission.assignment_id == assignment.id,
         Submission.question_id == submission_in.question_id
-    ).first()
+    ))
     
     if submission:
+        edited = submission.code != submission_in.code or submission.language != submission_in.language
         submission.code = submission_in.code
         submission.language = submission_in.language
-        # Don't change status or score
+        # Keep the score until it's regraded. A "queued" submission needs nothing: the grader reads the
+        # code when it starts. Anything graded (or being graded) from the old code goes back to draft
+        # so /finish queues it again
+        if edited and submission.grading_status != "queued":
+            submission.grading_status = "draft"
+            submission.execution_summary = None
     else:
         submission = Submission(
             assignment_id=assignment.id,
@@ -268,17 +292,17 @@ async def save_draft(
         )
         db.add(submission)
     
-    db.commit()
+    await db.commit()
     return {"status": "draft_saved"}
 
 @router.post("/{assignment_id}/finish")
 async def finish_test(
     assignment_id: str,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
-    assignment = db.query(TestAssignment).filter(TestAssignment.id == assignment_id).first()
+    assignment = await db.scalar(select(TestAssignment).filter(TestAssignment.id == assignment_id))
     if not assignment:
         raise HTTPException(status_code=404, detail="Assignment not found")
         
@@ -288,14 +312,18 @@ async def finish_test(
     assignment.status = "completed"
     # assignment.completed_at = datetime.utcnow() 
     
-    # Queue grading for all submissions
-    submissions = db.query(Submission).filter(Submission.assignment_id == assignment.id).all()
+    # Queue grading for drafts only: "queued" submissions were already handed to the grader by /submit,
+    # and grading them twice would race on the same question score
+    submissions = (await db.scalars(select(Submission).filter(
+        Submission.assignment_id == assignment.id,
+        Submission.grading_status == "draft"
+    ))).all()
     for sub in submissions:
-        if sub.grading_status == "draft" or sub.grading_status == "queued":
-             sub.grading_status = "queued"
-             background_tasks.add_task(grade_submission, str(sub.id))
+        sub.grading_status = "queued"
     
-    db.commit()
+    await db.commit()
+    for sub in submissions:
+        background_tasks.add_task(grade_submission, str(sub.id))
     return {"status": "completed"}
 
 @router.post("/{assignment_id}/submit", response_model=SubmissionResult)
@@ -303,10 +331,10 @@ async def submit_code(
     assignment_id: str,
     submission_in: SubmissionCreate,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
-    assignment = db.query(TestAssignment).filter(TestAssignment.id == assignment_id).first()
+    assignment = await db.scalar(select(TestAssignment).filter(TestAssignment.id == assignment_id))
     if not assignment:
         raise HTTPException(status_code=404, detail="Assignment not found")
         
@@ -314,15 +342,15 @@ async def submit_code(
         raise HTTPException(status_code=403, detail="Not authorized")
 
     # Get question
-    question = db.query(TestQuestion).filter(TestQuestion.id == submission_in.question_id).first()
+    question = await db.scalar(select(TestQuestion).filter(TestQuestion.id == submission_in.question_id))
     if not question:
         raise HTTPException(status_code=404, detail="Question not found")
 
     # Check if submission exists
-    submission = db.query(Submission).filter(
+    submission = await db.scalar(select(Submission).filter(
         Submission.assignment_id == assignment.id,
         Submission.question_id == submission_in.question_id
-    ).first()
+    ))
 
     if submission:
         submission.code = submission_in.code
@@ -340,14 +368,17 @@ async def submit_code(
         )
         db.add(submission)
     
-    db.commit()
-    db.refresh(submission)
+    await db.commit()
+    submission_id = submission.id
+    # Return the connection to the pool: the request session outlives the background grading task,
+    # and grading needs a connection of its own
+    await db.close()
     
     # Queue Grading Task
-    background_tasks.add_task(grade_submission, str(submission.id))
+    background_tasks.add_task(grade_submission, str(submission_id))
     
     return SubmissionResult(
-        id=submission.id,
+        id=submission_id,
         status="completed", # Legacy status field
         grading_status="queued",
         execution_summary=None,
@@ -357,13 +388,21 @@ async def submit_code(
 @recruiter_router.get("/{assignment_id}")
 async def get_assignment_detail_recruiter(
     assignment_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     if current_user.role != "recruiter" and current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    assignment = db.query(TestAssignment).filter(TestAssignment.id == assignment_id).first()
+    # Test, questions and score aggregates in three queries instead of lazy loads per attribute
+    assignment = await db.scalar(
+        select(TestAssignment)
+        .options(
+            joinedload(TestAssignment.test).selectinload(Test.questions),
+            selectinload(TestAssignment.question_scores)
+        )
+        .filter(TestAssignment.id == assignment_id)
+    )
     if not assignment:
         raise HTTPException(status_code=404, detail="Assignment not found")
         
@@ -373,11 +412,8 @@ async def get_assignment_detail_recruiter(
     questions_data = []
     for q in assignment.test.questions:
         try:
-            decrypted_problem = decrypt_payload(q.encrypted_problem_payload)
-            problem_data = json.loads(decrypted_problem.decode())
-            
-            decrypted_hidden = decrypt_payload(q.encrypted_hidden_tests_payload)
-            hidden_data = json.loads(decrypted_hidden.decode())
+            problem_data = decrypt_question_payload(q.id, q.encrypted_problem_payload)
+            hidden_data = decrypt_question_payload(q.id, q.encrypted_hidden_tests_payload)
 
             questions_data.append({
                 "id": q.id,
@@ -391,23 +427,20 @@ async def get_assignment_detail_recruiter(
         except Exception as e:
             print(f"Error decrypting question {q.id}: {e}")
 
-    submissions = db.query(Submission).filter(Submission.assignment_id == assignment.id).all()
+    submissions = (await db.scalars(select(Submission).filter(Submission.assignment_id == assignment.id))).all()
     
-    # Calculate Score Dynamically
-    latest_scores = {}
     completed_at = None
-    
     for s in submissions:
-        latest_scores[s.question_id] = s.score
         if not completed_at or s.submitted_at > completed_at:
             completed_at = s.submitted_at
         
-    total_score = sum(latest_scores.values())
+    # Materialized by the grading worker (see workers.grading.record_question_score)
+    total_score = assignment.total_score or 0.0
     max_score = len(assignment.test.questions) * 100
     calculated_score = (total_score / max_score) * 100 if max_score > 0 else 0
     
-    # Get Proctor Logs explicitly
-    proctor_logs = db.query(ProctorLog).filter(ProctorLog.assignment_id == assignment.id).order_by(ProctorLog.timestamp.desc()).all()
+    # Only the newest page of proctor logs; the rest via GET /{assignment_id}/proctor-logs?cursor=...
+    proctor_page = await db.run_sync(proctor_log_page, assignment.id)
     
     return {
         "assignment": {
@@ -415,7 +448,8 @@ async def get_assignment_detail_recruiter(
             "candidate_id": assignment.candidate_id,
             "status": assignment.status,
             "score": calculated_score,
-            "warning_count": len(proctor_logs),
+            "question_scores": {str(qs.question_id): qs.score for qs in assignment.question_scores},
+            "warning_count": assignment.warning_count or 0,
             "started_at": assignment.starts_at,
             "completed_at": completed_at if assignment.status == "completed" else None,
         },
@@ -432,5 +466,45 @@ async def get_assignment_detail_recruiter(
                 "execution_summary": s.execution_summary
             } for s in submissions
         ],
-        "proctor_logs": proctor_logs
+        "proctor_summary": await db.run_sync(proctor_log_summary, assignment.id),
+        "proctor_logs": proctor_page["items"],
+        "proctor_logs_next_cursor": proctor_page["next_cursor"]
     }
+
+@recruiter_router.get("/{assignment_id}/proctor-logs", response_model=ProctorLogPage)
+async def list_assignment_proctor_logs(
+    assignment_id: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    severity: Optional[ProctorEventSeverity] = None,
+    event_type: Optional[str] = None,
+    include_payload: bool = True,
+    include_summary: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """Newest-first, cursor-paginated proctor logs (pass next_cursor back as ?cursor= for the next page)"""
+    if current_user.role != "recruiter" and current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    owner = (await db.execute(
+        select(Test.recruiter_id)
+        .join(TestAssignment, TestAssignment.test_id == Test.id)
+        .filter(TestAssignment.id == assignment_id)
+    )).first()
+    if not owner:
+        raise HTTPException(status_code=404, detail="Assignment not found")
+    if owner.recruiter_id != current_user.id and current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    try:
+        page = await db.run_sync(
+            proctor_log_page, assignment_id, cursor=cursor, limit=limit,
+            severity=severity.value if severity else None,
+            event_type=event_type, include_payload=include_payload
+        )
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if include_summary:
+        page["summary"] = await db.run_sync(proctor_log_summary, assignment_id)
+    return page
@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple
 from datetime import datetime
 
-from core.database import get_db
+from core.database import get_async_db
 from core.auth import get_current_user
 from models.test_system import TestAssignment, ProctorLog
-from schemas.test_system import ProctorLogCreate
+from schemas.test_system import ProctorLogCreate, ProctorLogBatchCreate
 from core.config import settings
 from core.proctor_constants import (
     VALID_EVENT_TYPES,
@@ -16,9 +17,20 @@ from core.proctor_constants import (
 )
 
 from core.proctor_settings import ProctorSettings
+from sio import record_assignment_proctor_events
+from core.rate_limit import Limit, rate_limit, rate_limiter
+from core.exceptions import RateLimitedError
 
 router = APIRouter()
 
+# Per candidate + assignment, so one misbehaving client can't flood the proctor_logs table
+PROCTOR_LOG_LIMIT = Limit(ProctorSettings.HTTP_LOG_EVENTS_PER_MINUTE, 60)
+proctor_log_rate_limit = rate_limit(
+    "proctor_log",
+    PROCTOR_LOG_LIMIT,
+    key=lambda request, user: f"{user.id}:{request.query_params.get('assignment_id')}"
+)
+
 @router.get("/events-config")
 async def get_proctoring_events_config():
     """Get proctoring event types and severity mapping for frontend consumption"""
@@ -36,26 +48,23 @@ async def get_proctoring_events_config():
 @router.get("/status")
 async def get_proctoring_status(
     assignment_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """
     Get authoritative proctoring status including persistent warning count.
     Frontend uses this to restore state after refresh.
     """
-    assignment = db.query(TestAssignment).filter(TestAssignment.id == assignment_id).first()
+    assignment = await db.scalar(select(TestAssignment).filter(TestAssignment.id == assignment_id))
     if not assignment:
         raise HTTPException(status_code=404, detail="Assignment not found")
         
     if str(assignment.candidate_id) != str(current_user.id):
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    # Calculate authoritative warning count (MEDIUM + HIGH severities)
+    # Authoritative warning count (MEDIUM + HIGH severities), maintained by /log
     # LOW severity events do not count towards termination threshold
-    warning_count = db.query(ProctorLog).filter(
-        ProctorLog.assignment_id == assignment.id,
-        ProctorLog.severity.in_([ProctorEventSeverity.MEDIUM.value, ProctorEventSeverity.HIGH.value])
-    ).count()
+    warning_count = assignment.warning_count or 0
 
     is_terminated = assignment.status == "terminated_fraud"
 
@@ -66,35 +75,25 @@ async def get_proctoring_status(
         "max_warnings": ProctorSettings.MAX_VIOLATIONS_TOTAL
     }
 
-@router.post("/log")
-async def log_proctor_event(
-    assignment_id: str,
-    log_in: ProctorLogCreate,
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
-):
-    # 1. Validate Event Type
-    if not validate_event_type(log_in.event_type):
-        raise HTTPException(
-            status_code=400, 
-            detail=f"Invalid event type: {log_in.event_type}"
-        )
-    
-    assignment = db.query(TestAssignment).filter(TestAssignment.id == assignment_id).first()
+async def _lock_assignment_for_logging(db: AsyncSession, assignment_id: str, current_user) -> TestAssignment:
+    """
+    One transaction per request: lock the assignment row so concurrent events (multiple tabs)
+    update the counters and decide termination serially, then commit once.
+    """
+    assignment = await db.scalar(select(TestAssignment).filter(TestAssignment.id == assignment_id).with_for_update())
     if not assignment:
         raise HTTPException(status_code=404, detail="Assignment not found")
-        
+
     if str(assignment.candidate_id) != str(current_user.id):
+        await db.rollback()
         raise HTTPException(status_code=403, detail="Not authorized")
+    return assignment
 
-    if assignment.status == "terminated_fraud":
-        return {
-            "status": "logged_ignored",
-            "assignment_status": "terminated_fraud",
-            "terminated": True,
-            "warning_count": ProctorSettings.MAX_VIOLATIONS_TOTAL # Maxed out
-        }
-
+def _apply_proctor_event(db: AsyncSession, assignment: TestAssignment, log_in: ProctorLogCreate) -> Tuple[str, str]:
+    """
+    Adds the ProctorLog and updates the assignment counters/meta (no commit).
+    Returns (severity, termination_reason); the reason is "" if this event doesn't trigger termination.
+    """
     # 2. Determine Severity
     # Use existing mapping or explicit overrides logic if needed
     # Here we strictly follow the map + dynamic rules
@@ -109,71 +108,143 @@ async def log_proctor_event(
              severity_enum = ProctorEventSeverity.CRITICAL.value
 
     if log_in.event_type == "screen_context_baseline_locked":
-         # Logic side-effect: Save baseline
-         current_meta = assignment.meta or {}
+         # Logic side-effect: Save baseline (committed together with the log)
+         current_meta = dict(assignment.meta or {})
          current_meta['screen_baseline'] = log_in.payload
          assignment.meta = current_meta
-         db.commit()
 
-    # 3. Apply Enforcement Policy & Persist
+    # 3. Apply Enforcement Policy
     
     # Check for immediate termination conditions (CRITICAL)
-    should_terminate = False
     termination_reason = ""
 
     if severity_enum == ProctorEventSeverity.CRITICAL.value:
-        should_terminate = True
         termination_reason = f"Critical Violation: {log_in.event_type}"
 
-    # Extension Policy: Check extension count
+    # Extension Policy: Check extension count (detections before this one)
     if log_in.event_type == "extension_detected":
          severity_enum = ProctorEventSeverity.HIGH.value
-         ext_count = db.query(ProctorLog).filter(
-             ProctorLog.assignment_id == assignment.id, 
-             ProctorLog.event_type == "extension_detected"
-         ).count()
-         if ext_count >= ProctorSettings.MAX_EXTENSION_WARNINGS:
-             should_terminate = True
+         ext_count = assignment.extension_count or 0
+         if ext_count >= ProctorSettings.MAX_EXTENSION_WARNINGS and not termination_reason:
              termination_reason = "Prohibited Extension Detected (Repeated)"
+         assignment.extension_count = ext_count + 1
 
     # SECURITY: Strip heavy blobs before saving
     safe_payload = {k: v for k, v in (log_in.payload or {}).items() 
                    if k not in ['image', 'snapshot', 'screenshot', 'base64', 'blob', 'buffer']}
 
     # Log the event
-    new_log = ProctorLog(
+    db.add(ProctorLog(
         assignment_id=assignment.id,
         event_type=log_in.event_type,
         payload=safe_payload,
         severity=severity_enum
-    )
-    db.add(new_log)
-    db.commit() # Commit to save log and ensure count is accurate
-
-    # 4. Check Accumulated Warnings (MEDIUM + HIGH)
-    # We query AFTER commit to include the current log
-    current_warning_count = db.query(ProctorLog).filter(
-        ProctorLog.assignment_id == assignment.id,
-        ProctorLog.severity.in_([ProctorEventSeverity.MEDIUM.value, ProctorEventSeverity.HIGH.value])
-    ).count()
-
-    if not should_terminate and current_warning_count >= ProctorSettings.MAX_VIOLATIONS_TOTAL:
-        should_terminate = True
+    ))
+
+    # 4. Accumulated Warnings (MEDIUM + HIGH), including the current event
+    if severity_enum in (ProctorEventSeverity.MEDIUM.value, ProctorEventSeverity.HIGH.value):
+        assignment.warning_count = (assignment.warning_count or 0) + 1
+
+    return severity_enum, termination_reason
+
+async def _enforce_and_commit(db: AsyncSession, assignment: TestAssignment, termination_reason: str):
+    """Applies the warning threshold, terminates if needed and commits logs + counters atomically."""
+    current_warning_count = assignment.warning_count or 0
+    if not termination_reason and current_warning_count >= ProctorSettings.MAX_VIOLATIONS_TOTAL:
         termination_reason = f"Excessive Warnings ({current_warning_count}/{ProctorSettings.MAX_VIOLATIONS_TOTAL})"
 
     # execute termination
-    if should_terminate:
+    if termination_reason:
         print(f"[SECURITY] Terminating Assignment {assignment.id} Reason: {termination_reason}")
         assignment.status = "terminated_fraud"
         assignment.attempt_count = 3 # Exhaust attempts
         # We could log a "termination_event" here if we wanted
-        db.commit()
+
+    await db.commit()
+
+def _terminated_response() -> dict:
+    return {
+        "status": "logged_ignored",
+        "assignment_status": "terminated_fraud",
+        "terminated": True,
+        "warning_count": ProctorSettings.MAX_VIOLATIONS_TOTAL # Maxed out
+    }
+
+@router.post("/log")
+async def log_proctor_event(
+    assignment_id: str,
+    log_in: ProctorLogCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(proctor_log_rate_limit)
+):
+    # 1. Validate Event Type
+    if not validate_event_type(log_in.event_type):
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Invalid event type: {log_in.event_type}"
+        )
+    
+    assignment = await _lock_assignment_for_logging(db, assignment_id, current_user)
+    if assignment.status == "terminated_fraud":
+        await db.rollback()
+        return _terminated_response()
+
+    severity_enum, termination_reason = _apply_proctor_event(db, assignment, log_in)
+    await _enforce_and_commit(db, assignment, termination_reason)
+    # Live per-assignment aggregate for recruiters watching the session
+    record_assignment_proctor_events(assignment.id, [(log_in.event_type, log_in.payload)])
 
     return {
         "status": "logged",
         "assignment_status": assignment.status,
         "terminated": assignment.status == "terminated_fraud",
-        "warning_count": current_warning_count,
+        "warning_count": assignment.warning_count or 0,
         "max_warnings": ProctorSettings.MAX_VIOLATIONS_TOTAL,
         "severity": severity_enum
     }
+
+@router.post("/log/batch")
+async def log_proctor_events_batch(
+    assignment_id: str,
+    batch_in: ProctorLogBatchCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Ordered batch of proctor events (e.g. blur + tab_switch + focus_lost from one burst).
+    Events are applied in order, inserted together and the thresholds are evaluated once for
+    the batch; the response is the final enforcement state. Shares /log's rate-limit budget.
+    """
+    invalid = [e.event_type for e in batch_in.events if not validate_event_type(e.event_type)]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid event type(s): {', '.join(sorted(set(invalid)))}")
+
+    allowed, retry_after = await rate_limiter.hit(
+        "proctor_log", f"{current_user.id}:{assignment_id}", PROCTOR_LOG_LIMIT, cost=len(batch_in.events)
+    )
+    if not allowed:
+        raise RateLimitedError(retry_after=retry_after)
+
+    assignment = await _lock_assignment_for_logging(db, assignment_id, current_user)
+    if assignment.status == "terminated_fraud":
+        await db.rollback()
+        return _terminated_response()
+
+    severities = []
+    termination_reason = ""
+    for log_in in batch_in.events:
+        severity_enum, reason = _apply_proctor_event(db, assignment, log_in)
+        severities.append(severity_enum)
+        termination_reason = termination_reason or reason
+    await _enforce_and_commit(db, assignment, termination_reason)
+    record_assignment_proctor_events(assignment.id, [(e.event_type, e.payload) for e in batch_in.events])
+
+    return {
+        "status": "logged",
+        "logged": len(severities),
+        "assignment_status": assignment.status,
+        "terminated": assignment.status == "terminated_fraud",
+        "warning_count": assignment.warning_count or 0,
+        "max_warnings": ProctorSettings.MAX_VIOLATIONS_TOTAL,
+        "severities": severities
+    }
@@ -8,7 +8,7 @@ from core.auth import get_current_user
 from models.test_system import Test, TestQuestion, TestAssignment
 from schemas.test_system import TestCreate, TestPublic, TestSummary, QuestionCreate, QuestionPublic, AssignmentCreate
 from services.llm_service import llm_service
-from core.security_utils import encrypt_payload, decrypt_payload
+from core.security_utils import encrypt_payload, decrypt_question_payload
 
 router = APIRouter()
 
@@ -78,7 +78,7 @@ async def get_test_assignments(
             "id": str(a.id),
             "candidate_id": a.candidate_id,
             "status": a.status,
-            "score": a.submissions[0].score if a.submissions else None, 
+            "score": a.total_score or 0.0,
             "assigned_at": a.assigned_at,
             "starts_at": a.starts_at,
             "completed_at": a.submissions[0].submitted_at if a.submissions else None,
@@ -151,8 +151,7 @@ async def get_test(
     public_questions = []
     for q in test.questions:
         try:
-            decrypted_problem = decrypt_payload(q.encrypted_problem_payload)
-            problem_data = json.loads(decrypted_problem.decode())
+            problem_data = decrypt_question_payload(q.id, q.encrypted_problem_payload)
             
             public_questions.append(QuestionPublic(
                 id=q.id,
@@ -2,7 +2,8 @@ from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from core.database import get_db
-from core.auth import get_current_user
+from core.auth import get_current_user, Principal
+from core.db_router import get_read_db
 from models.user import User
 from models.shortlisted_candidate import ShortlistedCandidate
 from services.vector_service import search_jobs, search_candidates, update_job_embedding, update_candidate_embedding
@@ -16,8 +17,8 @@ class SearchQuery(BaseModel):
 @router.post("/jobs")
 def search_jobs_endpoint(
     search: SearchQuery,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Semantic search for jobs."""
     results = search_jobs(db, search.query, search.limit)
@@ -26,14 +27,16 @@ def search_jobs_endpoint(
 @router.post("/candidates")
 def search_candidates_endpoint(
     search: SearchQuery,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    primary_db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Semantic search for candidates (Recruiter only)."""
     if current_user.role != "recruiter":
         raise HTTPException(status_code=403, detail="Not authorized")
         
-    results = search_candidates(db, search.query, search.limit)
+    # Embeddings missing on the replica are generated and saved through the primary
+    results = search_candidates(db, search.query, search.limit, write_db=primary_db)
     print(f"[DEBUG] search_candidates returned {len(results)} results")
     
     # Get set of shortlisted candidate IDs for efficient lookup
@@ -79,7 +82,7 @@ def trigger_job_embedding_update(
     job_id: int,
     background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     if current_user.role != "recruiter":
         raise HTTPException(status_code=403, detail="Not authorized")
@@ -2,36 +2,61 @@ from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from core.security import create_access_token, verify_password
-from core.auth import get_current_user
+from core.security import create_access_token, password_hasher
+from core.auth import get_current_user_model
 from core.config import settings
 from core.database import get_db
+from core.rate_limit import concurrency_limit
+from core.logging import get_logger
 from services.user_service import UserService
+from models.user import User
 from schemas.user import Token, UserCreate, UserResponse
 
 router = APIRouter()
+logger = get_logger()
 
-@router.post("/login", response_model=Token)
+# bcrypt is deliberately slow: cap in-flight hashing requests per client IP. Outside development the app sits
+# behind a proxy, so without TRUSTED_PROXY_HOPS every client would share the proxy's address (and its 2 slots):
+# the per-IP guard is off then, and only the hasher's global PASSWORD_HASH_MAX_PENDING cap applies
+_per_ip_limit = settings.AUTH_MAX_CONCURRENT_PER_IP
+if settings.TRUSTED_PROXY_HOPS == 0 and settings.ENVIRONMENT != "development":
+    logger.warning("⚠️ TRUSTED_PROXY_HOPS is 0: per-IP login concurrency limit disabled until it is configured")
+    _per_ip_limit = 0
+password_concurrency = concurrency_limit("auth_password", _per_ip_limit)
+
+@router.post("/login", response_model=Token, dependencies=[Depends(password_concurrency)])
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
     user = UserService.get_user_by_email(db, form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user_id, stored_hash = (user.id, user.hashed_password) if user else (None, None)
+    # Return the pooled connection while bcrypt runs (~100-300 ms); holding it lets a login burst exhaust the pool
+    db.commit()
+
+    valid, new_hash = await password_hasher.verify(form_data.password, stored_hash)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if new_hash:
+        # BCRYPT_ROUNDS changed since this hash was made: upgrade it now that we know the password
+        # (only if the password wasn't changed meanwhile)
+        db.query(User).filter(User.id == user_id, User.hashed_password == stored_hash).update(
+            {User.hashed_password: new_hash}, synchronize_session=False
+        )
+        db.commit()
     
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        subject=user.id, expires_delta=access_token_expires
+        subject=user_id, expires_delta=access_token_expires
     )
     
     # In a real app, implement refresh tokens properly
     refresh_token = create_access_token(
-        subject=user.id, expires_delta=timedelta(days=7)
+        subject=user_id, expires_delta=timedelta(days=7)
     )
     
     return {
@@ -40,7 +65,7 @@ async def login_for_access_token(
         "token_type": "bearer"
     }
 
-@router.post("/register", response_model=UserResponse)
+@router.post("/register", response_model=UserResponse, dependencies=[Depends(password_concurrency)])
 async def register_user(
     user_in: UserCreate,
     db: Session = Depends(get_db)
@@ -51,9 +76,11 @@ async def register_user(
             status_code=400,
             detail="Email already registered"
         )
-    return UserService.create_user(db, user_in)
+    db.commit()  # release the connection while hashing
+    hashed_password = await password_hasher.hash(user_in.password)
+    return UserService.create_user(db, user_in, hashed_password=hashed_password)
 
 @router.get("/me", response_model=UserResponse)
-async def read_users_me(current_user = Depends(get_current_user)):
+async def read_users_me(current_user = Depends(get_current_user_model)):
     print(f"[DEBUG] /me endpoint called. User: {current_user.email}, Role: {current_user.role}")
     return current_user
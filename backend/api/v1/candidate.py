@@ -1,9 +1,11 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy import or_, and_
+from sqlalchemy import or_, and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from core.database import get_db
-from core.auth import require_candidate
+from core.database import get_db, get_async_db
+from core.auth import require_candidate, Principal
+from core.db_router import get_read_db
 from core.logging import get_logger
 from models.user import User
 from models.job import Job
@@ -39,6 +41,9 @@ class CandidateStatsResponse(BaseModel):
 def get_profile_by_user_id(db: Session, user_id: int):
     return db.query(CandidateProfile).filter(CandidateProfile.user_id == user_id).first()
 
+async def get_profile_by_user_id_async(db: AsyncSession, user_id: int):
+    return await db.scalar(select(CandidateProfile).filter(CandidateProfile.user_id == user_id))
+
 def calculate_profile_completion(profile: CandidateProfile) -> ProfileCompletion:
     # Resume analyzed if we have a summary OR a score
     resume_analyzed = bool((profile.resume_summary or (profile.resume_score and profile.resume_score > 0)))
@@ -67,7 +72,7 @@ def calculate_profile_completion(profile: CandidateProfile) -> ProfileCompletion
 @router.get("/profile", response_model=CandidateProfileResponse)
 async def get_profile(
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_candidate)
+    current_user: Principal = Depends(require_candidate)
 ):
     profile = get_profile_by_user_id(db, current_user.id)
     if not profile:
@@ -88,7 +93,7 @@ async def get_profile(
 async def update_profile(
     profile_in: CandidateProfileUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_candidate)
+    current_user: Principal = Depends(require_candidate)
 ):
     profile = get_profile_by_user_id(db, current_user.id)
     if not profile:
@@ -123,18 +128,18 @@ async def update_profile(
 
 @router.get("/stats", response_model=CandidateStatsResponse)
 async def get_candidate_stats(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_candidate)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_candidate)
 ):
     """Get candidate dashboard statistics (applications, profile views, resume score)"""
-    profile = get_profile_by_user_id(db, current_user.id)
+    profile = await get_profile_by_user_id_async(db, current_user.id)
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
     
     # Count total applications
-    applications = db.query(Application).filter(
+    applications = (await db.scalars(select(Application).filter(
         Application.candidate_id == profile.id
-    ).all()
+    ))).all()
     
     # Calculate status breakdown
     status_breakdown = {}
@@ -151,15 +156,15 @@ async def get_candidate_stats(
 @router.post("/apply/{job_id}", response_model=ApplicationResponse)
 async def apply_for_job(
     job_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_candidate)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_candidate)
 ):
     # Check if job exists
-    job = db.query(Job).filter(Job.id == job_id, Job.is_active == True).first()
+    job = await db.scalar(select(Job).filter(Job.id == job_id, Job.is_active == True))
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    profile = get_profile_by_user_id(db, current_user.id)
+    profile = await get_profile_by_user_id_async(db, current_user.id)
 
     # Enforce 100% Profile Completion
     completion = calculate_profile_completion(profile)
@@ -175,10 +180,10 @@ async def apply_for_job(
         )
 
     # Check if already applied
-    existing_application = db.query(Application).filter(
+    existing_application = await db.scalar(select(Application).filter(
         Application.job_id == job_id,
         Application.candidate_id == profile.id
-    ).first()
+    ))
 
     if existing_application:
         raise HTTPException(status_code=400, detail="Already applied to this job")
@@ -190,23 +195,24 @@ async def apply_for_job(
         status="pending",
         applied_at=datetime.utcnow()
     )
+    # Set here so the response doesn't lazy-load it (not possible on an async session)
+    application.job = job
 
     db.add(application)
-    db.commit()
-    db.refresh(application)
+    await db.commit()
 
     return application
 
 @router.get("/applications")
 async def get_my_applications(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_candidate)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_candidate)
 ):
-    profile = get_profile_by_user_id(db, current_user.id)
+    profile = await get_profile_by_user_id_async(db, current_user.id)
     if not profile:
         return {"applications": []}
         
-    applications = db.query(Application).filter(Application.candidate_id == profile.id).all()
+    applications = (await db.scalars(select(Application).filter(Application.candidate_id == profile.id))).all()
     
     # Enrich with job details and scheduled events
     result = []
@@ -214,17 +220,17 @@ async def get_my_applications(
     
     for app in applications:
         existing_job_ids.add(app.job_id)
-        job = db.query(Job).filter(Job.id == app.job_id).first()
+        job = await db.scalar(select(Job).filter(Job.id == app.job_id))
         
         # Check for scheduled event
         # Logic: Show event if it matches job_id OR if it's a general event (job_id is None) created AFTER application
         # AND the event must be created by the SAME recruiter who posted the job
-        event = db.query(ScheduledEvent).filter(
+        event = await db.scalar(select(ScheduledEvent).filter(
             ScheduledEvent.candidate_id == profile.id,
             ScheduledEvent.recruiter_id == job.recruiter_id,
             ScheduledEvent.job_id == app.job_id,
             ScheduledEvent.status == "scheduled"
-        ).order_by(ScheduledEvent.created_at.desc()).first()
+        ).order_by(ScheduledEvent.created_at.desc()).limit(1))
         
         app_dict = {
             "id": app.id,
@@ -238,7 +244,7 @@ async def get_my_applications(
 
     # --- ADD SHORTLISTED ENTRIES AS VIRTUAL APPLICATIONS ---
     from models.shortlisted_candidate import ShortlistedCandidate
-    shortlisted = db.query(ShortlistedCandidate).filter(ShortlistedCandidate.candidate_id == profile.id).all()
+    shortlisted = (await db.scalars(select(ShortlistedCandidate).filter(ShortlistedCandidate.candidate_id == profile.id))).all()
     
     for item in shortlisted:
         # If already applied, skip (it's covered above)
@@ -246,7 +252,7 @@ async def get_my_applications(
             continue
             
         # Validate Recruiter existence
-        recruiter_user = db.query(User).filter(User.id == item.recruiter_id).first()
+        recruiter_user = await db.scalar(select(User.id).filter(User.id == item.recruiter_id))
         if not recruiter_user:
             continue # Skip if recruiter deleted
 
@@ -255,7 +261,7 @@ async def get_my_applications(
         recruiter_name = "Recruiter Interest"
         
         if item.job_id:
-            job = db.query(Job).filter(Job.id == item.job_id).first()
+            job = await db.scalar(select(Job).filter(Job.id == item.job_id))
             if not job:
                 continue # Skip orphaned shortlist (job deleted)
             recruiter_name = job.company # Use company name for specific jobs
@@ -265,7 +271,7 @@ async def get_my_applications(
         if item.job_id:
             # Case 1: Specific Job Shortlist
             # Find event for THIS job OR a recent general event from THIS recruiter
-            event = db.query(ScheduledEvent).filter(
+            event = await db.scalar(select(ScheduledEvent).filter(
                 ScheduledEvent.candidate_id == profile.id,
                 ScheduledEvent.recruiter_id == item.recruiter_id,
                 or_(
@@ -276,17 +282,17 @@ async def get_my_applications(
                     )
                 ),
                 ScheduledEvent.status == "scheduled"
-            ).order_by(ScheduledEvent.created_at.desc()).first()
+            ).order_by(ScheduledEvent.created_at.desc()).limit(1))
         else:
             # Case 2: General Shortlist (job_id is None)
             # ONLY find General Events from THIS recruiter created AFTER the shortlist
-            event = db.query(ScheduledEvent).filter(
+            event = await db.scalar(select(ScheduledEvent).filter(
                 ScheduledEvent.candidate_id == profile.id,
                 ScheduledEvent.recruiter_id == item.recruiter_id,
                 ScheduledEvent.job_id == None, # MUST be general
                 ScheduledEvent.created_at >= item.created_at,
                 ScheduledEvent.status == "scheduled"
-            ).order_by(ScheduledEvent.created_at.desc()).first()
+            ).order_by(ScheduledEvent.created_at.desc()).limit(1))
 
         # Create virtual application
         virtual_app = {
@@ -308,8 +314,8 @@ async def get_my_applications(
 async def get_jobs(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_candidate)
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(require_candidate)
 ):
     jobs = db.query(Job).filter(Job.is_active == True).offset(skip).limit(limit).all()
     return {"jobs": jobs}
@@ -317,7 +323,7 @@ async def get_jobs(
 @router.get("/jobs/saved", response_model=JobList)
 async def get_saved_jobs(
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_candidate)
+    current_user: Principal = Depends(require_candidate)
 ):
     # Mock implementation for now as SavedJob model might not exist
     # In a real app, you'd query a SavedJob table
@@ -327,15 +333,15 @@ async def get_saved_jobs(
 async def save_job(
     job_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_candidate)
+    current_user: Principal = Depends(require_candidate)
 ):
     # Mock implementation
     return {"success": True, "message": "Job saved"}
 
 @router.get("/jobs/recommended", response_model=JobList)
 async def get_recommended_jobs(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_candidate)
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(require_candidate)
 ):
     jobs = db.query(Job).filter(Job.is_active == True).order_by(Job.created_at.desc()).limit(5).all()
     return {"jobs": jobs}
@@ -346,7 +352,7 @@ async def get_recommended_jobs(
 async def upload_resume(
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_candidate)
+    current_user: Principal = Depends(require_candidate)
 ):
     # Validate file type
     if not file.filename.lower().endswith(('.pdf', '.docx', '.txt')):
@@ -428,7 +434,7 @@ async def upload_resume(
 @router.get("/resume/file")
 async def get_resume_file(
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_candidate)
+    current_user: Principal = Depends(require_candidate)
 ):
     profile = get_profile_by_user_id(db, current_user.id)
     if not profile or not profile.resume_url:
@@ -474,7 +480,7 @@ async def get_resume_file(
 @router.delete("/resume")
 async def delete_resume(
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_candidate)
+    current_user: Principal = Depends(require_candidate)
 ):
     profile = get_profile_by_user_id(db, current_user.id)
     if profile and profile.resume_url:
@@ -501,7 +507,7 @@ async def delete_resume(
 @router.post("/resume/extract")
 async def extract_resume_text(
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_candidate)
+    current_user: Principal = Depends(require_candidate)
 ):
     profile = get_profile_by_user_id(db, current_user.id)
     if not profile or not profile.resume_url:
@@ -2,8 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
 from core.database import get_db
-from core.auth import get_current_user
-from models.user import User
+from core.auth import get_current_user, Principal
 from models.interview import InterviewSession, InterviewStatus
 from pydantic import BaseModel
 from datetime import datetime
@@ -45,7 +44,7 @@ class InterviewResponse(BaseModel):
 async def create_interview(
     interview: InterviewCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     if current_user.role != "recruiter" and current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Only recruiters can schedule interviews")
@@ -85,7 +84,7 @@ async def create_interview(
 @router.get("/my-interviews", response_model=List[InterviewResponse])
 async def get_my_interviews(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     print(f"Fetching interviews for user {current_user.id} ({current_user.role})")
     query = db.query(InterviewSession).options(
@@ -106,7 +105,7 @@ async def get_my_interviews(
 async def get_interview_details(
     room_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     interview = db.query(InterviewSession).options(
         joinedload(InterviewSession.candidate),
@@ -138,7 +137,7 @@ async def get_interview_details(
 @router.delete("/{room_id}")
 def delete_interview(
     room_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     interview = db.query(InterviewSession).filter(InterviewSession.room_id == room_id).first()
@@ -150,9 +149,18 @@ def delete_interview(
         raise HTTPException(status_code=403, detail="Only the host can end/delete the interview")
         
     # Manual Cascade Delete: Remove associated proctor logs first
-    from models.test_system import ProctorLog
+    from models.test_system import ProctorLog, ProctorLogRollup
     db.query(ProctorLog).filter(ProctorLog.interview_room_id == room_id).delete()
+    db.query(ProctorLogRollup).filter(ProctorLogRollup.interview_room_id == room_id).delete()
     
     db.delete(interview)
     db.commit()
+
+    # Socket.IO: stop admitting anyone to this room and drop its in-memory state
+    from services.room_auth_cache import room_auth_cache
+    from services.whiteboard import whiteboards
+    from services.proctor_aggregates import proctor_aggregates
+    room_auth_cache.invalidate(room_id)
+    whiteboards.discard(room_id)
+    proctor_aggregates.discard(room_id)
     return {"success": True, "message": "Interview ended and deleted"}
@@ -1,9 +1,10 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from core.database import get_db
-from core.auth import get_current_user
-from models.user import User
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.database import get_async_db
+from core.auth import get_current_user, Principal
+from core.db_router import get_async_read_db
 from models.notification import Notification
 from schemas.notification import NotificationResponse, NotificationUpdate
 
@@ -13,57 +14,57 @@ router = APIRouter()
 async def get_notifications(
     skip: int = 0,
     limit: int = 50,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    notifications = db.query(Notification).filter(
+    notifications = await db.scalars(select(Notification).filter(
         Notification.user_id == current_user.id
-    ).order_by(Notification.created_at.desc()).offset(skip).limit(limit).all()
+    ).order_by(Notification.created_at.desc()).offset(skip).limit(limit))
     
-    return notifications
+    return notifications.all()
 
 @router.get("/unread-count")
 async def get_unread_count(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    count = db.query(Notification).filter(
+    count = await db.scalar(select(func.count()).select_from(Notification).filter(
         Notification.user_id == current_user.id,
         Notification.is_read == False
-    ).count()
+    ))
     
     return {"count": count}
 
 @router.put("/{notification_id}/read", response_model=NotificationResponse)
 async def mark_notification_read(
     notification_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    notification = db.query(Notification).filter(
+    notification = await db.scalar(select(Notification).filter(
         Notification.id == notification_id,
         Notification.user_id == current_user.id
-    ).first()
+    ))
     
     if not notification:
         raise HTTPException(status_code=404, detail="Notification not found")
         
     notification.is_read = True
-    db.commit()
-    db.refresh(notification)
+    await db.commit()
+    await db.refresh(notification)
     
     return notification
 
 @router.put("/mark-all-read")
 async def mark_all_read(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    db.query(Notification).filter(
+    await db.execute(update(Notification).filter(
         Notification.user_id == current_user.id,
         Notification.is_read == False
-    ).update({"is_read": True})
+    ).values(is_read=True))
     
-    db.commit()
+    await db.commit()
     
     return {"success": True, "message": "All notifications marked as read"}
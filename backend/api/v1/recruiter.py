@@ -2,7 +2,7 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status, Body
 from sqlalchemy.orm import Session
 from core.database import get_db
-from core.auth import require_recruiter
+from core.auth import require_recruiter, Principal
 from models.user import User
 from models.job import Job
 from models.application import Application
@@ -21,7 +21,7 @@ router = APIRouter()
 async def post_job(
     job_in: JobCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_recruiter)
+    current_user: Principal = Depends(require_recruiter)
 ):
     job = Job(
         **job_in.dict(),
@@ -37,7 +37,7 @@ async def post_job(
 @router.get("/my-posts", response_model=List[JobResponse])
 async def get_my_posts(
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_recruiter)
+    current_user: Principal = Depends(require_recruiter)
 ):
     jobs = db.query(Job).filter(Job.recruiter_id == current_user.id).all()
     return jobs
@@ -46,7 +46,7 @@ async def get_my_posts(
 async def get_job_applications(
     job_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_recruiter)
+    current_user: Principal = Depends(require_recruiter)
 ):
     # Verify job belongs to recruiter
     job = db.query(Job).filter(Job.id == job_id, Job.recruiter_id == current_user.id).first()
@@ -88,7 +88,7 @@ async def update_application_status(
     application_id: int,
     status_update: dict = Body(...),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_recruiter)
+    current_user: Principal = Depends(require_recruiter)
 ):
     # Verify application exists and belongs to a job owned by the recruiter
     application = db.query(Application).filter(Application.id == application_id).first()
@@ -113,7 +113,7 @@ async def update_application_status(
 async def delete_job(
     job_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_recruiter)
+    current_user: Principal = Depends(require_recruiter)
 ):
     # Verify job belongs to recruiter
     job = db.query(Job).filter(Job.id == job_id, Job.recruiter_id == current_user.id).first()
@@ -153,7 +153,7 @@ def calculate_profile_completion(profile: CandidateProfile) -> ProfileCompletion
 async def get_candidate_details(
     candidate_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_recruiter)
+    current_user: Principal = Depends(require_recruiter)
 ):
     # candidate_id is the User ID
     profile = db.query(CandidateProfile).filter(CandidateProfile.user_id == candidate_id).first()
@@ -186,7 +186,7 @@ async def get_candidate_details(
 async def get_candidate_resume(
     candidate_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_recruiter)
+    current_user: Principal = Depends(require_recruiter)
 ):
     # candidate_id is the User ID
     profile = db.query(CandidateProfile).filter(CandidateProfile.user_id == candidate_id).first()
@@ -222,7 +222,7 @@ from schemas.recruiter_actions import ShortlistCreate, ShortlistedCandidateRespo
 async def shortlist_candidate(
     shortlist_in: ShortlistCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_recruiter)
+    current_user: Principal = Depends(require_recruiter)
 ):
     # Verify candidate exists (Frontend sends User ID)
     candidate_profile = db.query(CandidateProfile).filter(CandidateProfile.user_id == shortlist_in.candidate_id).first()
@@ -304,7 +304,7 @@ async def shortlist_candidate(
 @router.get("/shortlisted", response_model=List[ShortlistedCandidateResponse])
 async def get_shortlisted_candidates(
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_recruiter)
+    current_user: Principal = Depends(require_recruiter)
 ):
     shortlisted = db.query(ShortlistedCandidate).filter(
         ShortlistedCandidate.recruiter_id == current_user.id
@@ -348,7 +348,7 @@ async def get_shortlisted_candidates(
 async def remove_shortlist(
     candidate_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_recruiter)
+    current_user: Principal = Depends(require_recruiter)
 ):
     # candidate_id from Frontend is User ID. We need to find the Profile ID first.
     profile = db.query(CandidateProfile).filter(CandidateProfile.user_id == candidate_id).first()
@@ -376,7 +376,7 @@ from schemas.recruiter_actions import ScheduleCreate, ScheduledEventResponse
 async def schedule_event(
     event_in: ScheduleCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_recruiter)
+    current_user: Principal = Depends(require_recruiter)
 ):
     # Verify candidate exists (Frontend sends User ID)
     candidate_profile = db.query(CandidateProfile).filter(CandidateProfile.user_id == event_in.candidate_id).first()
@@ -512,7 +512,7 @@ async def schedule_event(
 @router.get("/schedules", response_model=List[ScheduledEventResponse])
 async def get_scheduled_events(
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_recruiter)
+    current_user: Principal = Depends(require_recruiter)
 ):
     events = db.query(ScheduledEvent).filter(
         ScheduledEvent.recruiter_id == current_user.id
@@ -1,8 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Body
 from sqlalchemy.orm import Session
 from core.database import get_db
-from core.auth import require_candidate
-from models.user import User
+from core.auth import require_candidate, Principal
 from models.resume import Resume
 from schemas.resume_builder import ResumeCreate, ResumeUpdate, ResumeResponse, ResumeStructure
 from services.llm_service import llm_service
@@ -15,7 +14,7 @@ router = APIRouter()
 async def save_resume(
     resume_in: ResumeCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_candidate)
+    current_user: Principal = Depends(require_candidate)
 ):
     # Check if user already has a resume
     existing_resume = db.query(Resume).filter(Resume.candidate_id == current_user.id).first()
@@ -59,7 +58,7 @@ async def save_resume(
 @router.get("/fetch", response_model=ResumeResponse)
 async def fetch_resume(
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_candidate)
+    current_user: Principal = Depends(require_candidate)
 ):
     resume = db.query(Resume).filter(Resume.candidate_id == current_user.id).first()
     if not resume:
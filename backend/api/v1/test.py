@@ -2,8 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from core.database import get_db
-from core.auth import get_current_user
-from models.user import User
+from core.auth import get_current_user, Principal
 from models.test import Test, TestAttempt
 from pydantic import BaseModel
 from datetime import datetime
@@ -31,7 +30,7 @@ class WarningLog(BaseModel):
 async def create_test(
     test: TestCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     if current_user.role != "recruiter" and current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Only recruiters can create tests")
@@ -55,7 +54,7 @@ async def create_test(
 async def start_attempt(
     data: TestAttemptStart,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     # Check if test exists
     test = db.query(Test).filter(Test.id == data.test_id).first()
@@ -89,7 +88,7 @@ async def start_attempt(
 async def log_warning(
     log: WarningLog,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     attempt = db.query(TestAttempt).filter(TestAttempt.id == log.attempt_id).first()
     if not attempt or attempt.candidate_id != current_user.id:
@@ -111,7 +110,7 @@ async def submit_test(
     attempt_id: int,
     answers: dict, # Question ID -> Answer
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     attempt = db.query(TestAttempt).filter(TestAttempt.id == attempt_id).first()
     if not attempt or attempt.candidate_id != current_user.id:
@@ -2,8 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 from core.database import get_db
-from core.auth import get_current_user
-from models.user import User
+from core.auth import get_current_user, Principal
 from models.test import Test, Question, TestAssignment, ProctorLog, TestResponse
 from core.encryption import encrypt_text, decrypt_text
 from pydantic import BaseModel
@@ -46,7 +45,7 @@ class SubmitResponseRequest(BaseModel):
 async def create_test(
     test_in: TestCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     if current_user.role != "recruiter" and current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Only recruiters can create tests")
@@ -87,7 +86,7 @@ async def create_test(
 async def assign_test(
     assign_in: AssignTestRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     if current_user.role != "recruiter" and current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Unauthorized")
@@ -117,7 +116,7 @@ async def assign_test(
 @router.get("/my-assignments")
 async def get_my_assignments(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     if current_user.role != "candidate":
         raise HTTPException(status_code=403, detail="Only candidates have assignments")
@@ -141,7 +140,7 @@ async def get_my_assignments(
 @router.get("/my-tests")
 async def get_my_tests(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     if current_user.role != "recruiter" and current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Only recruiters can view their tests")
@@ -163,7 +162,7 @@ async def get_my_tests(
 async def start_test_session(
     assignment_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     assignment = db.query(TestAssignment).filter(
         TestAssignment.id == assignment_id,
@@ -209,7 +208,7 @@ async def start_test_session(
 async def submit_test_responses(
     submit_in: SubmitResponseRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     assignment = db.query(TestAssignment).filter(
         TestAssignment.id == submit_in.assignment_id,
@@ -258,7 +257,7 @@ async def submit_test_responses(
 async def log_proctor_event(
     event: Dict[str, Any],
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     assignment_id = event.get("assignment_id")
     event_type = event.get("type")
@@ -284,7 +283,7 @@ async def log_proctor_event(
 async def get_test_results(
     test_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     if current_user.role != "recruiter" and current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Unauthorized")
@@ -320,7 +319,7 @@ async def get_test_results(
 async def get_assignment_details(
     assignment_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     if current_user.role != "recruiter" and current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Unauthorized")
@@ -0,0 +1,63 @@
+"""
+Local Judge0 stand-in for benchmarks.
+
+Implements just enough of POST /submissions?base64_encoded=true&wait=true for JudgeService:
+sleeps for a configurable latency, then "accepts" the program by echoing expected_output.
+Plug it in with:  judge_service._client = httpx.AsyncClient(transport=Judge0StubTransport(...))
+"""
+import asyncio
+import json
+import random
+import uuid
+import httpx
+
+
+class Judge0StubTransport(httpx.AsyncBaseTransport):
+    def __init__(self, latency_ms: float = 50.0, jitter_ms: float = 0.0, workers: int = 0, fail_rate: float = 0.0, seed: int = 42):
+        """
+        latency_ms/jitter_ms: simulated execution time per submission (uniform jitter +/-)
+        workers: max concurrently executing submissions (0 = unbounded), like Judge0's worker pool
+        fail_rate: fraction of submissions answered with Wrong Answer
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.fail_rate = fail_rate
+        self.workers = workers
+        self._random = random.Random(seed)
+        self._slots = None
+        self.requests = 0
+        self.peak_inflight = 0
+        self._inflight = 0
+
+    async def _execute(self):
+        delay = self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)
+        self._inflight += 1
+        self.peak_inflight = max(self.peak_inflight, self._inflight)
+        try:
+            await asyncio.sleep(max(delay, 0) / 1000.0)
+        finally:
+            self._inflight -= 1
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        body = json.loads(request.content or b"{}")
+
+        if self.workers:
+            if self._slots is None:
+                self._slots = asyncio.Semaphore(self.workers)
+            async with self._slots:
+                await self._execute()
+        else:
+            await self._execute()
+
+        passed = self._random.random() >= self.fail_rate
+        result = {
+            "stdout": body.get("expected_output") if passed else None,
+            "stderr": None,
+            "compile_output": None,
+            "time": f"{self.latency_ms / 1000.0:.3f}",
+            "memory": 3200,
+            "token": str(uuid.uuid4()),
+            "status": {"id": 3, "description": "Accepted"} if passed else {"id": 4, "description": "Wrong Answer"},
+        }
+        return httpx.Response(200, json=result, request=request)
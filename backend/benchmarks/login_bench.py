@@ -0,0 +1,250 @@
+"""
+Login throughput / event-loop lag benchmark.
+
+Run from backend/ (one command, no external services needed):
+
+    python benchmarks/login_bench.py
+    python benchmarks/login_bench.py --users 100 --rounds 12 --hash-workers 4 --mode both
+
+Modes:
+    inline - baseline: the pre-pool handler, bcrypt called synchronously inside the async route
+    pool   - the real /auth/login (core.security.password_hasher + per-IP concurrency guard)
+    both   - run both against the same users (default)
+
+All logins start at the same instant. While they run, a ticker measures event-loop lag (how late a 10 ms
+sleep wakes up) and a probe hits GET /ping, standing in for Socket.IO signaling sharing the process.
+Reports logins/s, login latency, loop lag and probe latency. A share of the users is seeded with an older
+bcrypt cost to check rehash-on-login. Pass --max-loop-lag-p99-ms to fail (exit 1) on regressions.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bcrypt
+import httpx
+
+from benchmarks.grading_soak import build_engine, free_port, summarize
+
+PASSWORD = "correct horse battery staple"
+TICK_SECONDS = 0.01
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="HireXAI login throughput / event-loop lag benchmark")
+    parser.add_argument("--mode", choices=["inline", "pool", "both"], default="both")
+    parser.add_argument("--database-url", default=None, help="Defaults to a fresh SQLite file in a temp dir")
+    parser.add_argument("--users", type=int, default=40, help="Concurrent logins (one per user)")
+    parser.add_argument("--rounds", type=int, default=12, help="BCRYPT_ROUNDS for the run")
+    parser.add_argument("--hash-workers", type=int, default=2)
+    parser.add_argument("--ips", type=int, default=0, help="Distinct client IPs (X-Forwarded-For); 0 = one per user")
+    parser.add_argument("--outdated-share", type=float, default=0.25, help="Fraction of users seeded with rounds-1")
+    parser.add_argument("--json", dest="json_path", default=None, help="Also write the report as JSON to this path")
+    parser.add_argument("--max-loop-lag-p99-ms", type=float, default=None)
+    return parser.parse_args()
+
+
+def seed(Session, args) -> List[str]:
+    from models.user import User
+
+    outdated = int(args.users * args.outdated_share)
+
+    def make_hash(i: int) -> str:
+        rounds = args.rounds - 1 if i < outdated else args.rounds
+        return bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds=rounds)).decode()
+
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 4) as pool:
+        hashes = list(pool.map(make_hash, range(args.users)))
+
+    db = Session()
+    try:
+        emails = []
+        for i, hashed in enumerate(hashes):
+            email = f"bench{i}@example.com"
+            db.add(User(email=email, hashed_password=hashed, full_name=f"Bench {i}", role="candidate", is_active=True))
+            emails.append(email)
+        db.commit()
+        return emails
+    finally:
+        db.close()
+
+
+def build_app(mode: str):
+    from fastapi import Depends, FastAPI, HTTPException
+    from fastapi.security import OAuth2PasswordRequestForm
+    from sqlalchemy.orm import Session
+    from core.database import get_db
+    from core.security import create_access_token, verify_password
+    from services.user_service import UserService
+
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    if mode == "pool":
+        from api.v1 import auth
+        app.include_router(auth.router, prefix="/api/v1/auth")
+    else:
+        @app.post("/api/v1/auth/login")
+        async def inline_login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+            # The handler as it was before the hashing pool: bcrypt runs on the event loop
+            user = UserService.get_user_by_email(db, form_data.username)
+            if not user or not verify_password(form_data.password, user.hashed_password):
+                raise HTTPException(status_code=401, detail="Incorrect username or password")
+            return {"access_token": create_access_token(subject=user.id), "token_type": "bearer"}
+    return app
+
+
+async def measure_lag(samples: List[float], stop: asyncio.Event):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK_SECONDS)
+        samples.append(max(0.0, time.perf_counter() - started - TICK_SECONDS))
+
+
+async def probe(client, latencies: List[float], stop: asyncio.Event):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get("/ping")
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(0.02)
+
+
+async def bench(mode: str, emails: List[str], args) -> Dict:
+    import uvicorn
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(build_app(mode), host="127.0.0.1", port=port, log_level="warning", lifespan="off"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    ips = args.ips or len(emails)
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    lag: List[float] = []
+    probe_latencies: List[float] = []
+    stop = asyncio.Event()
+    start = asyncio.Event()
+    limits = httpx.Limits(max_connections=len(emails) + 10)
+
+    async def login(client, i: int, email: str):
+        headers = {"X-Forwarded-For": f"10.0.{(i % ips) // 250}.{(i % ips) % 250 + 1}"}
+        await start.wait()
+        started = time.perf_counter()
+        response = await client.post("/api/v1/auth/login", data={"username": email, "password": PASSWORD}, headers=headers)
+        latencies.append(time.perf_counter() - started)
+        statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=300, limits=limits) as client:
+            await client.get("/ping")  # warm up the connection path
+            lag_task = asyncio.create_task(measure_lag(lag, stop))
+            probe_task = asyncio.create_task(probe(client, probe_latencies, stop))
+            logins = [asyncio.create_task(login(client, i, email)) for i, email in enumerate(emails)]
+            await asyncio.sleep(0.2)  # idle baseline for the ticker
+            wall_start = time.perf_counter()
+            start.set()
+            await asyncio.gather(*logins)
+            wall = time.perf_counter() - wall_start
+            stop.set()
+            await asyncio.gather(lag_task, probe_task)
+    finally:
+        server.should_exit = True
+        await server_task
+
+    ok = statuses.get("200", 0)
+    return {
+        "logins": len(emails),
+        "statuses": statuses,
+        "wall_s": round(wall, 2),
+        "logins_per_s": round(ok / wall, 1) if wall else 0.0,
+        "login_latency": summarize(latencies),
+        "loop_lag": {**summarize(lag), "p99_ms": round(sorted(lag)[int(len(lag) * 0.99) - 1] * 1000, 1) if lag else 0.0},
+        "probe_latency": summarize(probe_latencies),
+    }
+
+
+def count_outdated(Session, rounds: int) -> int:
+    from models.user import User
+
+    db = Session()
+    try:
+        return sum(1 for (h,) in db.query(User.hashed_password).all() if int(h.split("$")[2]) != rounds)
+    finally:
+        db.close()
+
+
+def print_report(report: Dict):
+    print("\n=== HireXAI login benchmark ===")
+    print(json.dumps(report["config"], indent=2))
+    for mode in ("inline", "pool"):
+        if mode not in report:
+            continue
+        r = report[mode]
+        print(f"\n--- {mode} ---")
+        print(f"wall: {r['wall_s']}s   throughput: {r['logins_per_s']} logins/s   statuses: {r['statuses']}")
+        print(f"  login     p50={r['login_latency']['p50_ms']}ms p95={r['login_latency']['p95_ms']}ms max={r['login_latency']['max_ms']}ms")
+        print(f"  loop lag  p50={r['loop_lag']['p50_ms']}ms p99={r['loop_lag']['p99_ms']}ms max={r['loop_lag']['max_ms']}ms")
+        print(f"  /ping     p50={r['probe_latency']['p50_ms']}ms p95={r['probe_latency']['p95_ms']}ms max={r['probe_latency']['max_ms']}ms")
+    if "rehash" in report:
+        print(f"\nrehash-on-login: {report['rehash']}")
+
+
+async def main(args) -> int:
+    from core.config import settings
+
+    # Must be set before api.v1.auth / core.security build their pool and guards
+    settings.BCRYPT_ROUNDS = args.rounds
+    settings.PASSWORD_HASH_WORKERS = args.hash_workers
+    settings.PASSWORD_HASH_MAX_PENDING = max(settings.PASSWORD_HASH_MAX_PENDING, args.users)
+    settings.TRUSTED_PROXY_HOPS = 1
+
+    from core.database import Base, SessionLocal
+    import models.user  # noqa: F401  (register tables)
+    import models.candidate_profile  # noqa: F401
+
+    url = args.database_url
+    if not url:
+        url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='hirexai-bench-'), 'bench.db')}"
+    engine = build_engine(url, "web", settings.DB_WEB_POOL_SIZE, settings.DB_WEB_MAX_OVERFLOW)
+    Base.metadata.create_all(bind=engine)
+    SessionLocal.configure(bind=engine)
+
+    emails = seed(SessionLocal, args)
+    report = {"config": {k: v for k, v in vars(args).items() if k != "json_path"} | {"database": url.split("@")[-1]}}
+
+    if args.mode in ("inline", "both"):
+        report["inline"] = await bench("inline", emails, args)
+    if args.mode in ("pool", "both"):
+        before = count_outdated(SessionLocal, args.rounds)
+        report["pool"] = await bench("pool", emails, args)
+        report["rehash"] = {"outdated_before": before, "outdated_after": count_outdated(SessionLocal, args.rounds)}
+    engine.dispose()
+
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+
+    failures = []
+    if args.max_loop_lag_p99_ms is not None and "pool" in report:
+        p99 = report["pool"]["loop_lag"]["p99_ms"]
+        if p99 > args.max_loop_lag_p99_ms:
+            failures.append(f"pool: loop lag p99 {p99}ms > budget {args.max_loop_lag_p99_ms}ms")
+    for failure in failures:
+        print(f"[BUDGET FAILED] {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
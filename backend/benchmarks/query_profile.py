@@ -0,0 +1,188 @@
+"""
+Per-route SQL query profile of the list endpoints that enrich rows one query at a time.
+
+Run from backend/ (one command, no external services needed):
+
+    python benchmarks/query_profile.py
+    python benchmarks/query_profile.py --rows 50 --query-budget 10 --json sql_profile.json
+
+Seeds one recruiter with --rows candidates (each applied, shortlisted and scheduled) and --rows jobs the
+first candidate applied to, then calls each route once through core.query_profiler.QueryProfilerMiddleware:
+
+    GET /api/v1/recruiter/applications/{job_id}
+    GET /api/v1/recruiter/shortlisted
+    GET /api/v1/recruiter/schedules
+    GET /api/v1/candidate/applications
+
+Reports queries, DB time and repeated statement shapes (N+1) per route. With --query-budget, exits 1 when
+any route runs more queries than that, so a CI job catches a new per-row query before a page gets slow.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from benchmarks.grading_soak import build_async_engine, build_engine
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="HireXAI per-route SQL query profile")
+    parser.add_argument("--database-url", default=None, help="Defaults to a fresh SQLite file in a temp dir")
+    parser.add_argument("--rows", type=int, default=20, help="Candidates per recruiter list / applications of one candidate")
+    parser.add_argument("--repeat-threshold", type=int, default=5, help="Same statement shape this often = N+1")
+    parser.add_argument("--query-budget", type=int, default=None, help="Fail (exit 1) when a route runs more queries")
+    parser.add_argument("--json", dest="json_path", default=None, help="Also write the report as JSON to this path")
+    return parser.parse_args()
+
+
+def seed(Session, rows: int) -> Dict[str, int]:
+    from models.application import Application
+    from models.candidate_profile import CandidateProfile
+    from models.job import Job
+    from models.scheduled_event import ScheduledEvent
+    from models.shortlisted_candidate import ShortlistedCandidate
+    from models.user import User
+
+    db = Session()
+    try:
+        recruiter = User(email="recruiter@bench.example", hashed_password="x", full_name="Bench Recruiter", role="recruiter", is_active=True)
+        db.add(recruiter)
+        db.flush()
+        jobs = [Job(title=f"Job {j}", description="d", location="Remote", skills="python", recruiter_id=recruiter.id) for j in range(rows)]
+        db.add_all(jobs)
+        db.flush()
+
+        profiles = []
+        for i in range(rows):
+            user = User(email=f"candidate{i}@bench.example", hashed_password="x", full_name=f"Candidate {i}", role="candidate", is_active=True)
+            db.add(user)
+            db.flush()
+            profile = CandidateProfile(user_id=user.id, headline="Engineer", skills=["python"], experience=[], education=[])
+            db.add(profile)
+            db.flush()
+            profiles.append(profile)
+
+            db.add(Application(job_id=jobs[0].id, candidate_id=profile.id))
+            db.add(ShortlistedCandidate(recruiter_id=recruiter.id, candidate_id=profile.id))
+            db.add(ScheduledEvent(
+                recruiter_id=recruiter.id, candidate_id=profile.id, job_id=jobs[0].id,
+                scheduled_at=datetime.utcnow() + timedelta(days=1, minutes=i)
+            ))
+
+        # The first candidate applied everywhere, for GET /candidate/applications
+        db.add_all(Application(job_id=job.id, candidate_id=profiles[0].id) for job in jobs[1:])
+        db.commit()
+        return {"recruiter_id": recruiter.id, "candidate_user_id": profiles[0].user_id, "job_id": jobs[0].id}
+    finally:
+        db.close()
+
+
+def build_app():
+    from fastapi import FastAPI
+    from api.v1 import candidate, recruiter
+    from core.config import settings
+    from core.query_profiler import QueryProfilerMiddleware
+
+    app = FastAPI()
+    app.include_router(recruiter.router, prefix=f"{settings.API_V1_STR}/recruiter")
+    app.include_router(candidate.router, prefix=f"{settings.API_V1_STR}/candidate")
+    app.add_middleware(QueryProfilerMiddleware)
+    return app
+
+
+async def profile_routes(ids: Dict[str, int]) -> Dict[str, int]:
+    from core.security import create_access_token
+
+    recruiter = {"Authorization": f"Bearer {create_access_token(subject=ids['recruiter_id'])}"}
+    candidate = {"Authorization": f"Bearer {create_access_token(subject=ids['candidate_user_id'])}"}
+    # Keyed like the profiler's report: method + route template
+    calls = [
+        ("GET /api/v1/recruiter/applications/{job_id}", f"/api/v1/recruiter/applications/{ids['job_id']}", recruiter),
+        ("GET /api/v1/recruiter/shortlisted", "/api/v1/recruiter/shortlisted", recruiter),
+        ("GET /api/v1/recruiter/schedules", "/api/v1/recruiter/schedules", recruiter),
+        ("GET /api/v1/candidate/applications", "/api/v1/candidate/applications", candidate),
+    ]
+    statuses = {}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=build_app()), base_url="http://bench") as client:
+        for route, path, headers in calls:
+            response = await client.get(path, headers=headers)
+            statuses[route] = response.status_code
+    return statuses
+
+
+def print_report(report: Dict):
+    print("\n=== HireXAI SQL query profile ===")
+    print(json.dumps(report["config"], indent=2))
+    for route, stats in report["profile"]["routes"].items():
+        print(f"\n{route}  (HTTP {report['statuses'].get(route, '-')})")
+        print(f"  queries={stats['max_queries']}  db={stats['max_db_ms']}ms  budget={stats['budget']}")
+        for repeated in stats["n_plus_one"]:
+            print(f"  N+1 x{repeated['max_repeats']}: {repeated['statement'][:160]}")
+
+
+def check_budgets(report: Dict) -> List[str]:
+    return [
+        f"{route}: {stats['max_queries']} queries > budget {stats['budget']}"
+        for route, stats in report["profile"]["routes"].items() if stats["over_budget"]
+    ]
+
+
+async def main(args) -> int:
+    from core.database import AsyncSessionLocal, Base, SessionLocal
+    from core.query_profiler import query_profiler
+    import models.user  # noqa: F401  (register tables)
+    import models.candidate_profile  # noqa: F401
+    import models.job  # noqa: F401
+    import models.application  # noqa: F401
+    import models.resume  # noqa: F401
+    import models.scheduled_event  # noqa: F401
+    import models.shortlisted_candidate  # noqa: F401
+
+    url = args.database_url
+    if not url:
+        url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='hirexai-bench-'), 'bench.db')}"
+    engine = build_engine(url, "web", 5, 5)
+    async_engine = build_async_engine(url)
+    Base.metadata.create_all(bind=engine)
+    SessionLocal.configure(bind=engine)
+    AsyncSessionLocal.configure(bind=async_engine)
+
+    ids = seed(SessionLocal, args.rows)
+
+    query_profiler.repeat_threshold = args.repeat_threshold
+    query_profiler.query_budget = args.query_budget or 0
+    query_profiler.route_budgets = {}
+    query_profiler.fail_on_budget = False  # report every route instead of failing the first one
+    query_profiler.install()
+    statuses = await profile_routes(ids)
+
+    report = {
+        "config": {k: v for k, v in vars(args).items() if k != "json_path"} | {"database": url.split("@")[-1]},
+        "statuses": statuses,
+        "profile": query_profiler.report(),
+    }
+    engine.dispose()
+    await async_engine.dispose()
+
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+
+    failures = check_budgets(report)
+    failures += [f"{route}: HTTP {status}" for route, status in statuses.items() if status != 200]
+    for failure in failures:
+        print(f"[BUDGET FAILED] {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
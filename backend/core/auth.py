@@ -1,57 +1,69 @@
+from contextvars import ContextVar
+from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
+from jose import JWTError
 from sqlalchemy.orm import Session
 from core.config import settings
+from core.security import decode_access_token
 from core.exceptions import AuthError, PermissionDeniedError
 from core.database import get_db
 from models.user import User
-from services.user_service import UserService
+from services.principal_cache import Principal, principal_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
-) -> User:
+# The authenticated caller of the current request, for code that can't take the dependency (see core.db_router)
+current_user_id: ContextVar[Optional[int]] = ContextVar("current_user_id", default=None)
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> Principal:
+    """
+    Resolves the bearer token to a cached Principal (id, email, role, is_active).
+    No DB session is opened on a cache hit; handlers needing the ORM User use get_current_user_model.
+    """
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id: str = payload.get("sub")
-        token_type: str = payload.get("type")
-        
-        if user_id is None or token_type != "access":
-            raise AuthError("Invalid token")
-            
-    except JWTError:
+        user_id = int(decode_access_token(token)["sub"])
+    except (JWTError, KeyError, TypeError, ValueError):
         raise AuthError("Could not validate credentials")
-        
-    user = UserService.get_user_by_id(db, int(user_id))
+
+    user = await principal_cache.get(user_id)
     if not user:
         raise AuthError("User not found")
-        
+
     if not user.is_active:
         raise AuthError("Inactive user")
-        
+
+    current_user_id.set(user.id)
+    return user
+
+def get_current_user_model(
+    principal: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> User:
+    """Full ORM User for the caller (one query). Only for handlers that need more than the Principal."""
+    user = principal.load(db)
+    if not user:
+        raise AuthError("User not found")
     return user
 
 def require_role(role: str):
-    def role_checker(current_user: User = Depends(get_current_user)):
+    async def role_checker(current_user: Principal = Depends(get_current_user)):
         if current_user.role != role and current_user.role != "admin":
             raise PermissionDeniedError(f"Role {role} required")
         return current_user
     return role_checker
 
-def require_candidate(current_user: User = Depends(get_current_user)):
+async def require_candidate(current_user: Principal = Depends(get_current_user)):
     if current_user.role != "candidate" and current_user.role != "admin":
         raise PermissionDeniedError("Candidate role required")
     return current_user
 
-def require_recruiter(current_user: User = Depends(get_current_user)):
+async def require_recruiter(current_user: Principal = Depends(get_current_user)):
     if current_user.role != "recruiter" and current_user.role != "admin":
         raise PermissionDeniedError("Recruiter role required")
     return current_user
 
-def require_admin(current_user: User = Depends(get_current_user)):
+async def require_admin(current_user: Principal = Depends(get_current_user)):
     if current_user.role != "admin":
         raise PermissionDeniedError("Admin role required")
     return current_user
@@ -1,5 +1,5 @@
 import os
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Union
 from pydantic import AnyHttpUrl, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -38,6 +38,39 @@ class Settings(BaseSettings):
         print("[WARNING] No Supabase or PostgreSQL URL found. Using SQLite for development.")
         return "sqlite:///./hirexai.db"
 
+    # Connection pools, one per workload so they can't starve each other (see core.db_pool).
+    # web: sync get_db routes; web_async: get_async_db routes; worker: grading + retention;
+    # realtime: Socket.IO handlers and the proctor log buffer.
+    DB_WEB_POOL_SIZE: int = 3
+    DB_WEB_MAX_OVERFLOW: int = 5
+    DB_WEB_ASYNC_POOL_SIZE: int = 5
+    DB_WEB_ASYNC_MAX_OVERFLOW: int = 10
+    DB_WORKER_POOL_SIZE: int = 2
+    DB_WORKER_MAX_OVERFLOW: int = 3
+    DB_REALTIME_POOL_SIZE: int = 2
+    DB_REALTIME_MAX_OVERFLOW: int = 3
+    DB_POOL_TIMEOUT_SECONDS: float = 30
+    DB_POOL_RECYCLE_SECONDS: int = 3600  # important for Supabase, which drops idle connections
+    # Pre-ping costs a round-trip on every checkout; the interval liveness check replaces it by default
+    DB_POOL_PRE_PING: bool = False
+    DB_POOL_LIVENESS_INTERVAL_SECONDS: float = 30  # 0 disables
+
+    # Optional read replica for read-heavy endpoints (dashboards, job listings, search, notification reads).
+    # See core.db_router: a user's own writes pin their reads to the primary for
+    # DB_REPLICA_READ_YOUR_WRITES_SECONDS, and an unreachable replica is skipped for DB_REPLICA_RETRY_SECONDS.
+    DATABASE_REPLICA_URL: Optional[str] = None
+    DB_REPLICA_POOL_SIZE: int = 3
+    DB_REPLICA_MAX_OVERFLOW: int = 5
+    DB_REPLICA_CONNECT_TIMEOUT_SECONDS: int = 3
+    DB_REPLICA_READ_YOUR_WRITES_SECONDS: float = 5
+    DB_REPLICA_RETRY_SECONDS: float = 30
+
+    @field_validator("DATABASE_REPLICA_URL", mode="before")
+    def normalize_replica_url(cls, v: Optional[str]) -> Optional[str]:
+        if isinstance(v, str) and v.startswith("postgres://"):
+            return v.replace("postgres://", "postgresql://", 1)
+        return v or None
+
     @field_validator("BACKEND_CORS_ORIGINS", mode="before")
     def assemble_cors_origins(cls, v: Union[str, List[str]]) -> List[str]:
         if isinstance(v, str) and not v.startswith("["):
@@ -57,6 +90,14 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # bcrypt cost; existing hashes with a different cost are transparently rehashed on next login
+    BCRYPT_ROUNDS: int = 12
+    # Password hashing runs in its own thread pool so logins never block the event loop
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 64  # queued + running; beyond this /login and /register return 429
+    AUTH_MAX_CONCURRENT_PER_IP: int = 2  # 0 disables; also off outside development while TRUSTED_PROXY_HOPS is 0
+    # Reverse proxies in front of the app (Render, nginx): client IP is taken from X-Forwarded-For this many hops back
+    TRUSTED_PROXY_HOPS: int = 0
     
     # LLM Configuration
     GROQ_API_KEY: Optional[str] = None
@@ -66,6 +107,47 @@ class Settings(BaseSettings):
     TESTS_AES_KEY: Optional[str] = None
     JUDGE0_API_URL: str = "https://judge0-ce.p.rapidapi.com"
     JUDGE0_API_KEY: Optional[str] = None
+    # Max decrypted question payloads kept in process memory (problem + hidden count separately)
+    QUESTION_PAYLOAD_CACHE_SIZE: int = 1024
+
+    # Realtime (Socket.IO) shared state: "memory" (single worker) or "redis" (multi-worker / multi-node)
+    REALTIME_BACKEND: str = "memory"
+    REDIS_URL: Optional[str] = None
+
+    # Socket.IO proctor events are buffered and bulk-inserted (whichever limit is hit first triggers a flush)
+    PROCTOR_LOG_FLUSH_INTERVAL_MS: int = 500
+    PROCTOR_LOG_BATCH_SIZE: int = 500
+    PROCTOR_LOG_MAX_PENDING: int = 10000
+
+    # proctor_logs retention (services/proctor_retention.py): raw events older than this many days are
+    # archived as gzipped JSON lines, rolled up into proctor_log_rollups and deleted (0 = keep forever)
+    PROCTOR_LOG_RETENTION_DAYS: int = 180
+    PROCTOR_LOG_ARCHIVE_DIR: str = "archives/proctor_logs"
+    # Supabase Storage bucket the archive files are also uploaded to (use when local disk is ephemeral)
+    PROCTOR_LOG_ARCHIVE_BUCKET: Optional[str] = None
+    # Raw rows are only exported and deleted when there is a bucket to upload to. Set this on hosts whose
+    # PROCTOR_LOG_ARCHIVE_DIR is persistent to accept the local file as the only copy.
+    PROCTOR_LOG_ALLOW_LOCAL_ARCHIVE_ONLY: bool = False
+    PROCTOR_LOG_RETENTION_INTERVAL_HOURS: float = 24
+    # Postgres: monthly proctor_logs partitions kept created ahead of time
+    PROCTOR_LOG_PARTITIONS_AHEAD: int = 3
+
+    # When set, GET /metrics requires the header X-Metrics-Token with this value. Unset, /metrics is
+    # only served when ENVIRONMENT is development (404 otherwise)
+    METRICS_TOKEN: Optional[str] = None
+
+    # SQL query profiler (core/query_profiler.py), for development/staging and CI: per-request query count
+    # and time headers, N+1 detection and per-route query budgets. Adds a hook to every DB round-trip.
+    SQL_PROFILER_ENABLED: bool = False
+    # The same statement shape this many times in one request is reported as N+1
+    SQL_PROFILER_REPEAT_THRESHOLD: int = 5
+    # Max queries per request (0 = no budget); per-route overrides as JSON, e.g. {"GET /api/v1/recruiter/shortlisted": 4}
+    SQL_PROFILER_QUERY_BUDGET: int = 0
+    SQL_PROFILER_ROUTE_BUDGETS: Dict[str, int] = {}
+    # CI: answer over-budget requests with a 500 so the test run fails
+    SQL_PROFILER_FAIL_ON_BUDGET: bool = False
+    # Per-route report written here (JSON) on shutdown
+    SQL_PROFILER_REPORT_PATH: Optional[str] = None
 
     # Supabase Configuration
     SUPABASE_URL: Optional[str] = None
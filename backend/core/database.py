@@ -1,31 +1,51 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from core.config import settings
+from core.db_pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool, instrument
 
 # Configure engine based on database type
-connect_args = {}
-pool_pre_ping = True  # Enable connection health checks
-
-if settings.DATABASE_URL.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
-    pool_pre_ping = True
-elif settings.DATABASE_URL.startswith("postgresql"):
-    # Supabase-specific SSL configuration
-    connect_args = {
-        "connect_timeout": 10,
-        "options": "-c timezone=utc"
+def connect_args_for(url: str, connect_timeout: int = 10) -> dict:
+    if url.startswith("sqlite"):
+        return {"check_same_thread": False}
+    if url.startswith("postgresql"):
+        # Supabase-specific SSL configuration
+        return {
+            "connect_timeout": connect_timeout,
+            "options": "-c timezone=utc"
+        }
+    return {}
+
+def pool_options(pool_size: int, max_overflow: int) -> dict:
+    """Shared pool settings; sizes are per workload (DB_<WORKLOAD>_POOL_SIZE / _MAX_OVERFLOW)."""
+    return {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,  # Supabase drops long-idle connections
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,  # Off by default: core.db_pool.pool_liveness pings idle pools instead
     }
 
-engine = create_engine(
-    settings.DATABASE_URL, 
-    connect_args=connect_args,
-    pool_pre_ping=pool_pre_ping,  # Test connections before using them
-    pool_size=5,  # Connection pool size (adjust based on your needs)
-    max_overflow=10,  # Max overflow connections
-    pool_recycle=3600,  # Recycle connections after 1 hour (important for Supabase)
-    echo=False  # Set to True for SQL query debugging
-)
+def build_engine(name: str, pool_size: int, max_overflow: int, url: str = settings.DATABASE_URL, connect_timeout: int = 10, **options):
+    return instrument(name, create_engine(
+        url,
+        connect_args=connect_args_for(url, connect_timeout),
+        poolclass=InstrumentedQueuePool,
+        echo=False,  # Set to True for SQL query debugging
+        **{**pool_options(pool_size, max_overflow), **options}
+    ))
+
+# Separate pools so a grading burst or a Socket.IO storm can't take every connection from HTTP requests
+engine = build_engine("web", settings.DB_WEB_POOL_SIZE, settings.DB_WEB_MAX_OVERFLOW)
+worker_engine = build_engine("worker", settings.DB_WORKER_POOL_SIZE, settings.DB_WORKER_MAX_OVERFLOW)
+realtime_engine = build_engine("realtime", settings.DB_REALTIME_POOL_SIZE, settings.DB_REALTIME_MAX_OVERFLOW)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Grading worker and proctor log retention
+WorkerSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=worker_engine)
+# Socket.IO handlers and the proctor log buffer (asyncio.to_thread)
+RealtimeSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=realtime_engine)
 Base = declarative_base()
 
 # Dependency
@@ -35,3 +55,68 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Async engine for the hot async routes (assignments, proctoring, notifications, candidate applications).
+# Same database, non-blocking drivers: queries are awaited instead of stalling the event loop shared with sio.
+def async_database_url(url: str):
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite")
+    if url.get_backend_name() == "postgresql":
+        # asyncpg spells libpq's sslmode as ssl
+        query = dict(url.query)
+        if "sslmode" in query:
+            query["ssl"] = query.pop("sslmode")
+        return url.set(drivername="postgresql+asyncpg", query=query)
+    return url
+
+def async_connect_args_for(url: str, connect_timeout: int = 10) -> dict:
+    if not url.startswith("postgresql"):
+        return {}
+    connect_args = {
+        "timeout": connect_timeout,
+        "server_settings": {"timezone": "utc"},
+    }
+    if make_url(url).port == 6543:
+        # Supabase transaction pooler (PgBouncer) can't keep asyncpg's per-connection prepared statements
+        connect_args["statement_cache_size"] = 0
+    return connect_args
+
+def build_async_engine(name: str, pool_size: int, max_overflow: int, url: str = settings.DATABASE_URL, connect_timeout: int = 10, **options):
+    return instrument(name, create_async_engine(
+        async_database_url(url),
+        connect_args=async_connect_args_for(url, connect_timeout),
+        poolclass=InstrumentedAsyncQueuePool,
+        echo=False,
+        **{**pool_options(pool_size, max_overflow), **options}
+    ))
+
+async_engine = build_async_engine("web_async", settings.DB_WEB_ASYNC_POOL_SIZE, settings.DB_WEB_ASYNC_MAX_OVERFLOW)
+# expire_on_commit=False: attribute access after commit would otherwise need an implicit (forbidden) async load
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Optional read replica for read-heavy endpoints; routing, read-your-writes and failover live in core.db_router.
+# Pre-ping stays on here: a dead replica connection must fail at checkout, where the router can still fall back.
+replica_engine = None
+async_replica_engine = None
+ReplicaSessionLocal = None
+AsyncReplicaSessionLocal = None
+if settings.DATABASE_REPLICA_URL:
+    replica_engine = build_engine(
+        "replica", settings.DB_REPLICA_POOL_SIZE, settings.DB_REPLICA_MAX_OVERFLOW,
+        url=settings.DATABASE_REPLICA_URL, connect_timeout=settings.DB_REPLICA_CONNECT_TIMEOUT_SECONDS,
+        pool_pre_ping=True
+    )
+    async_replica_engine = build_async_engine(
+        "replica_async", settings.DB_REPLICA_POOL_SIZE, settings.DB_REPLICA_MAX_OVERFLOW,
+        url=settings.DATABASE_REPLICA_URL, connect_timeout=settings.DB_REPLICA_CONNECT_TIMEOUT_SECONDS,
+        pool_pre_ping=True
+    )
+    ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+    AsyncReplicaSessionLocal = async_sessionmaker(async_replica_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
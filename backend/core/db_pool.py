@@ -0,0 +1,192 @@
+"""
+Instrumented connection pools and the pool liveness check.
+
+Every engine in core.database gets its own pool (web, web_async, worker, realtime) built from
+InstrumentedQueuePool / InstrumentedAsyncQueuePool. They time each checkout, so a starving workload
+shows up as checkout wait on /metrics instead of as unexplained latency.
+
+Pre-ping (one extra round-trip per checkout) is off by default. PoolLivenessCheck instead pings each
+pool that has idle connections every DB_POOL_LIVENESS_INTERVAL_SECONDS. When the ping finds a dead
+connection, SQLAlchemy's disconnect handling invalidates the whole pool, so every connection opened
+before the failure is replaced on its next checkout.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Union
+from sqlalchemy import exc, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from core.config import settings
+from core.logging import get_logger
+
+logger = get_logger()
+
+SLOW_CHECKOUT_SECONDS = 0.1
+
+
+class PoolMetrics:
+    """Checkout counters and a rolling window of checkout waits for one pool."""
+
+    WINDOW = 1000
+
+    def __init__(self, name: str):
+        self.name = name
+        self.checkouts = 0
+        self.slow_checkouts = 0
+        self.timeouts = 0
+        self.peak_in_use = 0
+        self.liveness: Optional[Dict[str, Any]] = None
+        self._waits = deque(maxlen=self.WINDOW)
+        self._lock = threading.Lock()
+
+    def record_checkout(self, waited: float, in_use: int):
+        with self._lock:
+            self.checkouts += 1
+            if waited >= SLOW_CHECKOUT_SECONDS:
+                self.slow_checkouts += 1
+            self.peak_in_use = max(self.peak_in_use, in_use)
+            self._waits.append(waited)
+
+    def record_timeout(self, waited: float):
+        with self._lock:
+            self.timeouts += 1
+            self._waits.append(waited)
+
+    def snapshot(self, pool) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._waits)
+            counters = {
+                "checkouts": self.checkouts,
+                "slow_checkouts": self.slow_checkouts,
+                "timeouts": self.timeouts,
+                "peak_in_use": self.peak_in_use,
+            }
+
+        def pct(p: float) -> float:
+            return round(waits[min(len(waits) - 1, int(len(waits) * p))] * 1000, 2) if waits else 0.0
+
+        return {
+            "size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "in_use": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            **counters,
+            "wait_ms": {"p50": pct(0.5), "p95": pct(0.95), "p99": pct(0.99), "max": round(waits[-1] * 1000, 2) if waits else 0.0},
+            "liveness": self.liveness,
+        }
+
+
+class _InstrumentedPool:
+    metrics: Optional[PoolMetrics] = None
+
+    def connect(self):
+        if self.metrics is None:
+            return super().connect()
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.record_timeout(time.perf_counter() - started)
+            raise
+        self.metrics.record_checkout(time.perf_counter() - started, self.checkedout())
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep counting into the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPool, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPool, AsyncAdaptedQueuePool):
+    pass
+
+
+_engines: Dict[str, Union[Engine, AsyncEngine]] = {}
+
+
+def instrument(name: str, engine: Union[Engine, AsyncEngine]):
+    """Attaches PoolMetrics to the engine's pool and registers it for pool_stats() and the liveness check."""
+    pool = engine.pool
+    if isinstance(pool, _InstrumentedPool):
+        pool.metrics = PoolMetrics(name)
+    _engines[name] = engine
+    return engine
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Per-pool snapshot served on GET /metrics. Counters are per worker process."""
+    stats = {}
+    for name, engine in _engines.items():
+        pool = engine.pool
+        if isinstance(pool, _InstrumentedPool) and pool.metrics is not None:
+            stats[name] = pool.metrics.snapshot(pool)
+    return stats
+
+
+def _ping(engine: Engine):
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+async def _ping_async(engine: AsyncEngine):
+    async with engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
+
+
+class PoolLivenessCheck:
+    def __init__(self, interval_seconds: float):
+        self.interval = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self.interval > 0 and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    async def check(self):
+        for name, engine in list(_engines.items()):
+            pool = engine.pool
+            # Checked-out connections are in use and fine; only idle ones can go stale unnoticed
+            if not isinstance(pool, QueuePool) or pool.checkedin() == 0:
+                continue
+            started = time.perf_counter()
+            try:
+                if isinstance(engine, AsyncEngine):
+                    await _ping_async(engine)
+                else:
+                    await asyncio.to_thread(_ping, engine)
+                result = {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000, 2)}
+            except Exception as e:
+                logger.warning(f"⚠️ DB pool '{name}' liveness check failed: {e}")
+                result = {"ok": False, "error": str(e)[:200]}
+            if isinstance(pool, _InstrumentedPool) and pool.metrics is not None:
+                pool.metrics.liveness = {**result, "at": datetime.now(timezone.utc).isoformat()}
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check()
+            except Exception as e:
+                logger.error(f"❌ DB pool liveness check crashed: {e}")
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+pool_liveness = PoolLivenessCheck(interval_seconds=settings.DB_POOL_LIVENESS_INTERVAL_SECONDS)
@@ -0,0 +1,272 @@
+"""
+Read-replica routing for read-heavy endpoints.
+
+Endpoints that only read (dashboards, job listings, search, notification reads) take get_read_db /
+get_async_read_db instead of get_db / get_async_db. With DATABASE_REPLICA_URL set, their session is
+bound to the replica unless:
+  - the caller committed a write in the last DB_REPLICA_READ_YOUR_WRITES_SECONDS (read-your-writes:
+    the replica may not have replayed it yet), or
+  - the replica failed to hand out a connection in the last DB_REPLICA_RETRY_SECONDS.
+A replica connection is checked out (and pre-pinged) before the handler runs, so an unreachable
+replica costs one connect timeout and the request is served from the primary instead of failing.
+Without a replica both dependencies are plain primary sessions.
+
+Writes are noticed from Session events (flushes and ORM bulk insert/update/delete) and attributed to
+core.auth.current_user_id when the transaction commits. Raw text() statements are not seen.
+ReadYourWritesMiddleware records the write mark before the response starts, so the caller's next
+request sees it. Marks live in a WriteMarkStore: Redis when REALTIME_BACKEND=redis, shared by every
+worker like the rate limiter, else in memory (only correct with a single worker). When the store
+can't be reached, reads go to the primary: an unknown mark is treated as a recent write.
+"""
+import time
+from abc import ABC, abstractmethod
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+from fastapi import Depends
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from core import database
+from core.auth import Principal, current_user_id, get_current_user
+from core.config import settings
+from core.logging import get_logger
+
+logger = get_logger()
+
+
+class WriteMarkStore(ABC):
+    """Interface for per-user "wrote recently" marks that expire after `seconds`."""
+
+    @abstractmethod
+    async def mark(self, user_id: int, seconds: float):
+        ...
+
+    @abstractmethod
+    async def recent(self, user_id: int) -> bool:
+        ...
+
+
+class InMemoryWriteMarkStore(WriteMarkStore):
+    MAX_TRACKED_WRITERS = 50000
+
+    def __init__(self):
+        self._expires: Dict[int, float] = {}
+
+    async def mark(self, user_id: int, seconds: float):
+        now = time.monotonic()
+        if len(self._expires) >= self.MAX_TRACKED_WRITERS:
+            for uid in [u for u, until in self._expires.items() if until <= now]:
+                del self._expires[uid]
+        self._expires[user_id] = now + seconds
+
+    async def recent(self, user_id: int) -> bool:
+        until = self._expires.get(user_id)
+        return until is not None and time.monotonic() < until
+
+
+class RedisWriteMarkStore(WriteMarkStore):
+    def __init__(self, url: str, prefix: str = "hirex:db_router:wrote"):
+        import redis.asyncio as aioredis  # optional dependency, only needed for this backend
+
+        self._redis = aioredis.from_url(url, decode_responses=True)
+        self._prefix = prefix
+
+    async def mark(self, user_id: int, seconds: float):
+        await self._redis.set(f"{self._prefix}:{user_id}", 1, px=max(1, int(seconds * 1000)))
+
+    async def recent(self, user_id: int) -> bool:
+        return bool(await self._redis.exists(f"{self._prefix}:{user_id}"))
+
+
+def build_write_mark_store() -> WriteMarkStore:
+    from services.room_state import redis_configured
+
+    if redis_configured():
+        return RedisWriteMarkStore(settings.REDIS_URL)
+    return InMemoryWriteMarkStore()
+
+
+class ReplicaRouter:
+    def __init__(self, store: WriteMarkStore, read_your_writes_seconds: float, retry_seconds: float):
+        self.store = store
+        self.read_your_writes = read_your_writes_seconds
+        self.retry = retry_seconds
+        self._down_until = 0.0
+        self._marks_unknown_until = 0.0
+        self.reads = {"replica": 0, "primary_recent_write": 0, "primary_replica_down": 0, "primary_marks_unknown": 0}
+        self.failovers = 0
+        self.last_error: Optional[str] = None
+        self.mark_errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return database.ReplicaSessionLocal is not None
+
+    async def note_write(self, user_id: int):
+        try:
+            await self.store.mark(user_id, self.read_your_writes)
+        except Exception as e:
+            # This write may be invisible to other workers: keep this worker's reads on the primary
+            # for the window, and the store check below does the same on workers that can't reach it
+            self._marks_unknown_until = time.monotonic() + self.read_your_writes
+            self.mark_errors += 1
+            logger.warning(f"⚠️ Could not record write mark for user {user_id}: {e}")
+
+    async def use_replica(self, user_id: Optional[int]) -> bool:
+        if not self.enabled:
+            return False
+        now = time.monotonic()
+        if now < self._down_until:
+            self.reads["primary_replica_down"] += 1
+            return False
+        if now < self._marks_unknown_until:
+            self.reads["primary_marks_unknown"] += 1
+            return False
+        if user_id is None:
+            return True
+        try:
+            recent = await self.store.recent(user_id)
+        except Exception as e:
+            self.reads["primary_marks_unknown"] += 1
+            self.last_error = str(e)[:200]
+            return False
+        if recent:
+            self.reads["primary_recent_write"] += 1
+            return False
+        return True
+
+    def mark_down(self, error: Exception):
+        self._down_until = time.monotonic() + self.retry
+        self.failovers += 1
+        self.last_error = str(error)[:200]
+        logger.warning(f"⚠️ Read replica unavailable, reading from the primary for {self.retry:.0f}s: {self.last_error}")
+
+    def session(self, use_replica: bool) -> Session:
+        """Blocking (connects to the replica); get_read_db runs it in the threadpool."""
+        if use_replica:
+            db = database.ReplicaSessionLocal()
+            try:
+                db.connection()
+                self.reads["replica"] += 1
+                return db
+            except exc.DBAPIError as e:
+                db.close()
+                self.mark_down(e)
+                self.reads["primary_replica_down"] += 1
+        return database.SessionLocal()
+
+    async def async_session(self, use_replica: bool) -> AsyncSession:
+        if use_replica:
+            db = database.AsyncReplicaSessionLocal()
+            try:
+                await db.connection()
+                self.reads["replica"] += 1
+                return db
+            except exc.DBAPIError as e:
+                await db.close()
+                self.mark_down(e)
+                self.reads["primary_replica_down"] += 1
+        return database.AsyncSessionLocal()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "available": time.monotonic() >= self._down_until,
+            "reads": dict(self.reads),
+            "failovers": self.failovers,
+            "last_error": self.last_error,
+            "write_marks": type(self.store).__name__,
+            "write_mark_errors": self.mark_errors,
+        }
+
+
+replica_router = ReplicaRouter(
+    build_write_mark_store(),
+    read_your_writes_seconds=settings.DB_REPLICA_READ_YOUR_WRITES_SECONDS,
+    retry_seconds=settings.DB_REPLICA_RETRY_SECONDS,
+)
+
+
+# Dependencies
+async def get_read_db(current_user: Principal = Depends(get_current_user)):
+    use_replica = await replica_router.use_replica(current_user.id)
+    db = await run_in_threadpool(replica_router.session, use_replica)
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_read_db(current_user: Principal = Depends(get_current_user)):
+    db = await replica_router.async_session(await replica_router.use_replica(current_user.id))
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+class _RequestWrites:
+    """Writes committed while serving one request. Shared by reference with threadpool copies of the context."""
+
+    def __init__(self):
+        self.user_ids = set()
+
+
+_request_writes: ContextVar[Optional[_RequestWrites]] = ContextVar("db_router_request_writes", default=None)
+
+
+class ReadYourWritesMiddleware:
+    """Records the caller's write mark before the response starts (and again for writes after it, e.g. BackgroundTasks)."""
+
+    def __init__(self, app, router: ReplicaRouter = replica_router):
+        self.app = app
+        self.router = router
+
+    async def _flush(self, writes: _RequestWrites):
+        user_ids, writes.user_ids = writes.user_ids, set()
+        for user_id in user_ids:
+            await self.router.note_write(user_id)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        writes = _RequestWrites()
+        token = _request_writes.set(writes)
+
+        async def send_after_marking(message):
+            if message["type"] == "http.response.start" and writes.user_ids:
+                await self._flush(writes)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_after_marking)
+        finally:
+            _request_writes.reset(token)
+            if writes.user_ids:
+                await self._flush(writes)
+
+
+_WROTE_KEY = "db_router_wrote"
+
+if settings.DATABASE_REPLICA_URL:
+    @event.listens_for(Session, "after_flush")
+    def _flushed(session, flush_context):
+        session.info[_WROTE_KEY] = True
+
+    @event.listens_for(Session, "do_orm_execute")
+    def _bulk_write(orm_execute_state):
+        if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+            orm_execute_state.session.info[_WROTE_KEY] = True
+
+    @event.listens_for(Session, "after_commit")
+    def _committed(session):
+        user_id = current_user_id.get()
+        writes = _request_writes.get()
+        if session.info.pop(_WROTE_KEY, False) and user_id is not None and writes is not None:
+            writes.user_ids.add(user_id)
+
+    @event.listens_for(Session, "after_soft_rollback")
+    def _rolled_back(session, previous_transaction):
+        session.info.pop(_WROTE_KEY, None)
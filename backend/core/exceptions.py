@@ -1,3 +1,4 @@
+import math
 from fastapi import HTTPException, status
 
 class AuthError(HTTPException):
@@ -19,3 +20,11 @@ class ValidationError(HTTPException):
 class LLMError(HTTPException):
     def __init__(self, detail: str = "LLM processing failed"):
         super().__init__(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=detail)
+
+class RateLimitedError(HTTPException):
+    def __init__(self, detail: str = "Too many requests", retry_after: float = 1):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=detail,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
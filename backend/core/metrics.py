@@ -0,0 +1,153 @@
+"""
+Lightweight in-process metrics (no external dependency).
+
+Per-event counters and fixed-bucket latency histograms. Recording is a few integer
+increments, cheap enough for hot Socket.IO relay paths. Values are per worker process.
+"""
+import bisect
+import functools
+import time
+from typing import Any, Dict, List, Optional
+
+# Upper bounds in milliseconds; the last bucket is +Inf
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class LatencyHistogram:
+    __slots__ = ("counts", "count", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.counts: List[int] = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket containing the q-th percentile (q in 0..1)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return LATENCY_BUCKETS_MS[i] if i < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else None,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+class RateWindow:
+    """Events per second over the last WINDOW_SECONDS, in one-second slots."""
+
+    WINDOW_SECONDS = 61  # 60 complete seconds + the one in progress
+    __slots__ = ("slots", "seconds")
+
+    def __init__(self):
+        self.slots: List[int] = [0] * self.WINDOW_SECONDS
+        self.seconds: List[int] = [0] * self.WINDOW_SECONDS
+
+    def add(self, now: float):
+        second = int(now)
+        i = second % self.WINDOW_SECONDS
+        if self.seconds[i] != second:
+            self.seconds[i] = second
+            self.slots[i] = 0
+        self.slots[i] += 1
+
+    def rate(self, now: float, span: int) -> float:
+        """Average events/second over the last `span` complete seconds."""
+        current = int(now)
+        total = sum(n for n, sec in zip(self.slots, self.seconds) if 0 < current - sec <= span)
+        return round(total / span, 3)
+
+
+class Gauge:
+    __slots__ = ("value", "peak")
+
+    def __init__(self):
+        self.value = 0
+        self.peak = 0
+
+    def inc(self):
+        self.value += 1
+        if self.value > self.peak:
+            self.peak = self.value
+
+    def dec(self):
+        self.value = max(0, self.value - 1)
+
+
+class EventMetrics:
+    """Per event type: handled count, error count, recent rate and latency."""
+
+    def __init__(self):
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.latency: Dict[str, LatencyHistogram] = {}
+        self.rates: Dict[str, RateWindow] = {}
+
+    def record(self, event: str, ms: float, ok: bool = True):
+        self.counts[event] = self.counts.get(event, 0) + 1
+        if not ok:
+            self.errors[event] = self.errors.get(event, 0) + 1
+        histogram = self.latency.get(event)
+        if histogram is None:
+            histogram = self.latency[event] = LatencyHistogram()
+            self.rates[event] = RateWindow()
+        histogram.observe(ms)
+        self.rates[event].add(time.time())
+
+    def instrumented(self, event: Optional[str] = None):
+        """Decorator for async handlers: counts calls and records latency (apply below @sio.event)."""
+        def decorator(handler):
+            name = event or handler.__name__
+
+            @functools.wraps(handler)
+            async def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                ok = False
+                try:
+                    result = await handler(*args, **kwargs)
+                    ok = True
+                    return result
+                finally:
+                    self.record(name, (time.perf_counter() - started) * 1000.0, ok)
+            return wrapper
+        return decorator
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            event: {
+                "count": count,
+                "errors": self.errors.get(event, 0),
+                "per_second_10s": self.rates[event].rate(now, 10),
+                "per_second_60s": self.rates[event].rate(now, 60),
+                "latency": self.latency[event].snapshot(),
+            }
+            for event, count in sorted(self.counts.items())
+        }
+
+
+# Socket.IO handler metrics (signaling relay, rooms, proctoring, whiteboard)
+sio_event_metrics = EventMetrics()
+# Time spent in sio.emit per outgoing event name
+sio_emit_metrics = EventMetrics()
+# Live Socket.IO connections on this worker
+sio_connections = Gauge()
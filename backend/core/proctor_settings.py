@@ -25,6 +25,12 @@ class ProctorSettings:
     # Default: True
     TERMINATE_ON_CRITICAL = True
 
+    # --- Event Rate Limits (token buckets, see core/rate_limit.py) ---
+    # Socket.IO proctor_event: burst size per socket, refilled over 10 seconds.
+    SOCKET_EVENTS_PER_10S = 20
+    # HTTP /proctoring/log: burst size per candidate + assignment, refilled over a minute.
+    HTTP_LOG_EVENTS_PER_MINUTE = 60
+
     # --- Severity Overrides (Optional) ---
     # You can toggle specific checks effectively off by ignoring them or setting high limits
     # but actual event logic is in proctoring.py. These control the decision thresholds.
@@ -0,0 +1,280 @@
+"""
+SQL query profiler for development and staging (SQL_PROFILER_ENABLED).
+
+QueryProfilerMiddleware opens a QueryProfile per HTTP request; engine-wide before/after_cursor_execute
+hooks record every statement executed while it is active, on any engine (sync or async, any pool) and in
+any thread the request hands work to (the threadpool and asyncio.to_thread copy the request context).
+Recording stops when the response starts, so BackgroundTasks are not billed to the route.
+
+Per request:
+  - X-DB-Query-Count / X-DB-Query-Time-Ms / X-DB-N-Plus-One response headers;
+  - N+1 detection: the same statement shape (whitespace and IN-lists collapsed) executed
+    SQL_PROFILER_REPEAT_THRESHOLD times or more, logged with the offending statement;
+  - query budget: SQL_PROFILER_ROUTE_BUDGETS["GET /api/v1/..."], else SQL_PROFILER_QUERY_BUDGET.
+    With SQL_PROFILER_FAIL_ON_BUDGET (CI), an over-budget request gets a 500 instead of its response.
+
+The per-route aggregate is served on GET /metrics (sql_profiler) and written to SQL_PROFILER_REPORT_PATH
+on shutdown. Values are per worker process.
+"""
+import json
+import re
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from core.config import settings
+from core.logging import get_logger
+
+logger = get_logger()
+
+_WHITESPACE = re.compile(r"\s+")
+_PARAM = r"(?:\?|%s|\$\d+|%\(\w+\)s|:\w+)"
+_PARAM_LIST = re.compile(rf"\(\s*{_PARAM}(?:\s*,\s*{_PARAM})*\s*\)")
+
+
+def statement_shape(statement: str) -> str:
+    """Statements that differ only in bound values or IN-list length share a shape."""
+    return _PARAM_LIST.sub("(…)", _WHITESPACE.sub(" ", statement).strip())
+
+
+class QueryProfile:
+    """Statements executed while serving one request."""
+
+    def __init__(self):
+        self.active = True
+        self.count = 0
+        self.db_seconds = 0.0
+        self.shapes: Dict[str, int] = {}
+
+    def record(self, statement: str, elapsed: float):
+        if not self.active:
+            return
+        shape = statement_shape(statement)
+        self.count += 1
+        self.db_seconds += elapsed
+        self.shapes[shape] = self.shapes.get(shape, 0) + 1
+
+    def repeated(self, threshold: int) -> List[Dict[str, Any]]:
+        return sorted(
+            ({"statement": shape, "repeats": n} for shape, n in self.shapes.items() if n >= threshold),
+            key=lambda r: -r["repeats"]
+        )
+
+
+_current: ContextVar[Optional[QueryProfile]] = ContextVar("query_profile", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_profiler_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current.get()
+    started = conn.info.get("query_profiler_started")
+    if profile is not None and started:
+        profile.record(statement, time.perf_counter() - started.pop())
+
+
+class RouteStats:
+    MAX_SHAPES = 10
+
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.max_queries = 0
+        self.db_ms = 0.0
+        self.max_db_ms = 0.0
+        self.over_budget = 0
+        self.n_plus_one: Dict[str, Dict[str, int]] = {}
+
+    def add(self, profile: QueryProfile, repeated: List[Dict[str, Any]], over_budget: bool):
+        db_ms = profile.db_seconds * 1000
+        self.requests += 1
+        self.queries += profile.count
+        self.max_queries = max(self.max_queries, profile.count)
+        self.db_ms += db_ms
+        self.max_db_ms = max(self.max_db_ms, db_ms)
+        self.over_budget += over_budget
+        for r in repeated:
+            seen = self.n_plus_one.get(r["statement"])
+            if seen is None:
+                if len(self.n_plus_one) >= self.MAX_SHAPES:
+                    continue
+                seen = self.n_plus_one[r["statement"]] = {"requests": 0, "max_repeats": 0}
+            seen["requests"] += 1
+            seen["max_repeats"] = max(seen["max_repeats"], r["repeats"])
+
+    def snapshot(self, budget: Optional[int]) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "avg_queries": round(self.queries / self.requests, 1) if self.requests else 0.0,
+            "max_queries": self.max_queries,
+            "avg_db_ms": round(self.db_ms / self.requests, 2) if self.requests else 0.0,
+            "max_db_ms": round(self.max_db_ms, 2),
+            "budget": budget,
+            "over_budget": self.over_budget,
+            "n_plus_one": [
+                {"statement": shape, **seen}
+                for shape, seen in sorted(self.n_plus_one.items(), key=lambda item: -item[1]["max_repeats"])
+            ],
+        }
+
+
+class QueryProfiler:
+    def __init__(self, repeat_threshold: int, query_budget: int, route_budgets: Dict[str, int],
+                 fail_on_budget: bool, report_path: Optional[str]):
+        self.repeat_threshold = repeat_threshold
+        self.query_budget = query_budget
+        self.route_budgets = route_budgets
+        self.fail_on_budget = fail_on_budget
+        self.report_path = report_path
+        self._routes: Dict[str, RouteStats] = {}
+        self._lock = threading.Lock()
+        self._installed = False
+
+    @property
+    def enabled(self) -> bool:
+        return self._installed
+
+    def install(self):
+        """Hooks every Engine (async engines run their statements through a sync Engine too)."""
+        if self._installed:
+            return
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        self._installed = True
+        if settings.ENVIRONMENT == "production":
+            logger.warning("⚠️ SQL profiler is enabled in production; it is meant for development and staging")
+
+    def budget_for(self, route: str) -> Optional[int]:
+        budget = self.route_budgets.get(route, self.query_budget)
+        return budget if budget > 0 else None
+
+    def finish(self, route: str, profile: QueryProfile) -> Dict[str, Any]:
+        """Stops recording and folds the request into the route's stats. Returns the per-request verdict."""
+        profile.active = False
+        repeated = profile.repeated(self.repeat_threshold)
+        budget = self.budget_for(route)
+        over_budget = budget is not None and profile.count > budget
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = RouteStats()
+            stats.add(profile, repeated, over_budget)
+
+        if repeated or over_budget:
+            worst = f"; {repeated[0]['repeats']}x {repeated[0]['statement'][:200]}" if repeated else ""
+            budget_note = f" > budget {budget}" if over_budget else ""
+            logger.warning(
+                f"⚠️ SQL profile {route}: {profile.count} queries{budget_note}, "
+                f"{profile.db_seconds * 1000:.1f} ms, {len(repeated)} repeated statement(s){worst}"
+            )
+        return {"repeated": repeated, "budget": budget, "over_budget": over_budget}
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            routes = {route: stats.snapshot(self.budget_for(route)) for route, stats in self._routes.items()}
+        return {
+            "repeat_threshold": self.repeat_threshold,
+            "routes": dict(sorted(routes.items(), key=lambda item: -item[1]["max_queries"])),
+        }
+
+    def write_report(self):
+        if not (self._installed and self.report_path):
+            return
+        with open(self.report_path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+        logger.info(f"📝 SQL profile report written to {self.report_path}")
+
+
+query_profiler = QueryProfiler(
+    repeat_threshold=settings.SQL_PROFILER_REPEAT_THRESHOLD,
+    query_budget=settings.SQL_PROFILER_QUERY_BUDGET,
+    route_budgets=settings.SQL_PROFILER_ROUTE_BUDGETS,
+    fail_on_budget=settings.SQL_PROFILER_FAIL_ON_BUDGET,
+    report_path=settings.SQL_PROFILER_REPORT_PATH,
+)
+
+
+def route_key(scope) -> str:
+    """"GET /api/v1/recruiter/applications/{job_id}": method + the matched route's full path template."""
+    route = scope.get("route")
+    template = getattr(route, "path_format", None)
+    if template is None:
+        return f"{scope['method']} <unmatched>"
+    # Routes of an included router may only know their path below the router's prefix: take the prefix
+    # from the request path, in front of the part the route matched
+    path = scope["path"]
+    try:
+        matched = template.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return f"{scope['method']} {template}"
+    if path.endswith(matched):
+        template = path[:len(path) - len(matched)] + template
+    return f"{scope['method']} {template}"
+
+
+class QueryProfilerMiddleware:
+    """Pure ASGI so the profile's context reaches the endpoint (and its threadpool) unchanged."""
+
+    def __init__(self, app, profiler: QueryProfiler = query_profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = QueryProfile()
+        token = _current.set(profile)
+        replaced = False
+
+        async def send_with_profile(message):
+            nonlocal replaced
+            if replaced:
+                return  # body of the response swapped out below
+            if message["type"] == "http.response.start":
+                route = route_key(scope)
+                verdict = self.profiler.finish(route, profile)
+                if verdict["over_budget"] and self.profiler.fail_on_budget:
+                    replaced = True
+                    await self._send_budget_error(send, route, profile, verdict)
+                    return
+                headers = list(message.get("headers", []))
+                headers += [
+                    (b"x-db-query-count", str(profile.count).encode()),
+                    (b"x-db-query-time-ms", f"{profile.db_seconds * 1000:.2f}".encode()),
+                    (b"x-db-n-plus-one", str(len(verdict["repeated"])).encode()),
+                ]
+                if verdict["budget"] is not None:
+                    headers.append((b"x-db-query-budget", str(verdict["budget"]).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            if profile.active:
+                # No response was started (the app raised); still account for the queries
+                self.profiler.finish(route_key(scope), profile)
+            _current.reset(token)
+
+    async def _send_budget_error(self, send, route: str, profile: QueryProfile, verdict: Dict[str, Any]):
+        body = json.dumps({
+            "detail": f"Query budget exceeded for {route}: {profile.count} queries > {verdict['budget']}",
+            "n_plus_one": verdict["repeated"][:5],
+        }).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 500,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"x-db-query-count", str(profile.count).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,253 @@
+"""
+Token-bucket rate limiting shared by HTTP routes and Socket.IO handlers.
+
+A Limit(capacity, per_seconds) allows bursts of `capacity` and refills at capacity/per_seconds tokens
+per second. Buckets live in a store: in-memory for a single worker, or Redis (atomic Lua script) when
+REALTIME_BACKEND=redis so every worker shares the same budget. A bucket that has refilled completely
+is indistinguishable from a new one, so both stores drop it at that point (no manual cleanup needed).
+
+Integrations:
+    - rate_limit(...)        FastAPI dependency, raises RateLimitedError (429 + Retry-After)
+    - sio_rate_limited(...)  decorator for sio event handlers
+    - concurrency_limit(...) FastAPI dependency capping in-flight requests per key (e.g. per client IP)
+"""
+import functools
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional, Tuple
+from fastapi import Depends, Request
+from core.exceptions import RateLimitedError
+from core.logging import get_logger
+
+logger = get_logger()
+
+
+class Limit(NamedTuple):
+    capacity: int       # burst size
+    per_seconds: float  # time to refill an empty bucket
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / self.per_seconds
+
+
+class BucketStore(ABC):
+    """Interface for token-bucket storage. take() returns (allowed, retry_after_seconds)."""
+
+    @abstractmethod
+    async def take(self, key: str, limit: Limit, cost: float = 1.0) -> Tuple[bool, float]:
+        ...
+
+    @abstractmethod
+    async def reset(self, key: str):
+        ...
+
+
+class InMemoryBucketStore(BucketStore):
+    SWEEP_EVERY = 1000  # operations between sweeps of full (expired) buckets
+
+    def __init__(self):
+        # key -> (tokens, updated_at, full_at)
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+        self._ops = 0
+
+    def _sweep(self, now: float):
+        for key in [k for k, (_, _, full_at) in self._buckets.items() if full_at <= now]:
+            del self._buckets[key]
+
+    async def take(self, key: str, limit: Limit, cost: float = 1.0) -> Tuple[bool, float]:
+        now = time.monotonic()
+        self._ops += 1
+        if self._ops % self.SWEEP_EVERY == 0:
+            self._sweep(now)
+
+        tokens, updated_at, _ = self._buckets.get(key, (float(limit.capacity), now, now))
+        tokens = min(float(limit.capacity), tokens + (now - updated_at) * limit.rate)
+        if tokens >= cost:
+            tokens -= cost
+            allowed, retry_after = True, 0.0
+        else:
+            allowed, retry_after = False, (cost - tokens) / limit.rate
+        self._buckets[key] = (tokens, now, now + (limit.capacity - tokens) / limit.rate)
+        return allowed, retry_after
+
+    async def reset(self, key: str):
+        self._buckets.pop(key, None)
+
+
+# KEYS[1] = bucket; ARGV = capacity, rate (tokens/s), now (s), cost
+_TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1)
+return {allowed, tostring(retry_after)}
+"""
+
+
+class RedisBucketStore(BucketStore):
+    def __init__(self, url: str, prefix: str = "hirex:ratelimit"):
+        import redis.asyncio as aioredis  # optional dependency, only needed for this backend
+
+        self._redis = aioredis.from_url(url, decode_responses=True)
+        self._script = self._redis.register_script(_TAKE_SCRIPT)
+        self._prefix = prefix
+
+    async def take(self, key: str, limit: Limit, cost: float = 1.0) -> Tuple[bool, float]:
+        allowed, retry_after = await self._script(
+            keys=[f"{self._prefix}:{key}"],
+            args=[limit.capacity, limit.rate, time.time(), cost]
+        )
+        return bool(allowed), float(retry_after)
+
+    async def reset(self, key: str):
+        await self._redis.delete(f"{self._prefix}:{key}")
+
+
+def build_bucket_store() -> BucketStore:
+    from services.room_state import redis_configured
+    from core.config import settings
+
+    if redis_configured():
+        return RedisBucketStore(settings.REDIS_URL)
+    return InMemoryBucketStore()
+
+
+class RateLimiter:
+    def __init__(self, store: BucketStore):
+        self.store = store
+        self.rejections: Dict[str, int] = {}  # scope -> rejected hits (this worker)
+
+    async def hit(self, scope: str, key: Any, limit: Limit, cost: float = 1.0) -> Tuple[bool, float]:
+        """
+        Spends `cost` tokens from bucket scope:key. Fails open: if the store is unreachable the
+        request is allowed (a limiter outage must not take proctoring down with it).
+        """
+        try:
+            allowed, retry_after = await self.store.take(f"{scope}:{key}", limit, cost)
+        except Exception as e:
+            logger.warning(f"[RateLimit] Store error for {scope}: {e}. Allowing request.")
+            return True, 0.0
+        if not allowed:
+            self.rejections[scope] = self.rejections.get(scope, 0) + 1
+        return allowed, retry_after
+
+    async def reset(self, scope: str, key: Any):
+        try:
+            await self.store.reset(f"{scope}:{key}")
+        except Exception as e:
+            logger.warning(f"[RateLimit] Could not reset {scope}:{key}: {e}")
+
+
+rate_limiter = RateLimiter(build_bucket_store())
+
+
+def rate_limit(scope: str, limit: Limit, key: Callable[[Request, Any], Any]):
+    """
+    FastAPI dependency factory. `key(request, current_user)` picks the bucket, e.g.
+        Depends(rate_limit("proctor_log", limit, lambda req, user: f"{user.id}:{req.query_params.get('assignment_id')}"))
+    """
+    from core.auth import get_current_user
+
+    async def dependency(request: Request, current_user=Depends(get_current_user)):
+        allowed, retry_after = await rate_limiter.hit(scope, key(request, current_user), limit)
+        if not allowed:
+            raise RateLimitedError(retry_after=retry_after)
+        return current_user
+
+    return dependency
+
+
+def sio_rate_limited(
+    scope: str,
+    limit: Limit,
+    key: Callable[[str, Any], Any] = lambda sid, data: sid,
+    on_reject: Optional[Callable[[str, Any, float], Awaitable[None]]] = None
+):
+    """
+    Decorator for Socket.IO handlers taking (sid, data). Over-limit events are dropped and
+    `on_reject(sid, data, retry_after)` is awaited instead of the handler. Apply below @sio.event.
+    """
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(sid, data=None):
+            allowed, retry_after = await rate_limiter.hit(scope, key(sid, data), limit)
+            if not allowed:
+                if on_reject is not None:
+                    await on_reject(sid, data, retry_after)
+                return None
+            return await handler(sid, data)
+        return wrapper
+    return decorator
+
+
+def client_ip(request: Request) -> str:
+    """Client address, taken from X-Forwarded-For when TRUSTED_PROXY_HOPS proxies sit in front of the app."""
+    from core.config import settings
+
+    hops = settings.TRUSTED_PROXY_HOPS
+    if hops > 0:
+        forwarded = [h.strip() for h in request.headers.get("x-forwarded-for", "").split(",") if h.strip()]
+        if forwarded:
+            # Each trusted proxy appends the address it received from; anything further left is client-supplied
+            return forwarded[max(0, len(forwarded) - hops)]
+    return request.client.host if request.client else "unknown"
+
+
+class ConcurrencyLimiter:
+    """In-flight counters per key (this worker). Used for expensive endpoints such as bcrypt logins."""
+
+    def __init__(self):
+        self._active: Dict[str, int] = {}
+        self.rejections: Dict[str, int] = {}  # scope -> rejected requests
+
+    def try_acquire(self, scope: str, key: Any, limit: int) -> bool:
+        slot = f"{scope}:{key}"
+        active = self._active.get(slot, 0)
+        if active >= limit:
+            self.rejections[scope] = self.rejections.get(scope, 0) + 1
+            return False
+        self._active[slot] = active + 1
+        return True
+
+    def release(self, scope: str, key: Any):
+        slot = f"{scope}:{key}"
+        active = self._active.get(slot, 0) - 1
+        if active > 0:
+            self._active[slot] = active
+        else:
+            self._active.pop(slot, None)
+
+
+concurrency_limiter = ConcurrencyLimiter()
+
+
+def concurrency_limit(scope: str, limit: int, key: Callable[[Request], Any] = client_ip):
+    """FastAPI dependency factory: at most `limit` requests per key in flight, extra ones get 429. 0 disables it."""
+    async def dependency(request: Request):
+        if limit <= 0:
+            yield
+            return
+        bucket = key(request)
+        if not concurrency_limiter.try_acquire(scope, bucket, limit):
+            raise RateLimitedError("Too many concurrent requests", retry_after=1)
+        try:
+            yield
+        finally:
+            concurrency_limiter.release(scope, bucket)
+
+    return dependency
@@ -1,16 +1,96 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Union, Any
-from jose import jwt
-from passlib.context import CryptContext
+from typing import Any, Dict, Optional, Tuple, Union
+import bcrypt
+from jose import jwt, JWTError
 from core.config import settings
+from core.exceptions import RateLimitedError
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt only reads the first 72 bytes. passlib truncated silently; bcrypt>=5 raises instead, so
+# truncate explicitly to keep verifying hashes created through passlib.
+BCRYPT_MAX_PASSWORD_BYTES = 72
+
+def _secret(password: str) -> bytes:
+    return password.encode("utf-8")[:BCRYPT_MAX_PASSWORD_BYTES]
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    """Blocking (~100-300 ms). From async code use password_hasher.verify()."""
+    try:
+        return bcrypt.checkpw(_secret(plain_password), hashed_password.encode("utf-8"))
+    except (ValueError, TypeError, AttributeError):
+        return False  # empty or non-bcrypt hash
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    """Blocking. From async code use password_hasher.hash()."""
+    return bcrypt.hashpw(_secret(password), bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)).decode("utf-8")
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True if the hash was made with other cost parameters than the current settings ($2b$<rounds>$...)."""
+    try:
+        ident, rounds = hashed_password.split("$")[1:3]
+        return ident != "2b" or int(rounds) != settings.BCRYPT_ROUNDS
+    except (ValueError, AttributeError):
+        return True
+
+_dummy_hash: Optional[str] = None
+
+def _verify_dummy(plain_password: str):
+    """Same cost as a real check, so response time doesn't reveal which emails are registered."""
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = get_password_hash("dummy-password")
+    verify_password(plain_password, _dummy_hash)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a dedicated, bounded thread pool. bcrypt releases the GIL, so hashing neither blocks
+    the event loop (Socket.IO signaling keeps flowing during a login burst) nor competes with the
+    default executor used by asyncio.to_thread. At most `max_pending` operations may be queued or
+    running per worker; beyond that callers get RateLimitedError (429) instead of an unbounded queue.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+
+    async def _run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise RateLimitedError("Server busy, please retry", retry_after=1)
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: Optional[str]) -> Tuple[bool, Optional[str]]:
+        """
+        (valid, new_hash). new_hash is set when the password is valid but the stored hash uses outdated
+        cost parameters; the caller should store it. A None hash (unknown account) costs the same time.
+        """
+        def work():
+            if hashed_password is None:
+                _verify_dummy(plain_password)
+                return False, None
+            if not verify_password(plain_password, hashed_password):
+                return False, None
+            if password_needs_rehash(hashed_password):
+                return True, get_password_hash(plain_password)
+            return True, None
+        return await self._run(work)
+
+    def stats(self) -> Dict[str, int]:
+        return {"pending": self.pending, "max_pending": self.max_pending, "rejected": self.rejected}
+
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
 
 def create_access_token(subject: Union[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     if expires_delta:
@@ -31,3 +111,10 @@ def create_refresh_token(subject: Union[str, Any], expires_delta: Optional[timed
     to_encode = {"exp": expire, "sub": str(subject), "type": "refresh"}
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
+
+def decode_access_token(token: str) -> Dict[str, Any]:
+    """Verifies signature + expiry and returns the claims. Raises JWTError unless it is an access token with a subject."""
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    if payload.get("sub") is None or payload.get("type") != "access":
+        raise JWTError("Not an access token")
+    return payload
@@ -1,5 +1,10 @@
 import os
+import json
 import base64
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from core.config import settings
 
@@ -30,16 +35,94 @@ def get_encryption_key() -> bytes:
         f"Invalid TESTS_AES_KEY: must be 32-byte Base64 or 32-char raw key, got len={len(key_b64)}"
     )
 
+# Cached cipher: (raw TESTS_AES_KEY value, AESGCM instance).
+# Re-derived only if the configured key changes.
+_cipher: Optional[Tuple[str, AESGCM]] = None
+_cipher_lock = threading.Lock()
+
+def get_cipher() -> AESGCM:
+    """
+    Returns a process-wide AESGCM instance for TESTS_AES_KEY.
+    AESGCM objects are stateless per call, so one instance is safely shared.
+    """
+    global _cipher
+    cached = _cipher
+    if cached is not None and cached[0] == settings.TESTS_AES_KEY:
+        return cached[1]
+    with _cipher_lock:
+        if _cipher is None or _cipher[0] != settings.TESTS_AES_KEY:
+            _cipher = (settings.TESTS_AES_KEY, AESGCM(get_encryption_key()))
+        return _cipher[1]
+
 def encrypt_payload(payload: bytes) -> bytes:
-    key = get_encryption_key()
-    aesgcm = AESGCM(key)
+    aesgcm = get_cipher()
     nonce = os.urandom(12)
     ciphertext = aesgcm.encrypt(nonce, payload, None)
     return nonce + ciphertext
 
 def decrypt_payload(encrypted_data: bytes) -> bytes:
-    key = get_encryption_key()
-    aesgcm = AESGCM(key)
+    aesgcm = get_cipher()
     nonce = encrypted_data[:12]
     ciphertext = encrypted_data[12:]
     return aesgcm.decrypt(nonce, ciphertext, None)
+
+# ------------------------------------------------------------------
+# Decrypted Question Payload Cache
+# ------------------------------------------------------------------
+
+class QuestionPayloadCache:
+    """
+    Bounded, in-process LRU cache of decrypted + parsed question payloads.
+
+    Keyed by (question_id, ciphertext digest) so an edited question (new ciphertext)
+    never serves stale data. Plaintext is only ever held in process memory.
+    Returned dicts are shared between callers and MUST be treated as read-only.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, bytes], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(question_id: Any, encrypted_data: bytes) -> Tuple[str, bytes]:
+        digest = hashlib.blake2b(bytes(encrypted_data), digest_size=16).digest()
+        return (str(question_id), digest)
+
+    def get(self, question_id: Any, encrypted_data: bytes) -> Dict[str, Any]:
+        key = self._key(question_id, encrypted_data)
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return data
+            self.misses += 1
+
+        # Decrypt outside the lock; a concurrent miss for the same key just does duplicate work
+        data = json.loads(decrypt_payload(encrypted_data).decode())
+
+        with self._lock:
+            self._entries[key] = data
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return data
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "max_entries": self.max_entries, "hits": self.hits, "misses": self.misses}
+
+question_payload_cache = QuestionPayloadCache(settings.QUESTION_PAYLOAD_CACHE_SIZE)
+
+def decrypt_question_payload(question_id: Any, encrypted_data: bytes) -> Dict[str, Any]:
+    """
+    Decrypts and parses a TestQuestion payload (problem or hidden tests), served from cache when possible.
+    """
+    return question_payload_cache.get(question_id, encrypted_data)
@@ -1,7 +1,9 @@
-from fastapi import FastAPI, Request
+import hmac
+from fastapi import FastAPI, Request, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import socketio
+from typing import Optional
 from core.config import settings
 from core.logging import get_logger
 from core.exceptions import AuthError, PermissionDeniedError, NotFoundError, ValidationError, LLMError
@@ -73,6 +75,17 @@ app.add_middleware(
     ],
 )
 
+# SQL query profiler (dev/staging/CI): query counts, N+1 detection and budgets per route
+if settings.SQL_PROFILER_ENABLED:
+    from core.query_profiler import QueryProfilerMiddleware, query_profiler
+    query_profiler.install()
+    app.add_middleware(QueryProfilerMiddleware)
+
+# Read replica: records each user's committed writes so their next reads stay on the primary
+if settings.DATABASE_REPLICA_URL:
+    from core.db_router import ReadYourWritesMiddleware
+    app.add_middleware(ReadYourWritesMiddleware)
+
 # Global Exception Handlers
 @app.exception_handler(AuthError)
 async def auth_exception_handler(request: Request, exc: AuthError):
@@ -174,6 +187,31 @@ async def health():
         "socketio": "enabled"
     }
 
+@app.get("/metrics")
+@app.get("/api/metrics")
+async def metrics(x_metrics_token: Optional[str] = Header(None)):
+    """Capacity metrics for this worker: sockets, rooms, events/sec, emit latency, rate limiting, DB pools"""
+    if not settings.METRICS_TOKEN:
+        # Fail closed: without a token the endpoint only exists in development
+        if settings.ENVIRONMENT != "development":
+            raise HTTPException(status_code=404, detail="Not Found")
+    elif not hmac.compare_digest(x_metrics_token or "", settings.METRICS_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid metrics token")
+    from sio import realtime_metrics
+    from core.db_pool import pool_stats
+    from core.db_router import replica_router
+    from core.query_profiler import query_profiler
+    from core.rate_limit import concurrency_limiter
+    from core.security import password_hasher
+    return {
+        **await realtime_metrics(),
+        'concurrency_rejections': dict(concurrency_limiter.rejections),
+        'password_hashing': password_hasher.stats(),
+        'db_pools': pool_stats(),
+        'read_replica': replica_router.stats(),
+        'sql_profiler': query_profiler.report() if query_profiler.enabled else None,
+    }
+
 @app.on_event("startup")
 async def startup_event():
     logger.info("🚀 HireXAI Backend Started Successfully")
@@ -181,6 +219,33 @@ async def startup_event():
     # Initialize Supabase storage client
     from core.storage import init_supabase
     init_supabase()
+    # Daily proctor_logs retention / partition maintenance
+    from services.proctor_retention import proctor_retention
+    proctor_retention.start()
+    # Periodic liveness ping of idle DB pools (replaces per-checkout pre-ping)
+    from core.db_pool import pool_liveness
+    pool_liveness.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Persist proctor events still sitting in the write-behind buffer
+    from services.proctor_log_buffer import proctor_log_buffer
+    await proctor_log_buffer.close()
+    from services.proctor_retention import proctor_retention
+    await proctor_retention.close()
+    from core.db_pool import pool_liveness
+    await pool_liveness.close()
+    from services.judge_service import judge_service
+    await judge_service.close()
+    from core.query_profiler import query_profiler
+    query_profiler.write_report()
+    from core.database import async_engine, async_replica_engine, engine, realtime_engine, replica_engine, worker_engine
+    await async_engine.dispose()
+    if async_replica_engine is not None:
+        await async_replica_engine.dispose()
+    for sync_engine in (engine, worker_engine, realtime_engine, replica_engine):
+        if sync_engine is not None:
+            sync_engine.dispose()
 
 # Import Socket.IO instance - WRAP AFTER ALL MIDDLEWARE AND ROUTES ARE CONFIGURED
 from sio import sio
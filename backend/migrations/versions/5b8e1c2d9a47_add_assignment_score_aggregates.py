@@ -0,0 +1,61 @@
+"""add assignment score aggregates
+
+Revision ID: 5b8e1c2d9a47
+Revises: d2104a35f636
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e1c2d9a47'
+down_revision: Union[str, Sequence[str], None] = 'd2104a35f636'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('test_assignments', sa.Column('total_score', sa.Float(), nullable=True, server_default='0'))
+    op.create_table(
+        'assignment_question_scores',
+        sa.Column('assignment_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('test_assignments.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('question_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('test_questions.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('submission_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('submissions.id', ondelete='SET NULL'), nullable=True),
+        sa.Column('score', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+    )
+
+    # Backfill from the latest submission per question, as the grading worker keeps the latest score.
+    # Rows from before grading_status existed default to 'queued', so only drafts and errors are skipped.
+    op.execute("""
+        INSERT INTO assignment_question_scores (assignment_id, question_id, submission_id, score)
+        SELECT assignment_id, question_id, id, COALESCE(score, 0)
+        FROM (
+            SELECT id, assignment_id, question_id, score,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY assignment_id, question_id
+                       ORDER BY submitted_at DESC NULLS LAST, id DESC
+                   ) AS rn
+            FROM submissions
+            WHERE assignment_id IS NOT NULL AND question_id IS NOT NULL
+              AND COALESCE(grading_status, 'queued') NOT IN ('draft', 'error')
+        ) latest
+        WHERE rn = 1
+    """)
+    op.execute("""
+        UPDATE test_assignments SET total_score = COALESCE((
+            SELECT SUM(s.score) FROM assignment_question_scores s
+            WHERE s.assignment_id = test_assignments.id
+        ), 0)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('assignment_question_scores')
+    op.drop_column('test_assignments', 'total_score')
@@ -0,0 +1,42 @@
+"""add assignment proctor counters
+
+Revision ID: a3f4c9e1b7d2
+Revises: 5b8e1c2d9a47
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f4c9e1b7d2'
+down_revision: Union[str, Sequence[str], None] = '5b8e1c2d9a47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('test_assignments', sa.Column('warning_count', sa.Integer(), nullable=True, server_default='0'))
+    op.add_column('test_assignments', sa.Column('extension_count', sa.Integer(), nullable=True, server_default='0'))
+
+    # Backfill from existing logs (warnings = MEDIUM + HIGH severities)
+    op.execute("""
+        UPDATE test_assignments SET
+            warning_count = (
+                SELECT COUNT(*) FROM proctor_logs l
+                WHERE l.assignment_id = test_assignments.id AND l.severity IN ('medium', 'high')
+            ),
+            extension_count = (
+                SELECT COUNT(*) FROM proctor_logs l
+                WHERE l.assignment_id = test_assignments.id AND l.event_type = 'extension_detected'
+            )
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('test_assignments', 'extension_count')
+    op.drop_column('test_assignments', 'warning_count')
@@ -0,0 +1,122 @@
+"""partition proctor_logs by month, add proctor_log_rollups
+
+Revision ID: c7e2d5a8f310
+Revises: a3f4c9e1b7d2
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e2d5a8f310'
+down_revision: Union[str, Sequence[str], None] = 'a3f4c9e1b7d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Monthly partitions created beyond the current month (the retention job keeps this window rolling)
+PARTITIONS_AHEAD = 3
+
+COLUMNS = "id, assignment_id, interview_room_id, severity, event_type, payload, timestamp"
+
+
+def _add_months(d: date, n: int) -> date:
+    years, month = divmod(d.month - 1 + n, 12)
+    return date(d.year + years, month + 1, 1)
+
+
+def _create_proctor_logs(name: str, partitioned: bool) -> None:
+    op.execute(f"""
+        CREATE TABLE {name} (
+            id UUID NOT NULL,
+            assignment_id UUID REFERENCES test_assignments(id) ON DELETE CASCADE,
+            interview_room_id VARCHAR REFERENCES interview_sessions(room_id) ON DELETE CASCADE,
+            severity VARCHAR(10) NOT NULL DEFAULT 'LOW',
+            event_type VARCHAR NOT NULL,
+            payload JSON,
+            timestamp TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            PRIMARY KEY ({'id, timestamp' if partitioned else 'id'})
+        ){' PARTITION BY RANGE (timestamp)' if partitioned else ''}
+    """)
+
+
+def _create_log_indexes() -> None:
+    op.create_index('ix_proctor_logs_assignment_ts', 'proctor_logs', ['assignment_id', 'timestamp'])
+    op.create_index('ix_proctor_logs_interview_room_ts', 'proctor_logs', ['interview_room_id', 'timestamp'])
+
+
+def _create_legacy_log_indexes() -> None:
+    """Indexes of the earlier migrations (007, add_test_performance_indexes), lost when the table is rebuilt.
+    Severity / event_type filters and the retention job's timestamp-range scans still use them."""
+    op.create_index('ix_proctor_logs_severity', 'proctor_logs', ['severity'])
+    op.create_index('idx_proctor_logs_event_type', 'proctor_logs', ['event_type'])
+    op.create_index('idx_proctor_logs_timestamp', 'proctor_logs', ['timestamp'])
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'proctor_log_rollups',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('assignment_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('test_assignments.id', ondelete='CASCADE'), nullable=True),
+        sa.Column('interview_room_id', sa.String(), sa.ForeignKey('interview_sessions.room_id', ondelete='CASCADE'), nullable=True),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('event_type', sa.String(), nullable=False),
+        sa.Column('severity', sa.String(10), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('first_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('last_at', sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index('ix_proctor_log_rollups_assignment_day', 'proctor_log_rollups', ['assignment_id', 'day'])
+    op.create_index('ix_proctor_log_rollups_interview_room_day', 'proctor_log_rollups', ['interview_room_id', 'day'])
+
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        # SQLite dev databases: no partitioning, just the hot-path indexes
+        _create_log_indexes()
+        return
+
+    # timestamp becomes the partition key, so it must be NOT NULL
+    op.execute("UPDATE proctor_logs SET timestamp = now() WHERE timestamp IS NULL")
+    _create_proctor_logs('proctor_logs_partitioned', partitioned=True)
+
+    oldest = bind.execute(sa.text("SELECT min(timestamp) FROM proctor_logs")).scalar()
+    this_month = datetime.now(timezone.utc).date().replace(day=1)
+    month = oldest.astimezone(timezone.utc).date().replace(day=1) if oldest else this_month
+    while month <= _add_months(this_month, PARTITIONS_AHEAD):
+        op.execute(
+            f"CREATE TABLE proctor_logs_{month:%Y_%m} PARTITION OF proctor_logs_partitioned "
+            f"FOR VALUES FROM ('{month} 00:00:00+00') TO ('{_add_months(month, 1)} 00:00:00+00')"
+        )
+        month = _add_months(month, 1)
+    op.execute("CREATE TABLE proctor_logs_default PARTITION OF proctor_logs_partitioned DEFAULT")
+
+    op.execute(f"INSERT INTO proctor_logs_partitioned ({COLUMNS}) SELECT {COLUMNS} FROM proctor_logs")
+    op.execute("DROP TABLE proctor_logs")
+    op.execute("ALTER TABLE proctor_logs_partitioned RENAME TO proctor_logs")
+    op.execute("ALTER TABLE proctor_logs RENAME CONSTRAINT proctor_logs_partitioned_pkey TO proctor_logs_pkey")
+    _create_log_indexes()
+    _create_legacy_log_indexes()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        _create_proctor_logs('proctor_logs_unpartitioned', partitioned=False)
+        op.execute(f"INSERT INTO proctor_logs_unpartitioned ({COLUMNS}) SELECT {COLUMNS} FROM proctor_logs")
+        op.execute("DROP TABLE proctor_logs")  # drops every partition with it
+        op.execute("ALTER TABLE proctor_logs_unpartitioned RENAME TO proctor_logs")
+        op.execute("ALTER TABLE proctor_logs RENAME CONSTRAINT proctor_logs_unpartitioned_pkey TO proctor_logs_pkey")
+        _create_legacy_log_indexes()
+    else:
+        op.drop_index('ix_proctor_logs_interview_room_ts', table_name='proctor_logs')
+        op.drop_index('ix_proctor_logs_assignment_ts', table_name='proctor_logs')
+
+    op.drop_index('ix_proctor_log_rollups_interview_room_day', table_name='proctor_log_rollups')
+    op.drop_index('ix_proctor_log_rollups_assignment_day', table_name='proctor_log_rollups')
+    op.drop_table('proctor_log_rollups')
@@ -5,7 +5,7 @@ from models.application import Application
 from models.candidate_profile import CandidateProfile
 from models.saved_job import SavedJob
 
-from models.test_system import Test, TestQuestion, TestAssignment, Submission, ProctorLog
+from models.test_system import Test, TestQuestion, TestAssignment, Submission, ProctorLog, ProctorLogRollup
 from models.interview import InterviewSession
 from models.notification import Notification
 from models.shortlisted_candidate import ShortlistedCandidate
@@ -13,6 +13,6 @@ from models.scheduled_event import ScheduledEvent
 
 __all__ = [
     'User', 'Job', 'Resume', 'Application', 'CandidateProfile', 'SavedJob', 
-    'Test', 'TestQuestion', 'TestAssignment', 'Submission', 'ProctorLog',
+    'Test', 'TestQuestion', 'TestAssignment', 'Submission', 'ProctorLog', 'ProctorLogRollup',
     'InterviewSession', 'Notification', 'ShortlistedCandidate', 'ScheduledEvent'
 ]
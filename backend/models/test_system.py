@@ -1,10 +1,24 @@
 import uuid
-from sqlalchemy import Column, String, Boolean, Integer, ForeignKey, DateTime, Text, JSON, Float, LargeBinary
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Boolean, Integer, ForeignKey, DateTime, Date, Text, JSON, Float, LargeBinary, Index
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.types import TypeDecorator
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from core.database import Base
 
+class UUID(TypeDecorator):
+    """
+    Postgres UUID that also accepts string ids when bound.
+    psycopg2 already does this; the generic (SQLite dev/benchmark) path would fail on str.hex.
+    """
+    impl = PG_UUID
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is not None and not isinstance(value, uuid.UUID):
+            value = uuid.UUID(str(value))
+        return value
+
 class Test(Base):
     __tablename__ = "tests"
 
@@ -44,12 +58,17 @@ class TestAssignment(Base):
     scheduled_at = Column(DateTime(timezone=True), nullable=True)
     status = Column(String, default="pending") # pending, started, completed, expired
     attempt_count = Column(Integer, default=0)
+    # Materialized sum of per-question scores (maintained by the grading worker)
+    total_score = Column(Float, default=0.0, server_default="0")
+    # Proctoring counters (maintained in the same transaction as each ProctorLog insert)
+    warning_count = Column(Integer, default=0, server_default="0")  # MEDIUM + HIGH events
+    extension_count = Column(Integer, default=0, server_default="0")  # extension_detected events
     meta = Column(JSON, nullable=True)
 
     test = relationship("Test", back_populates="assignments")
     submissions = relationship("Submission", back_populates="assignment")
     proctor_logs = relationship("ProctorLog", back_populates="assignment")
-    proctor_logs = relationship("ProctorLog", back_populates="assignment")
+    question_scores = relationship("AssignmentQuestionScore", back_populates="assignment", cascade="all, delete-orphan")
     # webcam_snapshots removed for privacy compliance
 
 class Submission(Base):
@@ -68,8 +87,32 @@ class Submission(Base):
     assignment = relationship("TestAssignment", back_populates="submissions")
     question = relationship("TestQuestion", back_populates="submissions")
 
+class AssignmentQuestionScore(Base):
+    """Latest graded score per (assignment, question). One row per question keeps concurrent graders contention-free."""
+    __tablename__ = "assignment_question_scores"
+
+    assignment_id = Column(UUID(as_uuid=True), ForeignKey("test_assignments.id", ondelete="CASCADE"), primary_key=True)
+    question_id = Column(UUID(as_uuid=True), ForeignKey("test_questions.id", ondelete="CASCADE"), primary_key=True)
+    submission_id = Column(UUID(as_uuid=True), ForeignKey("submissions.id", ondelete="SET NULL"), nullable=True)
+    score = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    assignment = relationship("TestAssignment", back_populates="question_scores")
+
 class ProctorLog(Base):
+    """
+    Raw proctoring events. On Postgres the table is range-partitioned by month on `timestamp`
+    (primary key is (id, timestamp) there); rows past retention are moved to ProctorLogRollup and
+    the archive by services.proctor_retention.
+    """
     __tablename__ = "proctor_logs"
+    __table_args__ = (
+        Index("ix_proctor_logs_assignment_ts", "assignment_id", "timestamp"),
+        Index("ix_proctor_logs_interview_room_ts", "interview_room_id", "timestamp"),
+        Index("ix_proctor_logs_severity", "severity"),
+        Index("idx_proctor_logs_event_type", "event_type"),
+        Index("idx_proctor_logs_timestamp", "timestamp"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     assignment_id = Column(UUID(as_uuid=True), ForeignKey("test_assignments.id", ondelete="CASCADE"), nullable=True)
@@ -77,7 +120,25 @@ class ProctorLog(Base):
     severity = Column(String(10), nullable=False, default='LOW')
     event_type = Column(String, nullable=False) # tab_switch, fullscreen_exit, etc.
     payload = Column(JSON, nullable=True)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    timestamp = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
 
     assignment = relationship("TestAssignment", back_populates="proctor_logs")
     interview_session = relationship("InterviewSession", foreign_keys=[interview_room_id])
+
+class ProctorLogRollup(Base):
+    """Daily counts per (assignment or interview, event type, severity) for raw events past retention."""
+    __tablename__ = "proctor_log_rollups"
+    __table_args__ = (
+        Index("ix_proctor_log_rollups_assignment_day", "assignment_id", "day"),
+        Index("ix_proctor_log_rollups_interview_room_day", "interview_room_id", "day"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    assignment_id = Column(UUID(as_uuid=True), ForeignKey("test_assignments.id", ondelete="CASCADE"), nullable=True)
+    interview_room_id = Column(String, ForeignKey("interview_sessions.room_id", ondelete="CASCADE"), nullable=True)
+    day = Column(Date, nullable=False)
+    event_type = Column(String, nullable=False)
+    severity = Column(String(10), nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+    first_at = Column(DateTime(timezone=True), nullable=False)
+    last_at = Column(DateTime(timezone=True), nullable=False)
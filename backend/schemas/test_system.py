@@ -47,6 +47,10 @@ class ProctorLogCreate(BaseModel):
     event_type: str
     payload: Optional[Dict[str, Any]] = None
 
+class ProctorLogBatchCreate(BaseModel):
+    # Ordered as they happened on the client; capped below the per-minute rate-limit burst
+    events: List[ProctorLogCreate] = Field(..., min_length=1, max_length=50)
+
 # --- Response Schemas ---
 
 class QuestionPublic(QuestionBase):
@@ -91,6 +95,26 @@ class SubmissionResult(BaseModel):
     execution_summary: Optional[Dict[str, Any]]
     score: Optional[float]
 
+class ProctorLogPublic(BaseModel):
+    id: UUID4
+    event_type: str
+    severity: str
+    timestamp: datetime
+    payload: Optional[Dict[str, Any]] = None
+
+class ProctorLogSummary(BaseModel):
+    total: int
+    archived: int = 0  # events past retention: counted here, no longer listed
+    by_severity: Dict[str, int]
+    by_type: Dict[str, int]
+    first_at: Optional[datetime] = None
+    last_at: Optional[datetime] = None
+
+class ProctorLogPage(BaseModel):
+    items: List[ProctorLogPublic]
+    next_cursor: Optional[str] = None
+    summary: Optional[ProctorLogSummary] = None
+
 class RecruiterTestDetail(TestPublic):
     pass
 
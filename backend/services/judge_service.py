@@ -27,6 +27,21 @@ class JudgeService:
         if not self.api_key:
             logger.warning("JUDGE0_API_KEY is not set. JudgeService will fail for real execution.")
 
+        # Shared client: reuses keep-alive connections instead of a new TLS handshake per test case
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=16)
+            )
+        return self._client
+
+    async def close(self):
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
     async def execute_code(
         self, 
         language: str, 
@@ -70,54 +85,54 @@ class JudgeService:
             "X-RapidAPI-Host": "judge0-ce.p.rapidapi.com"
         }
 
-        async with httpx.AsyncClient() as client:
-            try:
-                # Create submission
-                response = await client.post(
-                    f"{self.api_url}/submissions?base64_encoded=true&wait=true", 
-                    json=payload, 
-                    headers=headers,
-                    timeout=10.0
-                )
+        client = self._get_client()
+        try:
+            # Create submission
+            response = await client.post(
+                f"{self.api_url}/submissions?base64_encoded=true&wait=true", 
+                json=payload, 
+                headers=headers,
+                timeout=10.0
+            )
                 
-                if response.status_code == 401 or response.status_code == 403:
-                     return {"status": "error", "message": "Judge0 API Key Invalid or Quota Exceeded", "verdict": "system_error"}
+            if response.status_code == 401 or response.status_code == 403:
+                 return {"status": "error", "message": "Judge0 API Key Invalid or Quota Exceeded", "verdict": "system_error"}
 
-                response.raise_for_status()
-                result = response.json()
+            response.raise_for_status()
+            result = response.json()
                 
-                # Parse result
-                stdout = base64.b64decode(result.get("stdout") or "").decode() if result.get("stdout") else ""
-                stderr = base64.b64decode(result.get("stderr") or "").decode() if result.get("stderr") else ""
-                compile_output = base64.b64decode(result.get("compile_output") or "").decode() if result.get("compile_output") else ""
+            # Parse result
+            stdout = base64.b64decode(result.get("stdout") or "").decode() if result.get("stdout") else ""
+            stderr = base64.b64decode(result.get("stderr") or "").decode() if result.get("stderr") else ""
+            compile_output = base64.b64decode(result.get("compile_output") or "").decode() if result.get("compile_output") else ""
                 
-                status_id = result.get("status", {}).get("id")
-                # 3 = Accepted, 4 = WA, 5 = TLE, 6 = Compilation Error, etc.
+            status_id = result.get("status", {}).get("id")
+            # 3 = Accepted, 4 = WA, 5 = TLE, 6 = Compilation Error, etc.
                 
-                verdict = "passed" if status_id == 3 else "failed"
-                if status_id == 6: verdict = "compilation_error"
-                if status_id == 5: verdict = "timeout"
-                if status_id >= 7: verdict = "runtime_error"
-
-                # Combine stderr and compile_output for easier display
-                error_message = stderr
-                if compile_output:
-                    error_message = f"Compilation Error:\n{compile_output}\n{stderr}"
-
-                return {
-                    "verdict": verdict,
-                    "stdout": stdout,
-                    "stderr": error_message,
-                    "time": result.get("time"),
-                    "memory": result.get("memory"),
-                    "status_description": result.get("status", {}).get("description"),
-                    "token": result.get("token")
-                }
-
-            except httpx.TimeoutException:
-                return {"status": "error", "message": "Judge0 Request Timed Out", "verdict": "system_error"}
-            except Exception as e:
-                logger.error(f"Judge0 Error: {e}")
-                return {"status": "error", "message": str(e), "verdict": "system_error"}
+            verdict = "passed" if status_id == 3 else "failed"
+            if status_id == 6: verdict = "compilation_error"
+            if status_id == 5: verdict = "timeout"
+            if status_id >= 7: verdict = "runtime_error"
+
+            # Combine stderr and compile_output for easier display
+            error_message = stderr
+            if compile_output:
+                error_message = f"Compilation Error:\n{compile_output}\n{stderr}"
+
+            return {
+                "verdict": verdict,
+                "stdout": stdout,
+                "stderr": error_message,
+                "time": result.get("time"),
+                "memory": result.get("memory"),
+                "status_description": result.get("status", {}).get("description"),
+                "token": result.get("token")
+            }
+
+        except httpx.TimeoutException:
+            return {"status": "error", "message": "Judge0 Request Timed Out", "verdict": "system_error"}
+        except Exception as e:
+            logger.error(f"Judge0 Error: {e}")
+            return {"status": "error", "message": str(e), "verdict": "system_error"}
 
 judge_service = JudgeService()
@@ -0,0 +1,127 @@
+import asyncio
+import time
+from typing import Dict, NamedTuple, Optional, Tuple
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from core.logging import get_logger
+from models.user import User
+
+logger = get_logger()
+
+
+class Principal(NamedTuple):
+    """The authenticated caller as most handlers need it. Immutable; use load() for the ORM User."""
+    id: int
+    email: str
+    role: str
+    is_active: bool
+
+    def load(self, db: Session) -> Optional[User]:
+        return db.query(User).filter(User.id == self.id).first()
+
+
+def _load_principal(user_id: int) -> Optional[Principal]:
+    """Blocking DB lookup. Always called via asyncio.to_thread so it never stalls the event loop."""
+    from core.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        row = db.query(User.id, User.email, User.role, User.is_active).filter(User.id == user_id).first()
+        if not row:
+            return None
+        return Principal(int(row.id), row.email, row.role, bool(row.is_active))
+    finally:
+        db.close()
+
+
+class PrincipalCache:
+    """
+    TTL cache of user id -> Principal for core.auth.get_current_user.
+
+    A hit is a dict lookup: no session, no query, no threadpool hop. Misses load off the event loop and
+    concurrent misses for the same user share one query. Committed changes to User.role / User.is_active
+    (or deleting the user) invalidate the entry on this worker via the ORM hooks below; the short TTL
+    bounds staleness on other workers and for bulk query().update() calls, which bypass the hooks
+    (call principal_cache.invalidate(user_id) after those).
+    """
+
+    TTL_SECONDS = 30
+    MAX_ENTRIES = 50000
+
+    def __init__(self):
+        self._entries: Dict[int, Tuple[float, Principal]] = {}
+        self._inflight: Dict[int, asyncio.Future] = {}
+
+    async def get(self, user_id: int) -> Optional[Principal]:
+        entry = self._entries.get(user_id)
+        if entry and time.monotonic() - entry[0] < self.TTL_SECONDS:
+            return entry[1]
+
+        pending = self._inflight.get(user_id)
+        if pending is None:
+            pending = asyncio.ensure_future(asyncio.to_thread(_load_principal, user_id))
+            self._inflight[user_id] = pending
+            pending.add_done_callback(lambda f, u=user_id: self._store(u, f))
+        return await asyncio.shield(pending)
+
+    def _store(self, user_id: int, fut: asyncio.Future):
+        if self._inflight.get(user_id) is not fut:
+            # Invalidated while loading: serve this result to waiters but don't cache it
+            return
+        del self._inflight[user_id]
+        if fut.cancelled() or fut.exception() is not None:
+            return
+        principal = fut.result()
+        if principal is None:
+            return
+        if len(self._entries) >= self.MAX_ENTRIES:
+            self._evict_expired()
+        self._entries[user_id] = (time.monotonic(), principal)
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        for user_id in [u for u, (ts, _) in self._entries.items() if now - ts >= self.TTL_SECONDS]:
+            del self._entries[user_id]
+        if len(self._entries) >= self.MAX_ENTRIES:
+            oldest = sorted(self._entries.items(), key=lambda item: item[1][0])
+            for user_id, _ in oldest[: len(oldest) // 2]:
+                del self._entries[user_id]
+
+    def invalidate(self, user_id: int):
+        # Also called from sync handlers' threads (after_commit below); single dict ops are atomic
+        self._entries.pop(user_id, None)
+        self._inflight.pop(user_id, None)
+
+
+principal_cache = PrincipalCache()
+
+_PENDING_KEY = "principal_cache_invalidations"
+
+
+def _mark_changed(session: Optional[Session], user_id):
+    if session is not None and user_id is not None:
+        session.info.setdefault(_PENDING_KEY, set()).add(int(user_id))
+
+
+@event.listens_for(User, "after_update")
+def _user_updated(mapper, connection, target):
+    attrs = inspect(target).attrs
+    if attrs.role.history.has_changes() or attrs.is_active.history.has_changes():
+        _mark_changed(inspect(target).session, target.id)
+
+
+@event.listens_for(User, "after_delete")
+def _user_deleted(mapper, connection, target):
+    _mark_changed(inspect(target).session, target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    # Invalidate only once the change is visible to the loader's own session
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        principal_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_rolled_back(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,116 @@
+"""
+Rolling per-room aggregates of live proctoring signals.
+
+Instead of forwarding every proctor_event to recruiters, the sio server folds events into one
+aggregate per room and emits a compact proctor_summary for rooms that changed, every
+SUMMARY_INTERVAL_SECONDS (see sio._proctor_summary_ticker). Interviews are keyed by room_id; test
+sessions by sio.assignment_room(id), fed by the HTTP proctoring log endpoints.
+
+The summary carries counts by ProctorEventSeverity and by event type, last-seen per type, the last
+few events for the activity log, and a risk score: severity weights from EVENT_SEVERITY_MAP, decayed
+with a half-life so a burst early in an interview fades if the candidate behaves afterwards.
+
+State is per process, like the whiteboard: a candidate's events land on the worker their socket is on.
+"""
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from core.proctor_constants import ProctorEventSeverity, get_event_severity
+
+SUMMARY_INTERVAL_SECONDS = 2.0
+RECENT_EVENTS = 20
+MAX_MESSAGE_LENGTH = 200
+RISK_HALF_LIFE_SECONDS = 10 * 60
+RISK_WEIGHTS = {
+    ProctorEventSeverity.CRITICAL.value: 40.0,
+    ProctorEventSeverity.HIGH.value: 15.0,
+    ProctorEventSeverity.MEDIUM.value: 5.0,
+    ProctorEventSeverity.LOW.value: 0.0,
+}
+AGGREGATE_IDLE_TTL_SECONDS = 6 * 60 * 60
+
+
+class ProctorAggregate:
+    def __init__(self):
+        self.total = 0
+        self.by_severity: Dict[str, int] = {s.value: 0 for s in ProctorEventSeverity}
+        self.by_type: Dict[str, int] = {}
+        self.last_seen: Dict[str, str] = {}
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=RECENT_EVENTS)
+        self._risk = 0.0
+        self._risk_at = time.monotonic()
+        self.dirty = False
+        self.touched = time.monotonic()
+
+    def _decayed_risk(self, now: float) -> float:
+        return self._risk * 0.5 ** ((now - self._risk_at) / RISK_HALF_LIFE_SECONDS)
+
+    def add(self, event_type: str, payload: Dict[str, Any]):
+        severity = get_event_severity(event_type).value
+        now = time.monotonic()
+        seen_at = datetime.now(timezone.utc).isoformat()
+
+        self.total += 1
+        self.by_severity[severity] += 1
+        self.by_type[event_type] = self.by_type.get(event_type, 0) + 1
+        self.last_seen[event_type] = seen_at
+        self._risk = self._decayed_risk(now) + RISK_WEIGHTS[severity]
+        self._risk_at = now
+
+        message = payload.get('message')
+        self.recent.appendleft({
+            'type': event_type,
+            'severity': severity,
+            'message': message[:MAX_MESSAGE_LENGTH] if isinstance(message, str) else None,
+            'timestamp': seen_at,
+        })
+        self.dirty = True
+        self.touched = now
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'total': self.total,
+            'by_severity': dict(self.by_severity),
+            'by_type': dict(self.by_type),
+            'last_seen': dict(self.last_seen),
+            'risk_score': min(100, round(self._decayed_risk(time.monotonic()))),
+            'recent': list(self.recent),
+        }
+
+
+class ProctorAggregateStore:
+    def __init__(self):
+        self._rooms: Dict[str, ProctorAggregate] = {}
+
+    def __len__(self) -> int:
+        return len(self._rooms)
+
+    def record(self, room_id: str, event_type: str, payload: Dict[str, Any]):
+        aggregate = self._rooms.get(room_id)
+        if aggregate is None:
+            aggregate = self._rooms[room_id] = ProctorAggregate()
+        aggregate.add(event_type, payload)
+
+    def get(self, room_id: str) -> Optional[ProctorAggregate]:
+        return self._rooms.get(room_id)
+
+    def take_dirty(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """(room_id, summary) for every room that changed since the last call."""
+        out = []
+        for room_id, aggregate in self._rooms.items():
+            if aggregate.dirty:
+                aggregate.dirty = False
+                out.append((room_id, aggregate.summary()))
+        return out
+
+    def drop_idle(self):
+        now = time.monotonic()
+        for room_id in [r for r, a in self._rooms.items() if now - a.touched > AGGREGATE_IDLE_TTL_SECONDS]:
+            del self._rooms[room_id]
+
+    def discard(self, room_id: str):
+        self._rooms.pop(room_id, None)
+
+
+proctor_aggregates = ProctorAggregateStore()
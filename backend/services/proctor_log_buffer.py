@@ -0,0 +1,176 @@
+"""
+Write-behind buffer for Socket.IO proctor events.
+
+proctor_event used to open a session, look up the room and INSERT + COMMIT one row per event.
+Events are now queued in memory and a single background task flushes them with one bulk INSERT
+per batch (every PROCTOR_LOG_FLUSH_INTERVAL_MS or PROCTOR_LOG_BATCH_SIZE rows, whichever first).
+
+Backpressure: the queue is bounded. When the DB falls behind, submit() waits up to
+ENQUEUE_TIMEOUT_SECONDS for room, then drops the event (counted in stats()) rather than
+stalling the socket handler indefinitely. Pending rows are flushed on shutdown.
+"""
+import asyncio
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set
+from core.config import settings
+from core.logging import get_logger
+from core.proctor_constants import get_event_severity
+
+logger = get_logger()
+
+# SECURITY: Never persist image data, only metadata
+IMAGE_FIELDS = ('image', 'snapshot', 'screenshot', 'base64', 'blob', 'buffer', 'jpeg', 'png')
+
+
+def _known_rooms(db, room_ids: List[str]) -> Set[str]:
+    """The interview rooms in the batch that exist (sio.proctor_event only accepts interview rooms)."""
+    from models.interview import InterviewSession
+
+    return {
+        row.room_id for row in
+        db.query(InterviewSession.room_id).filter(InterviewSession.room_id.in_(room_ids)).all()
+    }
+
+
+def write_proctor_logs(rows: List[Dict[str, Any]]) -> int:
+    """
+    Blocking bulk insert of buffered events (run via asyncio.to_thread).
+    Rows for unknown rooms are skipped, as the per-event path did. Returns rows written.
+    """
+    from sqlalchemy import insert
+    from core.database import RealtimeSessionLocal
+    from models.test_system import ProctorLog
+
+    db = RealtimeSessionLocal()
+    try:
+        known = _known_rooms(db, list({r["room_id"] for r in rows}))
+        values = []
+        for r in rows:
+            if r["room_id"] not in known:
+                continue
+            values.append({
+                "id": uuid.uuid4(),
+                "event_type": r["event_type"],
+                "severity": get_event_severity(r["event_type"]).value,
+                "payload": r["payload"],
+                "timestamp": r["timestamp"],
+                "interview_room_id": r["room_id"],
+            })
+        if values:
+            db.execute(insert(ProctorLog), values)
+            db.commit()
+        return len(values)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+class ProctorLogBuffer:
+    ENQUEUE_TIMEOUT_SECONDS = 1.0
+
+    def __init__(self, flush_interval_ms: int, batch_size: int, max_pending: int):
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._batch: List[Dict[str, Any]] = []
+        self._inflight_flush: Optional[asyncio.Future] = None
+        self.written = 0
+        self.dropped = 0
+        self.failed_batches = 0
+
+    def _ensure_started(self):
+        if self._task is None or self._task.done():
+            if self._queue is None:
+                self._queue = asyncio.Queue(maxsize=self.max_pending)
+            self._task = asyncio.create_task(self._run())
+
+    async def submit(self, room_id: str, event_type: str, payload: Dict[str, Any]):
+        """Queues one event for persistence. Image fields are stripped again here for safety."""
+        self._ensure_started()
+        row = {
+            "room_id": room_id,
+            "event_type": event_type,
+            "payload": {k: v for k, v in (payload or {}).items() if k not in IMAGE_FIELDS},
+            # Stamp at receipt, not at flush, so timelines stay accurate
+            "timestamp": datetime.now(timezone.utc),
+        }
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(self._queue.put(row), timeout=self.ENQUEUE_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                self.dropped += 1
+                if self.dropped % 100 == 1:
+                    logger.warning(f"⚠️ Proctor log buffer full ({self.max_pending}); dropped {self.dropped} events so far")
+
+    async def _collect(self):
+        """Waits for the first row, then gathers more until the batch fills or the interval elapses."""
+        # Rows go straight into self._batch so close() can still flush them if we're cancelled mid-collect
+        self._batch.append(await self._queue.get())
+        deadline = asyncio.get_running_loop().time() + self.flush_interval
+        while len(self._batch) < self.batch_size:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                self._batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+
+    async def _flush(self, batch: List[Dict[str, Any]]):
+        try:
+            self.written += await asyncio.to_thread(write_proctor_logs, batch)
+        except Exception as e:
+            # Don't crash the interview over audit logging
+            self.failed_batches += 1
+            logger.error(f"❌ Proctor log flush failed ({len(batch)} events): {e}")
+
+    async def _run(self):
+        while True:
+            await self._collect()
+            batch, self._batch = self._batch, []
+            # Shielded so cancelling the loop on shutdown never abandons a half-done write
+            self._inflight_flush = asyncio.ensure_future(self._flush(batch))
+            await asyncio.shield(self._inflight_flush)
+
+    async def close(self):
+        """Stops the flusher and writes everything still queued. Call on shutdown."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._inflight_flush is not None and not self._inflight_flush.done():
+            await self._inflight_flush
+        if self._queue is None:
+            return
+        pending, self._batch = self._batch, []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for i in range(0, len(pending), self.batch_size):
+            await self._flush(pending[i:i + self.batch_size])
+        if pending:
+            logger.info(f"📝 Flushed {len(pending)} buffered proctor events on shutdown")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed_batches": self.failed_batches,
+        }
+
+
+proctor_log_buffer = ProctorLogBuffer(
+    flush_interval_ms=settings.PROCTOR_LOG_FLUSH_INTERVAL_MS,
+    batch_size=settings.PROCTOR_LOG_BATCH_SIZE,
+    max_pending=settings.PROCTOR_LOG_MAX_PENDING,
+)
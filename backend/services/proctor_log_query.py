@@ -0,0 +1,143 @@
+"""
+Bounded reads of proctor_logs for the recruiter views.
+
+Logs are served newest-first in keyset pages: the cursor encodes the (timestamp, id) of the last row
+returned, so page N costs the same as page 1 (served from ix_proctor_logs_assignment_ts) no matter how
+many events a candidate produced. Only the columns the timeline renders are selected, and payloads
+larger than MAX_PAYLOAD_BYTES are cut down to their message.
+
+The summary header counts raw events plus the daily rollups of events already moved out by
+services.proctor_retention, so totals stay correct after retention.
+"""
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+from core.proctor_constants import ProctorEventSeverity
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+MAX_PAYLOAD_BYTES = 2048
+MAX_MESSAGE_LENGTH = 500
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(timestamp: datetime, log_id: Any) -> str:
+    raw = json.dumps([timestamp.isoformat(), str(log_id)])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """Raises InvalidCursor (a 400 for the caller) for anything encode_cursor could not have produced."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        timestamp, log_id = json.loads(raw)
+        return datetime.fromisoformat(timestamp), uuid.UUID(str(log_id))
+    except (ValueError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+
+
+def _severity_values(severity: str) -> List[str]:
+    # Older rows were written with the column default 'LOW' rather than the enum value
+    return [severity, severity.upper()]
+
+
+def _bounded_payload(payload: Any) -> Any:
+    if not isinstance(payload, dict):
+        return payload
+    if len(json.dumps(payload, default=str)) <= MAX_PAYLOAD_BYTES:
+        return payload
+    message = payload.get("message")
+    return {
+        "message": message[:MAX_MESSAGE_LENGTH] if isinstance(message, str) else None,
+        "truncated": True,
+    }
+
+
+def proctor_log_page(
+    db: Session,
+    assignment_id,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    severity: Optional[str] = None,
+    event_type: Optional[str] = None,
+    include_payload: bool = True,
+) -> Dict[str, Any]:
+    """{"items": [...], "next_cursor": str | None}, newest first."""
+    from models.test_system import ProctorLog
+
+    columns = [ProctorLog.id, ProctorLog.event_type, ProctorLog.severity, ProctorLog.timestamp]
+    if include_payload:
+        columns.append(ProctorLog.payload)
+    query = db.query(*columns).filter(ProctorLog.assignment_id == assignment_id)
+    if severity:
+        query = query.filter(ProctorLog.severity.in_(_severity_values(severity)))
+    if event_type:
+        query = query.filter(ProctorLog.event_type == event_type)
+    if cursor:
+        timestamp, log_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            ProctorLog.timestamp < timestamp,
+            and_(ProctorLog.timestamp == timestamp, ProctorLog.id < log_id)
+        ))
+
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    rows = query.order_by(ProctorLog.timestamp.desc(), ProctorLog.id.desc()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    items = [{
+        "id": row.id,
+        "event_type": row.event_type,
+        "severity": (row.severity or ProctorEventSeverity.LOW.value).lower(),
+        "timestamp": row.timestamp,
+        "payload": _bounded_payload(row.payload) if include_payload else None,
+    } for row in rows]
+    next_cursor = encode_cursor(rows[-1].timestamp, rows[-1].id) if has_more else None
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def proctor_log_summary(db: Session, assignment_id) -> Dict[str, Any]:
+    """Counts by severity and event type over raw logs and retention rollups (two GROUP BY queries)."""
+    from models.test_system import ProctorLog, ProctorLogRollup
+
+    raw = db.query(
+        ProctorLog.severity, ProctorLog.event_type, func.count(),
+        func.min(ProctorLog.timestamp), func.max(ProctorLog.timestamp)
+    ).filter(ProctorLog.assignment_id == assignment_id).group_by(ProctorLog.severity, ProctorLog.event_type).all()
+    rolled = db.query(
+        ProctorLogRollup.severity, ProctorLogRollup.event_type, func.sum(ProctorLogRollup.count),
+        func.min(ProctorLogRollup.first_at), func.max(ProctorLogRollup.last_at)
+    ).filter(ProctorLogRollup.assignment_id == assignment_id).group_by(
+        ProctorLogRollup.severity, ProctorLogRollup.event_type
+    ).all()
+
+    by_severity = {s.value: 0 for s in ProctorEventSeverity}
+    by_type: Dict[str, int] = {}
+    first_at, last_at = None, None
+    archived = 0
+    for rows, is_rollup in ((raw, False), (rolled, True)):
+        for severity, event_type, count, first, last in rows:
+            count = int(count or 0)
+            severity = (severity or ProctorEventSeverity.LOW.value).lower()
+            by_severity[severity] = by_severity.get(severity, 0) + count
+            by_type[event_type] = by_type.get(event_type, 0) + count
+            if is_rollup:
+                archived += count
+            first_at = first if first_at is None or (first is not None and first < first_at) else first_at
+            last_at = last if last_at is None or (last is not None and last > last_at) else last_at
+
+    return {
+        "total": sum(by_severity.values()),
+        "archived": archived,
+        "by_severity": by_severity,
+        "by_type": dict(sorted(by_type.items(), key=lambda kv: -kv[1])),
+        "first_at": first_at,
+        "last_at": last_at,
+    }
@@ -0,0 +1,332 @@
+"""
+Retention and partition maintenance for proctor_logs.
+
+Raw events are only needed while someone may still drill into a session. Once they are older than
+PROCTOR_LOG_RETENTION_DAYS (cut at a UTC day boundary) they are:
+  1. exported to PROCTOR_LOG_ARCHIVE_DIR as one gzipped JSON-lines file per day (the cold tier),
+     and uploaded to the PROCTOR_LOG_ARCHIVE_BUCKET Supabase bucket when that is set,
+  2. rolled up into proctor_log_rollups (count per assignment/interview, event type, severity, day),
+  3. deleted. On Postgres, monthly partitions lying entirely before the cutoff are dropped outright
+     (no row-by-row DELETE, no bloat); the remainder is a range DELETE that partition pruning keeps
+     to the one partially expired month.
+Without PROCTOR_LOG_ARCHIVE_BUCKET (and PROCTOR_LOG_ALLOW_LOCAL_ARCHIVE_ONLY unset) steps 1-3 are skipped:
+raw rows are only rolled up and deleted once the archive has been uploaded, or when the local file is
+accepted as the only copy. Rollup and delete commit
+together, so a failed run is simply retried: the same days' archive files are rewritten and nothing is
+counted twice.
+
+On Postgres every run also creates the next PROCTOR_LOG_PARTITIONS_AHEAD monthly partitions, so new
+rows never pile up in proctor_logs_default (which would block creating that month's partition).
+
+Runs in the background every PROCTOR_LOG_RETENTION_INTERVAL_HOURS (see main.startup_event). Each step
+runs in its own short transaction; a session-level advisory lock, held on a separate connection for the
+whole run, keeps several workers from running it at once. Manual run:
+    python -m services.proctor_retention
+"""
+import asyncio
+import gzip
+import json
+import os
+import re
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from sqlalchemy import Date, func, insert, text
+from sqlalchemy.orm import Session
+from core.config import settings
+from core.logging import get_logger
+
+logger = get_logger()
+
+ADVISORY_LOCK_KEY = 0x70726F63  # arbitrary, shared by every worker
+EXPORT_CHUNK_ROWS = 5000
+STARTUP_DELAY_SECONDS = 60
+PARTITION_NAME = re.compile(r"^proctor_logs_(\d{4})_(\d{2})$")
+
+
+def _add_months(d: date, n: int) -> date:
+    years, month = divmod(d.month - 1 + n, 12)
+    return date(d.year + years, month + 1, 1)
+
+
+def _utc_midnight(d: date) -> datetime:
+    return datetime(d.year, d.month, d.day, tzinfo=timezone.utc)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; everything is stored in UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def partition_name(month: date) -> str:
+    return f"proctor_logs_{month:%Y_%m}"
+
+
+def is_partitioned(db: Session) -> bool:
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    return db.execute(text(
+        "SELECT 1 FROM pg_class WHERE relname = 'proctor_logs' AND relkind = 'p'"
+    )).first() is not None
+
+
+def ensure_partitions(db: Session, today: date, ahead: int) -> List[str]:
+    """Creates missing monthly partitions from this month up to `ahead` months out. Returns new names."""
+    created = []
+    month = today.replace(day=1)
+    for _ in range(ahead + 1):
+        name, upper = partition_name(month), _add_months(month, 1)
+        if db.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is None:
+            stray = db.execute(
+                text("SELECT 1 FROM proctor_logs_default WHERE timestamp >= :start AND timestamp < :end LIMIT 1"),
+                {"start": _utc_midnight(month), "end": _utc_midnight(upper)}
+            ).first()
+            if stray:
+                logger.warning(f"⚠️ Not creating {name}: proctor_logs_default already holds rows for that month")
+            else:
+                db.execute(text(
+                    f"CREATE TABLE {name} PARTITION OF proctor_logs "
+                    f"FOR VALUES FROM ('{month} 00:00:00+00') TO ('{upper} 00:00:00+00')"
+                ))
+                created.append(name)
+        month = upper
+    return created
+
+
+def _archive_row(row) -> Dict[str, Any]:
+    return {
+        "id": str(row.id),
+        "assignment_id": str(row.assignment_id) if row.assignment_id else None,
+        "interview_room_id": row.interview_room_id,
+        "severity": row.severity,
+        "event_type": row.event_type,
+        "payload": row.payload,
+        "timestamp": _as_utc(row.timestamp).isoformat(),
+    }
+
+
+def export_archive(db: Session, cutoff: datetime, archive_dir: str) -> List[str]:
+    """Streams rows older than `cutoff` into one proctor_logs_<day>.jsonl.gz per UTC day. Returns the paths."""
+    from models.test_system import ProctorLog
+
+    os.makedirs(archive_dir, exist_ok=True)
+    rows = db.query(
+        ProctorLog.id, ProctorLog.assignment_id, ProctorLog.interview_room_id, ProctorLog.severity,
+        ProctorLog.event_type, ProctorLog.payload, ProctorLog.timestamp
+    ).filter(ProctorLog.timestamp < cutoff).order_by(ProctorLog.timestamp).yield_per(EXPORT_CHUNK_ROWS)
+
+    paths: List[str] = []
+    current_day, out, path = None, None, None
+    try:
+        for row in rows:
+            day = _as_utc(row.timestamp).date()
+            if day != current_day:
+                if out is not None:
+                    out.close()
+                    os.replace(path + ".tmp", path)
+                    paths.append(path)
+                current_day = day
+                path = os.path.join(archive_dir, f"proctor_logs_{day.isoformat()}.jsonl.gz")
+                # Written under a temp name so a crash never leaves a truncated file behind
+                out = gzip.open(path + ".tmp", "wt", encoding="utf-8")
+            out.write(json.dumps(_archive_row(row), default=str) + "\n")
+        if out is not None:
+            out.close()
+            os.replace(path + ".tmp", path)
+            paths.append(path)
+    finally:
+        if out is not None and not out.closed:
+            out.close()
+    return paths
+
+
+def upload_archive(paths: List[str], bucket: str):
+    """Copies archive files to Supabase Storage. Raises on failure so nothing is deleted unarchived."""
+    from core.storage import get_storage_client
+
+    client = get_storage_client()
+    if client is None:
+        raise RuntimeError("PROCTOR_LOG_ARCHIVE_BUCKET is set but Supabase storage is not configured")
+    for path in paths:
+        with open(path, "rb") as f:
+            client.storage.from_(bucket).upload(
+                path=os.path.basename(path),
+                file=f.read(),
+                file_options={"content-type": "application/gzip", "upsert": "true"}
+            )
+
+
+def rollup(db: Session, cutoff: datetime) -> Dict[str, int]:
+    """Adds daily ProctorLogRollup rows for everything older than `cutoff` (no commit)."""
+    from models.test_system import ProctorLog, ProctorLogRollup
+
+    day = func.date(ProctorLog.timestamp, type_=Date)
+    groups = db.query(
+        ProctorLog.assignment_id, ProctorLog.interview_room_id, day.label("day"),
+        ProctorLog.event_type, ProctorLog.severity,
+        func.count().label("count"),
+        func.min(ProctorLog.timestamp).label("first_at"),
+        func.max(ProctorLog.timestamp).label("last_at"),
+    ).filter(ProctorLog.timestamp < cutoff).group_by(
+        ProctorLog.assignment_id, ProctorLog.interview_room_id, day, ProctorLog.event_type, ProctorLog.severity
+    ).all()
+
+    if groups:
+        db.execute(insert(ProctorLogRollup), [{
+            "id": uuid.uuid4(),
+            "assignment_id": g.assignment_id,
+            "interview_room_id": g.interview_room_id,
+            "day": g.day,
+            "event_type": g.event_type,
+            "severity": g.severity,
+            "count": g.count,
+            "first_at": g.first_at,
+            "last_at": g.last_at,
+        } for g in groups])
+    return {"rollup_rows": len(groups), "rolled_up_events": sum(g.count for g in groups)}
+
+
+def delete_expired(db: Session, cutoff: datetime, partitioned: bool) -> Dict[str, Any]:
+    """Drops fully expired monthly partitions, then deletes the remaining rows before `cutoff` (no commit)."""
+    from models.test_system import ProctorLog
+
+    dropped = []
+    if partitioned:
+        names = db.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = 'proctor_logs'"
+        )).scalars().all()
+        for name in sorted(names):
+            match = PARTITION_NAME.match(name)
+            if match and _utc_midnight(_add_months(date(int(match[1]), int(match[2]), 1), 1)) <= cutoff:
+                db.execute(text(f"DROP TABLE {name}"))
+                dropped.append(name)
+    deleted = db.query(ProctorLog).filter(ProctorLog.timestamp < cutoff).delete(synchronize_session=False)
+    return {"dropped_partitions": dropped, "deleted_rows": deleted}
+
+
+def _try_lock(engine):
+    """
+    Session-level advisory lock on a dedicated connection, held across the run's separate transactions.
+    Returns the connection, False if another worker holds the lock, or None off Postgres (no lock needed).
+    """
+    if engine.dialect.name != "postgresql":
+        return None
+    conn = engine.connect()
+    try:
+        acquired = conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": ADVISORY_LOCK_KEY}).scalar()
+        conn.commit()  # the lock outlives the transaction; don't sit idle in one
+    except Exception:
+        conn.close()
+        raise
+    if not acquired:
+        conn.close()
+        return False
+    return conn
+
+
+def _unlock(conn):
+    try:
+        conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": ADVISORY_LOCK_KEY})
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def run_retention(now: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+    """
+    One blocking maintenance pass (run via asyncio.to_thread). Returns what was done, or None when
+    another worker holds the lock.
+
+    Each step is its own short transaction: creating a partition takes an ACCESS EXCLUSIVE lock on
+    proctor_logs, and holding it through the export and upload would stall every proctor insert.
+    """
+    from core.database import WorkerSessionLocal
+
+    now = now or datetime.now(timezone.utc)
+    db = WorkerSessionLocal()
+    lock = None
+    try:
+        lock = _try_lock(db.get_bind())
+        if lock is False:
+            return None
+
+        partitioned = is_partitioned(db)
+        stats: Dict[str, Any] = {"partitioned": partitioned}
+        if partitioned:
+            stats["created_partitions"] = ensure_partitions(db, now.date(), settings.PROCTOR_LOG_PARTITIONS_AHEAD)
+        db.commit()
+
+        if settings.PROCTOR_LOG_RETENTION_DAYS > 0:
+            if not settings.PROCTOR_LOG_ARCHIVE_BUCKET and not settings.PROCTOR_LOG_ALLOW_LOCAL_ARCHIVE_ONLY:
+                # The local archive dir may be ephemeral: never make it the only copy. Expired rows are kept,
+                # and not exported either, or every run would re-export the whole (growing) expired history
+                logger.warning(
+                    "⚠️ Proctor log retention: PROCTOR_LOG_ARCHIVE_BUCKET unset, keeping expired rows "
+                    "(set PROCTOR_LOG_ALLOW_LOCAL_ARCHIVE_ONLY=true to archive locally)"
+                )
+                stats["expiry_skipped"] = "no archive bucket"
+                return stats
+
+            cutoff = _utc_midnight(now.date() - timedelta(days=settings.PROCTOR_LOG_RETENTION_DAYS))
+            stats["cutoff"] = cutoff.isoformat()
+            paths = export_archive(db, cutoff, settings.PROCTOR_LOG_ARCHIVE_DIR)
+            db.commit()  # end the export's read transaction before the upload
+            stats["archive_files"] = paths
+            if paths and settings.PROCTOR_LOG_ARCHIVE_BUCKET:
+                upload_archive(paths, settings.PROCTOR_LOG_ARCHIVE_BUCKET)
+
+            # Rollup and delete commit together, so a retried run never counts the same rows twice
+            stats.update(rollup(db, cutoff))
+            stats.update(delete_expired(db, cutoff, partitioned))
+            db.commit()
+        return stats
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+        if lock:
+            _unlock(lock)
+
+
+class ProctorRetentionJob:
+    def __init__(self, interval_hours: float):
+        self.interval = interval_hours * 3600
+        self._task: Optional[asyncio.Task] = None
+        self.last_run: Optional[Dict[str, Any]] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        # Let startup traffic settle before the first pass
+        await asyncio.sleep(STARTUP_DELAY_SECONDS)
+        while True:
+            try:
+                stats = await asyncio.to_thread(run_retention)
+                if stats is not None:
+                    self.last_run = stats
+                    if stats.get("rolled_up_events") or stats.get("created_partitions"):
+                        logger.info(f"🗄️ Proctor log retention: {stats}")
+            except Exception as e:
+                logger.error(f"❌ Proctor log retention failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+proctor_retention = ProctorRetentionJob(interval_hours=settings.PROCTOR_LOG_RETENTION_INTERVAL_HOURS)
+
+
+if __name__ == "__main__":
+    print(json.dumps(run_retention(), default=str, indent=2))
@@ -0,0 +1,92 @@
+import asyncio
+import time
+from typing import Dict, NamedTuple, Optional, Tuple
+from core.logging import get_logger
+
+logger = get_logger()
+
+
+class RoomAuth(NamedTuple):
+    candidate_id: int
+    recruiter_id: int
+    status: str
+
+
+def _load_room_auth(room_id: str) -> Optional[RoomAuth]:
+    """Blocking DB lookup. Always called via asyncio.to_thread so it never stalls the event loop."""
+    from core.database import RealtimeSessionLocal
+    from models.interview import InterviewSession
+
+    db = RealtimeSessionLocal()
+    try:
+        row = db.query(
+            InterviewSession.candidate_id,
+            InterviewSession.recruiter_id,
+            InterviewSession.status
+        ).filter(InterviewSession.room_id == room_id).first()
+        if not row:
+            return None
+        status = row.status.value if hasattr(row.status, "value") else str(row.status)
+        return RoomAuth(int(row.candidate_id), int(row.recruiter_id), status)
+    finally:
+        db.close()
+
+
+class RoomAuthCache:
+    """
+    TTL cache of interview room -> (candidate_id, recruiter_id, status) for Socket.IO join_room.
+
+    Steady-state joins/rejoins are a dict lookup. Misses load off the event loop, and concurrent
+    misses for the same room (reconnect storm) share a single query. Only existing rooms are cached;
+    DELETE /interview/{room_id} invalidates locally and the TTL bounds staleness on other workers.
+    """
+
+    TTL_SECONDS = 300
+    MAX_ENTRIES = 10000
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[float, RoomAuth]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def get(self, room_id: str) -> Optional[RoomAuth]:
+        entry = self._entries.get(room_id)
+        if entry and time.monotonic() - entry[0] < self.TTL_SECONDS:
+            return entry[1]
+
+        pending = self._inflight.get(room_id)
+        if pending is None:
+            pending = asyncio.ensure_future(asyncio.to_thread(_load_room_auth, room_id))
+            self._inflight[room_id] = pending
+            pending.add_done_callback(lambda f, r=room_id: self._store(r, f))
+        return await asyncio.shield(pending)
+
+    def _store(self, room_id: str, fut: asyncio.Future):
+        if self._inflight.get(room_id) is not fut:
+            # Invalidated while loading: serve this result to waiters but don't cache it
+            return
+        del self._inflight[room_id]
+        if fut.cancelled() or fut.exception() is not None:
+            return
+        auth = fut.result()
+        if auth is None:
+            return
+        if len(self._entries) >= self.MAX_ENTRIES:
+            self._evict_expired()
+        self._entries[room_id] = (time.monotonic(), auth)
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        for room_id in [r for r, (ts, _) in self._entries.items() if now - ts >= self.TTL_SECONDS]:
+            del self._entries[room_id]
+        if len(self._entries) >= self.MAX_ENTRIES:
+            # Still full of live entries: drop the oldest half
+            oldest = sorted(self._entries.items(), key=lambda item: item[1][0])
+            for room_id, _ in oldest[: len(oldest) // 2]:
+                del self._entries[room_id]
+
+    def invalidate(self, room_id: str):
+        self._entries.pop(room_id, None)
+        self._inflight.pop(room_id, None)
+
+
+room_auth_cache = RoomAuthCache()
@@ -0,0 +1,199 @@
+"""
+Shared Socket.IO room state (participants).
+
+Membership is indexed both ways (room -> sids and sid -> rooms) so disconnect cleanup is
+O(rooms of that sid) instead of a scan over every room.
+
+The in-memory backend is the single-process default. For multiple uvicorn workers / nodes set
+REALTIME_BACKEND=redis and REDIS_URL: room membership then lives in Redis, and the
+Socket.IO client manager (see build_client_manager) relays emits between workers over Redis pub/sub.
+Any Redis-protocol server works (Redis, Valkey, KeyDB, or a local stand-in for development).
+"""
+from abc import ABC, abstractmethod
+from typing import Dict, List, Set
+from core.config import settings
+from core.logging import get_logger
+
+logger = get_logger()
+
+
+class RoomStateBackend(ABC):
+    """Interface for room membership. All methods are async."""
+
+    @abstractmethod
+    async def add(self, room_id: str, sid: str) -> bool:
+        """Adds sid to room. Returns False if it was already a member."""
+        ...
+
+    @abstractmethod
+    async def remove(self, room_id: str, sid: str) -> bool:
+        """Removes sid from room (deleting the room when empty). Returns False if it was not a member."""
+        ...
+
+    @abstractmethod
+    async def members(self, room_id: str) -> Set[str]:
+        ...
+
+    @abstractmethod
+    async def rooms(self) -> List[str]:
+        ...
+
+    @abstractmethod
+    async def rooms_of(self, sid: str) -> Set[str]:
+        ...
+
+    @abstractmethod
+    async def leave_all(self, sid: str) -> List[str]:
+        """Removes sid from every room it joined. Returns those rooms."""
+        ...
+
+
+
+class InMemoryRoomState(RoomStateBackend):
+    """Process-local state. Correct only with a single worker."""
+
+    def __init__(self):
+        self._rooms: Dict[str, Set[str]] = {}
+        self._sid_rooms: Dict[str, Set[str]] = {}
+
+    async def add(self, room_id: str, sid: str) -> bool:
+        participants = self._rooms.setdefault(room_id, set())
+        if sid in participants:
+            return False
+        participants.add(sid)
+        self._sid_rooms.setdefault(sid, set()).add(room_id)
+        return True
+
+    async def remove(self, room_id: str, sid: str) -> bool:
+        participants = self._rooms.get(room_id)
+        if not participants or sid not in participants:
+            return False
+        self._discard(room_id, sid)
+        joined = self._sid_rooms.get(sid)
+        if joined is not None:
+            joined.discard(room_id)
+            if not joined:
+                del self._sid_rooms[sid]
+        return True
+
+    def _discard(self, room_id: str, sid: str):
+        participants = self._rooms.get(room_id)
+        if participants is not None:
+            participants.discard(sid)
+            if not participants:
+                del self._rooms[room_id]
+
+    async def members(self, room_id: str) -> Set[str]:
+        return set(self._rooms.get(room_id, ()))
+
+    async def rooms(self) -> List[str]:
+        return list(self._rooms.keys())
+
+    async def rooms_of(self, sid: str) -> Set[str]:
+        return set(self._sid_rooms.get(sid, ()))
+
+    async def leave_all(self, sid: str) -> List[str]:
+        joined = self._sid_rooms.pop(sid, set())
+        for room_id in joined:
+            self._discard(room_id, sid)
+        return list(joined)
+
+
+class RedisRoomState(RoomStateBackend):
+    """Redis-protocol backend shared by every worker/node."""
+
+    ROOM_TTL_SECONDS = 6 * 60 * 60  # stale rooms (e.g. a crashed worker's sids) expire on their own
+
+    def __init__(self, url: str, prefix: str = "hirex:sio"):
+        import redis.asyncio as aioredis  # optional dependency, only needed for this backend
+
+        self._redis = aioredis.from_url(url, decode_responses=True)
+        self._prefix = prefix
+
+    def _room_key(self, room_id: str) -> str:
+        return f"{self._prefix}:room:{room_id}"
+
+    def _sid_key(self, sid: str) -> str:
+        return f"{self._prefix}:sid:{sid}"
+
+    @property
+    def _rooms_key(self) -> str:
+        return f"{self._prefix}:rooms"
+
+    async def add(self, room_id: str, sid: str) -> bool:
+        key = self._room_key(room_id)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.sadd(key, sid)
+            pipe.expire(key, self.ROOM_TTL_SECONDS)
+            pipe.sadd(self._rooms_key, room_id)
+            pipe.sadd(self._sid_key(sid), room_id)
+            pipe.expire(self._sid_key(sid), self.ROOM_TTL_SECONDS)
+            added, _, _, _, _ = await pipe.execute()
+        return bool(added)
+
+    async def remove(self, room_id: str, sid: str) -> bool:
+        key = self._room_key(room_id)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.srem(key, sid)
+            pipe.scard(key)
+            pipe.srem(self._sid_key(sid), room_id)
+            removed, remaining, _ = await pipe.execute()
+        if remaining == 0:
+            await self._redis.srem(self._rooms_key, room_id)
+        return bool(removed)
+
+    async def members(self, room_id: str) -> Set[str]:
+        return set(await self._redis.smembers(self._room_key(room_id)))
+
+    async def rooms(self) -> List[str]:
+        return list(await self._redis.smembers(self._rooms_key))
+
+    async def rooms_of(self, sid: str) -> Set[str]:
+        return set(await self._redis.smembers(self._sid_key(sid)))
+
+    async def leave_all(self, sid: str) -> List[str]:
+        joined = list(await self._redis.smembers(self._sid_key(sid)))
+        if not joined:
+            return []
+        async with self._redis.pipeline(transaction=True) as pipe:
+            for room_id in joined:
+                pipe.srem(self._room_key(room_id), sid)
+                pipe.scard(self._room_key(room_id))
+            pipe.delete(self._sid_key(sid))
+            results = await pipe.execute()
+        empty = [room_id for i, room_id in enumerate(joined) if results[2 * i + 1] == 0]
+        if empty:
+            await self._redis.srem(self._rooms_key, *empty)
+        return [room_id for i, room_id in enumerate(joined) if results[2 * i]]
+
+
+def redis_configured() -> bool:
+    if settings.REALTIME_BACKEND != "redis":
+        return False
+    if not settings.REDIS_URL:
+        logger.error("[Realtime] REALTIME_BACKEND=redis but REDIS_URL is not set. Falling back to in-memory state.")
+        return False
+    try:
+        import redis.asyncio  # noqa: F401
+    except ImportError:
+        logger.error("[Realtime] 'redis' package not installed. Falling back to in-memory state.")
+        return False
+    return True
+
+
+def build_room_state() -> RoomStateBackend:
+    if redis_configured():
+        logger.info("[Realtime] Using Redis room state")
+        return RedisRoomState(settings.REDIS_URL)
+    return InMemoryRoomState()
+
+
+def build_client_manager():
+    """Socket.IO client manager: Redis pub/sub across workers, or None for the default in-process manager."""
+    if redis_configured():
+        import socketio
+        return socketio.AsyncRedisManager(settings.REDIS_URL)
+    return None
+
+
+room_state: RoomStateBackend = build_room_state()
@@ -0,0 +1,147 @@
+import asyncio
+import hashlib
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+from services.judge_service import judge_service
+from core.logging import get_logger
+
+logger = get_logger()
+
+class SampleRunService:
+    """
+    Low-latency execution path for the candidate "Run" button (sample tests only).
+
+    - Cases run concurrently (bounded globally so a burst can't exhaust the Judge0 quota)
+    - Identical (question, language, code) runs within a short window share one execution
+    - Per-candidate sliding-window rate limit
+    """
+
+    DEDUPE_WINDOW_SECONDS = 5.0
+    RATE_LIMIT_RUNS = 10
+    RATE_LIMIT_WINDOW_SECONDS = 30.0
+    MAX_INFLIGHT_JUDGE_CALLS = 16
+
+    def __init__(self):
+        # key -> (created_at, future resolving to the full ordered result list)
+        self._recent_runs: Dict[str, Tuple[float, asyncio.Future]] = {}
+        self._run_windows: Dict[Any, Deque[float]] = {}
+        self._judge_slots: Optional[asyncio.Semaphore] = None
+
+    # --- Rate limiting ---
+
+    def allow_run(self, user_id: Any) -> bool:
+        """Returns False if the candidate exceeded RATE_LIMIT_RUNS in the current window."""
+        now = time.monotonic()
+        window = self._run_windows.setdefault(user_id, deque())
+        while window and now - window[0] > self.RATE_LIMIT_WINDOW_SECONDS:
+            window.popleft()
+        if len(window) >= self.RATE_LIMIT_RUNS:
+            return False
+        window.append(now)
+        return True
+
+    # --- Execution ---
+
+    @staticmethod
+    def _run_key(question_id: Any, language: str, code: str) -> str:
+        h = hashlib.sha256()
+        h.update(str(question_id).encode())
+        h.update(b"\0")
+        h.update(language.lower().encode())
+        h.update(b"\0")
+        h.update(code.encode())
+        return h.hexdigest()
+
+    def _prune(self, now: float):
+        expired = [k for k, (created, fut) in self._recent_runs.items()
+                   if fut.done() and now - created > self.DEDUPE_WINDOW_SECONDS]
+        for k in expired:
+            del self._recent_runs[k]
+        stale_users = [u for u, w in self._run_windows.items()
+                       if not w or now - w[-1] > self.RATE_LIMIT_WINDOW_SECONDS]
+        for u in stale_users:
+            del self._run_windows[u]
+
+    async def _run_case(self, language: str, code: str, test: Dict[str, Any]) -> Dict[str, Any]:
+        if self._judge_slots is None:
+            self._judge_slots = asyncio.Semaphore(self.MAX_INFLIGHT_JUDGE_CALLS)
+        async with self._judge_slots:
+            result = await judge_service.execute_code(
+                language=language,
+                code=code,
+                stdin=test.get("input", ""),
+                expected_output=test.get("output", "")
+            )
+
+        # Add input/expected to result for UI display
+        result["input"] = test.get("input", "")
+        result["expected"] = test.get("output", "")
+        result["actual"] = (result.get("stdout") or "").strip()
+        return result
+
+    def _lookup(self, key: str) -> Optional[asyncio.Future]:
+        now = time.monotonic()
+        self._prune(now)
+        entry = self._recent_runs.get(key)
+        if entry and (not entry[1].done() or now - entry[0] <= self.DEDUPE_WINDOW_SECONDS):
+            return entry[1]
+        return None
+
+    def _register(self, key: str) -> asyncio.Future:
+        fut = asyncio.get_running_loop().create_future()
+        self._recent_runs[key] = (time.monotonic(), fut)
+        return fut
+
+    async def run(self, question_id: Any, language: str, code: str, sample_tests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Runs all sample tests concurrently and returns results in test order."""
+        results: List[Optional[Dict[str, Any]]] = [None] * len(sample_tests)
+        async for index, result in self.stream(question_id, language, code, sample_tests):
+            results[index] = result
+        return results
+
+    async def stream(self, question_id: Any, language: str, code: str, sample_tests: List[Dict[str, Any]]) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """Yields (index, result) as each sample case finishes (completion order, not test order)."""
+        key = self._run_key(question_id, language, code)
+        shared = self._lookup(key)
+        while shared is not None:
+            # Identical run in flight or just finished: piggyback instead of hitting Judge0 again
+            try:
+                shared_results = await asyncio.shield(shared)
+            except asyncio.CancelledError:
+                if not shared.cancelled():
+                    raise
+                # The leader's request went away mid-run (and dropped the entry): run it ourselves
+                shared = self._lookup(key)
+                continue
+            for index, result in enumerate(shared_results):
+                yield index, dict(result)
+            return
+
+        fut = self._register(key)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(sample_tests)
+
+        async def indexed(i: int, test: Dict[str, Any]):
+            return i, await self._run_case(language, code, test)
+
+        tasks = [asyncio.ensure_future(indexed(i, t)) for i, t in enumerate(sample_tests)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                index, result = await next_done
+                results[index] = result
+                yield index, dict(result)
+            fut.set_result(results)
+        except BaseException as e:
+            for t in tasks:
+                t.cancel()
+            # Don't let followers wait on (or reuse) a run that never finished
+            self._recent_runs.pop(key, None)
+            if not fut.done():
+                if isinstance(e, Exception):
+                    fut.set_exception(e)
+                    fut.exception()  # mark retrieved so an unawaited failure isn't logged
+                else:
+                    fut.cancel()
+            raise
+
+sample_run_service = SampleRunService()
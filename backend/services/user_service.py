@@ -1,3 +1,4 @@
+from typing import Optional
 from sqlalchemy.orm import Session
 from models.user import User
 from models.candidate_profile import CandidateProfile
@@ -14,8 +15,10 @@ class UserService:
         return db.query(User).filter(User.id == user_id).first()
 
     @staticmethod
-    def create_user(db: Session, user: UserCreate):
-        hashed_password = get_password_hash(user.password)
+    def create_user(db: Session, user: UserCreate, hashed_password: Optional[str] = None):
+        """Pass hashed_password (from core.security.password_hasher) when calling from async code."""
+        if hashed_password is None:
+            hashed_password = get_password_hash(user.password)
         db_user = User(
             email=user.email,
             hashed_password=hashed_password,
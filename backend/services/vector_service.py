@@ -2,7 +2,9 @@ import google.generativeai as genai
 from core.config import settings
 import json
 import math
+from typing import Optional
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 from models.job import Job
 from models.candidate_profile import CandidateProfile
 import logging
@@ -130,7 +132,8 @@ def calculate_completion_percentage(profile: CandidateProfile) -> int:
     return int((completed_weight / total_weight) * 100) if total_weight > 0 else 0
 
 
-def search_candidates(db: Session, query: str, limit: int = 10) -> list[CandidateProfile]:
+def search_candidates(db: Session, query: str, limit: int = 10, write_db: Optional[Session] = None) -> list[CandidateProfile]:
+    """`db` may be a read-replica session; missing embeddings are then generated through `write_db` (the primary)."""
     logger.info(f"Searching candidates for '{query}'")
 
     query_embedding = generate_embedding(query)
@@ -156,8 +159,14 @@ def search_candidates(db: Session, query: str, limit: int = 10) -> list[Candidat
         # Auto-heal: Generate embedding if missing
         if not profile.embedding:
             logger.warning(f"Candidate {profile.id} missing embedding. Generating now...")
-            update_candidate_embedding(db, profile.id)
-            db.refresh(profile)
+            if write_db is None or write_db is db:
+                update_candidate_embedding(db, profile.id)
+                db.refresh(profile)
+            else:
+                update_candidate_embedding(write_db, profile.id)
+                embedding = write_db.query(CandidateProfile.embedding).filter(CandidateProfile.id == profile.id).scalar()
+                # Not a change to persist through the replica session
+                set_committed_value(profile, "embedding", embedding)
             
         if profile.embedding:
             try:
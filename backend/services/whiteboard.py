@@ -0,0 +1,195 @@
+"""
+Server-side whiteboard state for interview rooms.
+
+Clients send one wb_draw per pointer move (a single prev -> curr segment). Instead of re-broadcasting
+each one, segments are coalesced per sender into polylines and flushed as a single wb_batch per room
+every tick (see sio._whiteboard_ticker). Flushed strokes go to an append-only op log that is
+periodically compacted into a snapshot: connected strokes with the same pen are merged and
+polylines are simplified. Late joiners and reconnects get that one snapshot (wb_snapshot)
+instead of a replay of every event.
+
+State is per process. With several workers a board lives on the worker its drawers are connected to.
+"""
+import math
+import time
+from typing import Any, Dict, List, Optional
+
+# Compact the op log into the snapshot once it holds this many strokes
+COMPACT_EVERY = 200
+# Max distance (px) a point may deviate from the simplified line in snapshots (live batches are exact)
+SIMPLIFY_TOLERANCE = 0.75
+# Hard cap on snapshot size; the oldest strokes are dropped beyond it
+MAX_SNAPSHOT_POINTS = 200_000
+# Boards nobody has drawn on or synced for this long are dropped
+BOARD_IDLE_TTL_SECONDS = 6 * 60 * 60
+
+MAX_COLOR_LENGTH = 32
+MAX_LINE_WIDTH = 50.0
+
+
+def _point(value: Any) -> Optional[List[float]]:
+    try:
+        x, y = float(value["x"]), float(value["y"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not (math.isfinite(x) and math.isfinite(y)):
+        return None
+    return [round(x, 1), round(y, 1)]
+
+
+def parse_segment(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Validates a client wb_draw payload ({prev, curr, color, width}). Returns None if malformed."""
+    prev, curr = _point(data.get("prev")), _point(data.get("curr"))
+    color = data.get("color")
+    try:
+        width = float(data.get("width"))
+    except (TypeError, ValueError):
+        return None
+    if prev is None or curr is None or not isinstance(color, str) or len(color) > MAX_COLOR_LENGTH:
+        return None
+    if not (0 < width <= MAX_LINE_WIDTH):
+        return None
+    return {"prev": prev, "curr": curr, "color": color, "width": width}
+
+
+def _simplify(points: List[float], tolerance: float) -> List[float]:
+    """Ramer-Douglas-Peucker on a flat [x0, y0, x1, y1, ...] list (iterative, keeps endpoints)."""
+    n = len(points) // 2
+    if n <= 2:
+        return points
+    keep = [False] * n
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        ax, ay, bx, by = points[2 * first], points[2 * first + 1], points[2 * last], points[2 * last + 1]
+        dx, dy = bx - ax, by - ay
+        length = math.hypot(dx, dy)
+        max_dist, index = 0.0, -1
+        for i in range(first + 1, last):
+            px, py = points[2 * i], points[2 * i + 1]
+            if length == 0:
+                dist = math.hypot(px - ax, py - ay)
+            else:
+                dist = abs(dy * px - dx * py + bx * ay - by * ax) / length
+            if dist > max_dist:
+                max_dist, index = dist, i
+        if max_dist > tolerance:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    out: List[float] = []
+    for i in range(n):
+        if keep[i]:
+            out.extend((points[2 * i], points[2 * i + 1]))
+    return out
+
+
+def compact_strokes(strokes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Merges strokes that continue each other with the same pen, then simplifies each polyline."""
+    merged: List[Dict[str, Any]] = []
+    for stroke in strokes:
+        last = merged[-1] if merged else None
+        if (last is not None and last["color"] == stroke["color"] and last["width"] == stroke["width"]
+                and last["points"][-2:] == stroke["points"][:2]):
+            last["points"].extend(stroke["points"][2:])
+        else:
+            merged.append({"color": stroke["color"], "width": stroke["width"], "points": list(stroke["points"])})
+    for stroke in merged:
+        stroke["points"] = _simplify(stroke["points"], SIMPLIFY_TOLERANCE)
+
+    total = sum(len(s["points"]) // 2 for s in merged)
+    while total > MAX_SNAPSHOT_POINTS and merged:
+        total -= len(merged.pop(0)["points"]) // 2
+    return merged
+
+
+class Board:
+    def __init__(self):
+        self.snapshot: List[Dict[str, Any]] = []
+        self.log: List[Dict[str, Any]] = []
+        # sid -> strokes drawn since the last tick (not yet broadcast)
+        self.pending: Dict[str, List[Dict[str, Any]]] = {}
+        self.version = 0
+        self.touched = time.monotonic()
+
+    def add_segment(self, sid: str, segment: Dict[str, Any]):
+        strokes = self.pending.setdefault(sid, [])
+        last = strokes[-1] if strokes else None
+        if (last is not None and last["color"] == segment["color"] and last["width"] == segment["width"]
+                and last["points"][-2:] == segment["prev"]):
+            last["points"].extend(segment["curr"])
+        else:
+            strokes.append({
+                "color": segment["color"],
+                "width": segment["width"],
+                "points": segment["prev"] + segment["curr"],
+            })
+        self.touched = time.monotonic()
+
+    def flush(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Moves pending strokes into the op log. Returns them grouped by sender for broadcasting."""
+        if not self.pending:
+            return {}
+        flushed, self.pending = self.pending, {}
+        for strokes in flushed.values():
+            self.log.extend(strokes)
+        self.version += 1
+        if len(self.log) >= COMPACT_EVERY:
+            self.compact()
+        return flushed
+
+    def compact(self):
+        if self.log:
+            self.snapshot = compact_strokes(self.snapshot + self.log)
+            self.log = []
+
+    def clear(self):
+        self.snapshot, self.log, self.pending = [], [], {}
+        self.version += 1
+        self.touched = time.monotonic()
+
+    def snapshot_payload(self) -> Dict[str, Any]:
+        """Everything drawn so far as one compact message (includes strokes still pending a tick)."""
+        self.compact()
+        self.touched = time.monotonic()
+        # Pending strokes stay queued for the room's next wb_batch; redrawing them on the joiner is harmless
+        pending = [dict(s, points=list(s["points"])) for strokes in self.pending.values() for s in strokes]
+        return {"version": self.version, "strokes": self.snapshot + pending}
+
+
+class WhiteboardStore:
+    def __init__(self):
+        self._boards: Dict[str, Board] = {}
+
+    def __len__(self) -> int:
+        return len(self._boards)
+
+    def get(self, room_id: str) -> Optional[Board]:
+        return self._boards.get(room_id)
+
+    def board(self, room_id: str) -> Board:
+        board = self._boards.get(room_id)
+        if board is None:
+            board = self._boards[room_id] = Board()
+        return board
+
+    def flush_all(self) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+        """room_id -> sid -> strokes for every board with pending strokes."""
+        out = {}
+        for room_id, board in self._boards.items():
+            flushed = board.flush()
+            if flushed:
+                out[room_id] = flushed
+        return out
+
+    def drop_idle(self):
+        now = time.monotonic()
+        for room_id in [r for r, b in self._boards.items() if now - b.touched > BOARD_IDLE_TTL_SECONDS]:
+            del self._boards[room_id]
+
+    def discard(self, room_id: str):
+        self._boards.pop(room_id, None)
+
+
+whiteboards = WhiteboardStore()
@@ -1,7 +1,20 @@
 import socketio
 import asyncio
+import os
+import time
 import uuid
 from core.logging import get_logger
+from services.room_state import room_state, build_client_manager
+from services.room_auth_cache import room_auth_cache
+from services.principal_cache import principal_cache
+from services.proctor_log_buffer import proctor_log_buffer
+from services.whiteboard import whiteboards, parse_segment
+from services.proctor_aggregates import proctor_aggregates, SUMMARY_INTERVAL_SECONDS
+from core.rate_limit import Limit, rate_limiter, sio_rate_limited
+from core.proctor_settings import ProctorSettings
+from core.metrics import sio_event_metrics, sio_emit_metrics, sio_connections
+from core.security import decode_access_token
+from jose import JWTError
 
 # logger = get_logger() 
 # Using a lightweight print for critical server events to avoid logger overhead during high traffic
@@ -9,8 +22,21 @@ from core.logging import get_logger
 
 logger = get_logger()
 
+class InstrumentedAsyncServer(socketio.AsyncServer):
+    """AsyncServer that records emit latency per event name (served on /metrics)."""
+
+    async def emit(self, event, *args, **kwargs):
+        started = time.perf_counter()
+        ok = False
+        try:
+            result = await super().emit(event, *args, **kwargs)
+            ok = True
+            return result
+        finally:
+            sio_emit_metrics.record(event, (time.perf_counter() - started) * 1000.0, ok)
+
 # Create a Socket.IO server with OPTIMIZED configuration
-sio = socketio.AsyncServer(
+sio = InstrumentedAsyncServer(
     async_mode='asgi',
     cors_allowed_origins='*',
     # CRITICAL FIX: Set these to False to stop the terminal flood and reduce CPU usage
@@ -18,119 +44,136 @@ sio = socketio.AsyncServer(
     engineio_logger=False,
     ping_timeout=60,
     ping_interval=25,
-    namespaces=['/']
+    namespaces=['/'],
+    # None = default in-process manager; Redis pub/sub when REALTIME_BACKEND=redis (multi-worker)
+    client_manager=build_client_manager()
 )
 
 # This is no longer needed since we wrap in main.py
 sio_app = socketio.ASGIApp(sio)
 
-# In-memory participant tracking (for single-process server)
-room_participants = {}
+# Participant tracking lives in services.room_state and rate-limit buckets in core.rate_limit
+# (in-memory for a single worker, Redis when REALTIME_BACKEND=redis)
+
+# Rate limiting for proctor_event per socket (token bucket: burst of 20, refilled over 10 seconds)
+PROCTOR_EVENT_LIMIT = Limit(ProctorSettings.SOCKET_EVENTS_PER_10S, 10)
 
-# Rate limiting for proctor_event per socket (max events per time window)
-proctor_event_limits = {}  # { sid: { count: int, window_start: timestamp } }
-MAX_PROCTOR_EVENTS_PER_10S = 20  # allow up to 20 proctor events per 10 seconds per socket
+# Recruiters get per-room proctoring aggregates at this cadence instead of every raw event
+PROCTOR_SUMMARY_INTERVAL_SECONDS = SUMMARY_INTERVAL_SECONDS
 
 # PERFORMANCE FIX: Removed @sio.on('*') catch_all
 # Listening to '*' adds overhead to every single packet. 
 # Removing it allows the ICE candidates to flow without blocking.
 
+def _handshake_token(environ, auth):
+    """JWT from the Socket.IO auth payload ({token}) or, for non-browser clients, the Authorization header"""
+    if isinstance(auth, dict) and auth.get('token'):
+        return str(auth['token'])
+    header = environ.get('HTTP_AUTHORIZATION', '')
+    if header[:7].lower() == 'bearer ':
+        return header[7:]
+    return None
+
 @sio.event
-async def connect(sid, environ):
-    """Handle client connection"""
+async def connect(sid, environ, auth=None):
+    """Authenticate the handshake once; handlers read identity from the session instead of trusting payloads"""
+    token = _handshake_token(environ, auth)
+    if not token:
+        logger.warning(f"⛔ SOCKET CONNECT REFUSED: sid={sid} (no token)")
+        raise socketio.exceptions.ConnectionRefusedError('missing_auth')
+
+    try:
+        claims = decode_access_token(token)
+        user_id = int(claims['sub'])
+    except (JWTError, ValueError):
+        logger.warning(f"⛔ SOCKET CONNECT REFUSED: sid={sid} (invalid token)")
+        raise socketio.exceptions.ConnectionRefusedError('invalid_token')
+
+    # Role and active flag come from the principal cache, not the token's claims (which outlive role changes
+    # and deactivation), as for HTTP requests in core.auth.get_current_user
+    principal = await principal_cache.get(user_id)
+    if not principal or not principal.is_active:
+        logger.warning(f"⛔ SOCKET CONNECT REFUSED: sid={sid} (unknown or inactive user {user_id})")
+        raise socketio.exceptions.ConnectionRefusedError('invalid_token')
+    role = principal.role
+
+    await sio.save_session(sid, {'user_id': user_id, 'role': role})
+
     # Keep connection logs as they are infrequent and useful
-    logger.info(f"✅ SOCKET CONNECT: sid={sid}")
+    logger.info(f"✅ SOCKET CONNECT: sid={sid} user_id={user_id} role={role}")
+    sio_connections.inc()
+
+async def _identity(sid):
+    """(user_id, role) established at connect time"""
+    session = await sio.get_session(sid)
+    return session['user_id'], session['role']
+
+def _in_interview_room(sid, room_id) -> bool:
+    """
+    Whether join_room admitted sid to this interview room. The sid lives on this worker, so the local
+    Socket.IO manager answers without a room_state round trip (hot paths: every whiteboard stroke).
+    Excludes the sid's own room and the proctor/assignment rooms, which aren't interview rooms.
+    """
+    return (
+        isinstance(room_id, str) and room_id != sid
+        and not room_id.startswith((PROCTOR_WATCH_PREFIX, ASSIGNMENT_ROOM_PREFIX))
+        and room_id in sio.rooms(sid)
+    )
 
 @sio.event
 async def disconnect(sid):
     """Handle client disconnection"""
     logger.info(f"❌ SOCKET DISCONNECT: sid={sid}")
+    sio_connections.dec()
     
-    # Remove user from all rooms they were in
-    rooms_to_clean = []
-    for room_id, participants in room_participants.items():
-        if sid in participants:
-            participants.remove(sid)
-            rooms_to_clean.append(room_id)
-            logger.info(f"   Removed {sid} from room {room_id}")
-            
-            # Notify other participants
-            await sio.emit('user_left', {'sid': sid}, room=room_id)
-    
-    # Clean up empty rooms
-    for room_id in rooms_to_clean:
-        if len(room_participants[room_id]) == 0:
-            del room_participants[room_id]
-            logger.info(f"   Deleted empty room: {room_id}")
+    # Remove user from the rooms they were in via the sid -> rooms index (empty rooms are deleted by the backend)
+    rooms_left = await room_state.leave_all(sid)
+    # Per-socket rate-limit bucket is useless once the socket is gone
+    await rate_limiter.reset("proctor_event", sid)
+
+    if rooms_left:
+        logger.info(f"   Removed {sid} from rooms {rooms_left}")
+        # Notify other participants in all rooms concurrently
+        await asyncio.gather(*(sio.emit('user_left', {'sid': sid}, room=room_id) for room_id in rooms_left))
 
 @sio.event
+@sio_event_metrics.instrumented()
 async def join_room(sid, data):
     """Handle user joining a room"""
     room_id = data.get('room_id')
-    user_id = data.get('user_id')
-    user_role = data.get('user_role')
 
     if not room_id:
         logger.error(f"❌ JOIN_ROOM: No room_id provided by {sid}")
         await sio.emit('join_denied', {'reason': 'missing_room_id'}, room=sid)
         return
 
-    logger.info(f"👤 JOIN_ROOM Request: sid={sid} room={room_id} user_id={user_id} role={user_role}")
+    # Identity comes from the authenticated handshake; client-supplied user_id/user_role are ignored
+    uid, user_role = await _identity(sid)
+    logger.debug("👤 JOIN_ROOM Request: sid={} room={} user_id={} role={}", sid, room_id, uid, user_role)
 
-    # Basic auth validation: require user_id and user_role to be provided by the authenticated client
-    if not user_id or not user_role:
-        logger.warning(f"⚠️ JOIN_ROOM: Missing authentication info from {sid}")
-        await sio.emit('join_denied', {'reason': 'missing_auth'}, room=sid)
-        return
-
-    # Verify against DB that this room exists and that the user is the scheduled candidate
+    # Verify this room exists and the user is allowed in (TTL cache; DB lookup runs off the event loop on a miss)
     try:
-        from core.database import SessionLocal
-        from models.interview import InterviewSession
-
-        db = SessionLocal()
-        interview = db.query(InterviewSession).filter(InterviewSession.room_id == room_id).first()
+        interview = await room_auth_cache.get(room_id)
     except Exception as e:
         logger.error(f"❌ JOIN_ROOM DB error for {sid}: {e}", exc_info=True)
         await sio.emit('join_denied', {'reason': 'db_error'}, room=sid)
-        try:
-            db.close()
-        except Exception:
-            pass
         return
 
     if not interview:
         logger.warning(f"⚠️ JOIN_ROOM: No interview found for room {room_id} (sid={sid})")
         await sio.emit('join_denied', {'reason': 'room_not_found'}, room=sid)
-        db.close()
-        return
-
-    # Enforce: only the scheduled candidate may join
-    try:
-        # user_id may be string; cast safely
-        uid = int(user_id)
-    except Exception:
-        logger.warning(f"⚠️ JOIN_ROOM: Invalid user_id provided by {sid}: {user_id}")
-        await sio.emit('join_denied', {'reason': 'invalid_user_id'}, room=sid)
-        db.close()
         return
 
     # Authorization: allow scheduled candidate OR the recruiter who scheduled OR admin role
-    allowed = False
-    try:
-        if user_role == 'candidate' and uid == int(interview.candidate_id):
-            allowed = True
-        elif user_role == 'recruiter' and uid == int(interview.recruiter_id):
-            allowed = True
-        elif user_role == 'admin':
-            allowed = True
-    except Exception:
-        allowed = False
+    allowed = (
+        (user_role == 'candidate' and uid == interview.candidate_id)
+        or (user_role == 'recruiter' and uid == interview.recruiter_id)
+        or user_role == 'admin'
+    )
 
     if not allowed:
-        logger.warning(f"⛔ JOIN_ROOM DENIED: sid={sid} user_id={user_id} role={user_role} - not authorized for room {room_id}")
+        logger.warning(f"⛔ JOIN_ROOM DENIED: sid={sid} user_id={uid} role={user_role} - not authorized for room {room_id}")
         await sio.emit('join_denied', {'reason': 'unauthorized'}, room=sid)
-        db.close()
         return
 
     # Passed authorization - proceed to add to the room
@@ -138,48 +181,41 @@ async def join_room(sid, data):
         # Add user to Socket.IO room
         await sio.enter_room(sid, room_id)
 
-        # Initialize room if it doesn't exist
-        if room_id not in room_participants:
-            room_participants[room_id] = set()
-            logger.info(f"   Created new room: {room_id}")
+        # The board exists only for rooms someone was authorized into; late joiners / reconnects
+        # get it as one compact snapshot
+        whiteboards.board(room_id)
+        await _send_whiteboard_snapshot(sid, room_id)
+
+        # Recruiters receive the room's proctoring summary (never the candidate)
+        if user_role in ('recruiter', 'admin'):
+            await sio.enter_room(sid, proctor_watch_room(room_id))
+            await _send_proctor_summary(sid, room_id)
+
+        # Get current participants before adding new one (shared across workers)
+        participants_list = [p for p in await room_state.members(room_id) if p != sid]
 
         # Check if user already in room (reconnection case)
-        if sid in room_participants[room_id]:
-            logger.info(f"   User {sid} already in room {room_id} (reconnection)")
+        if not await room_state.add(room_id, sid):
+            logger.debug("   User {} already in room {} (reconnection)", sid, room_id)
             # Still send participant list in case of reconnection
-            participants_list = list(room_participants[room_id])
-            other_participants = [p for p in participants_list if p != sid]
+            other_participants = participants_list
 
             if other_participants:
-                logger.info(f"   Sending existing participants to {sid}: {other_participants}")
                 await sio.emit('existing_participants', {
                     'participants': other_participants
                 }, room=sid)
-            db.close()
             return
 
-        # Get current participants before adding new one
-        participants_list = list(room_participants[room_id])
-        logger.info(f"   Current participants in {room_id}: {participants_list}")
-
-        # Add new participant
-        room_participants[room_id].add(sid)
-        logger.info(f"   Added {sid} to room. Total participants: {len(room_participants[room_id])}")
+        logger.debug("   Added {} to room {}. Total participants: {}", sid, room_id, len(participants_list) + 1)
 
         # Send list of existing participants to the newly joined user
         # AND Notify existing participants about the new user
         tasks = []
 
         if participants_list:
-            logger.info(f"   Sending existing participants to {sid}: {participants_list}")
             tasks.append(sio.emit('existing_participants', {
                 'participants': participants_list
             }, room=sid))
-        else:
-            logger.info(f"   No existing participants to send to {sid}")
-
-        if participants_list:
-            logger.info(f"   Notifying existing participants about new user {sid}")
             tasks.append(sio.emit('user_joined', {
                 'sid': sid
             }, room=room_id, skip_sid=sid))
@@ -187,121 +223,86 @@ async def join_room(sid, data):
         if tasks:
             await asyncio.gather(*tasks)
 
-        db.close()
-
     except Exception as e:
         logger.error(f"❌ Error in join_room for {sid}: {e}", exc_info=True)
-        try:
-            db.close()
-        except Exception:
-            pass
 
-@sio.event
-async def offer(sid, data):
-    """Relay WebRTC offer to target peer - INITIATES VIDEO HANDSHAKE"""
+# ------------------------------------------------------------------
+# WebRTC Signaling Relay (hot path)
+# ------------------------------------------------------------------
+# Offers, answers and ICE candidates go sid -> sid: one emit, one serialization, no room fan-out.
+# Payloads are validated up front and per-message logging is at debug level (lazy formatting),
+# so the relay cost is visible in sio_event_metrics rather than in log I/O.
+
+MAX_SID_LENGTH = 64
+MAX_SDP_LENGTH = 100_000       # a full SDP with many codecs is typically < 10 KB
+MAX_CANDIDATE_LENGTH = 2_048
+
+def _valid_sid(value) -> bool:
+    return isinstance(value, str) and 0 < len(value) <= MAX_SID_LENGTH
+
+def _valid_sdp(sdp, expected_type: str) -> bool:
+    return (
+        isinstance(sdp, dict)
+        and sdp.get('type') == expected_type
+        and isinstance(sdp.get('sdp'), str)
+        and len(sdp['sdp']) <= MAX_SDP_LENGTH
+    )
+
+def _valid_candidate(candidate) -> bool:
+    return (
+        isinstance(candidate, dict)
+        and isinstance(candidate.get('candidate'), str)
+        and len(candidate['candidate']) <= MAX_CANDIDATE_LENGTH
+    )
+
+async def _relay_description(event: str, sid, data):
+    """Forwards an offer/answer to target_sid. Falls back to the room only if the client sent no target."""
     target_sid = data.get('target_sid')
     room_id = data.get('room_id')
     sdp = data.get('sdp')
-    
-    if not target_sid:
-        logger.error(f"❌ OFFER: No target_sid from {sid} (room: {room_id})")
-        # FALLBACK: Broadcast to room if target_sid missing
-        if room_id and sdp:
-            logger.warning(f"   Using fallback: Broadcasting offer to room {room_id}")
-            await sio.emit('offer', {
-                'sdp': sdp,
-                'sender_sid': sid
-            }, room=room_id, skip_sid=sid)
-        return
-    
-    if not sdp:
-        logger.error(f"❌ OFFER: No SDP from {sid} → {target_sid}")
+
+    if not _valid_sdp(sdp, event):
+        logger.debug("⚠️ {}: Invalid SDP from {}", event.upper(), sid)
         return
-    
-    logger.info(f"📤 OFFER: {sid} → {target_sid} (room: {room_id}) [INITIATING HANDSHAKE]")
-    
-    try:
-        await sio.emit('offer', {
-            'sdp': sdp,
-            'sender_sid': sid
-        }, room=target_sid)
-        logger.info(f"   ✅ Offer relayed successfully")
-    except Exception as e:
-        logger.error(f"❌ Error relaying offer to {target_sid}: {e}", exc_info=True)
-        # FALLBACK: Broadcast to room if direct fails
-        if room_id:
-            logger.warning(f"   Fallback: Broadcasting offer to room {room_id}")
-            try:
-                await sio.emit('offer', {
-                    'sdp': sdp,
-                    'sender_sid': sid
-                }, room=room_id, skip_sid=sid)
-            except Exception as e2:
-                logger.error(f"   Fallback also failed: {e2}")
+
+    message = {'sdp': sdp, 'sender_sid': sid}
+    if _valid_sid(target_sid):
+        logger.debug("📤 {}: {} → {} (room: {})", event.upper(), sid, target_sid, room_id)
+        await sio.emit(event, message, room=target_sid)
+    elif room_id:
+        # Legacy clients without target_sid: fan out to the rest of the room
+        logger.debug("⚠️ {}: No target_sid from {}, broadcasting to room {}", event.upper(), sid, room_id)
+        await sio.emit(event, message, room=room_id, skip_sid=sid)
+    else:
+        logger.debug("⚠️ {}: No target_sid or room_id from {}", event.upper(), sid)
 
 @sio.event
+@sio_event_metrics.instrumented()
+async def offer(sid, data):
+    """Relay WebRTC offer to target peer - INITIATES VIDEO HANDSHAKE"""
+    await _relay_description('offer', sid, data)
+
+@sio.event
+@sio_event_metrics.instrumented()
 async def answer(sid, data):
-    """Relay WebRTC answer to target peer - CRITICAL PATH FOR VIDEO START"""
-    target_sid = data.get('target_sid')
-    room_id = data.get('room_id')
-    sdp = data.get('sdp')
-    
-    if not sdp:
-        logger.error(f"❌ ANSWER: No SDP from {sid}")
-        return
-    
-    # PRIMARY METHOD: If we have room_id, broadcast to entire room (more reliable)
-    if room_id:
-        logger.info(f"📤 ANSWER: {sid} → room {room_id} (Broadcasting to all)")
-        try:
-            await sio.emit('answer', {
-                'sdp': sdp,
-                'sender_sid': sid
-            }, room=room_id, skip_sid=sid)
-            logger.info(f"   ✅ Answer broadcasted to room")
-            return
-        except Exception as e:
-            logger.error(f"❌ Error broadcasting answer: {e}")
-    
-    # FALLBACK: If no room_id, try direct target_sid
-    if target_sid:
-        logger.info(f"📤 ANSWER: {sid} → {target_sid} (direct)")
-        try:
-            await sio.emit('answer', {
-                'sdp': sdp,
-                'sender_sid': sid
-            }, room=target_sid)
-            logger.info(f"   ✅ Answer relayed to {target_sid}")
-        except Exception as e:
-            logger.error(f"❌ Error relaying answer: {e}")
-    else:
-        logger.warning(f"⚠️ ANSWER: No room_id or target_sid provided")
+    """Relay WebRTC answer to the peer that sent the offer - CRITICAL PATH FOR VIDEO START"""
+    await _relay_description('answer', sid, data)
 
 @sio.event
+@sio_event_metrics.instrumented()
 async def ice_candidate(sid, data):
     """Relay ICE candidate to target peer"""
     target_sid = data.get('target_sid')
     candidate = data.get('candidate')
-    
-    if not target_sid:
-        # Don't log error here to avoid noise
-        return
-    
-    if not candidate:
+
+    # ICE candidates arrive in bursts of dozens per second: drop malformed ones silently
+    if not _valid_sid(target_sid) or not _valid_candidate(candidate):
         return
-    
-    # PERFORMANCE FIX: Commented out log. 
-    # ICE candidates generate 50+ logs per second, causing I/O blocking and video lag.
-    # logger.debug(f"📤 ICE: {sid} → {target_sid}")
-    
-    try:
-        await sio.emit('ice_candidate', {
-            'candidate': candidate,
-            'sender_sid': sid
-        }, room=target_sid)
-    except Exception as e:
-        # Only log if there is an actual transmission error
-        logger.error(f"❌ Error relaying ICE candidate: {e}", exc_info=True)
+
+    await sio.emit('ice_candidate', {
+        'candidate': candidate,
+        'sender_sid': sid
+    }, room=target_sid)
 
 # Add a health check endpoint
 @sio.event
@@ -314,9 +315,9 @@ async def ping(sid, data):
 async def get_room_info(sid, data):
     """Get information about a room (for debugging)"""
     room_id = data.get('room_id')
+    participants = list(await room_state.members(room_id)) if room_id else []
     
-    if room_id in room_participants:
-        participants = list(room_participants[room_id])
+    if participants:
         await sio.emit('room_info', {
             'room_id': room_id,
             'participants': participants,
@@ -330,91 +331,248 @@ async def get_room_info(sid, data):
             'exists': False
         }, room=sid)
 
+async def realtime_metrics() -> dict:
+    """Socket.IO section of GET /metrics (main.metrics adds the HTTP/DB ones). Counters are per worker; rooms follow room_state."""
+    room_ids = await room_state.rooms()
+    sizes = [len(m) for m in await asyncio.gather(*(room_state.members(r) for r in room_ids))]
+    distribution = {'1': 0, '2': 0, '3+': 0}
+    for size in sizes:
+        distribution['1' if size <= 1 else '2' if size == 2 else '3+'] += 1
+
+    return {
+        'worker_pid': os.getpid(),
+        'connections': {'live': sio_connections.value, 'peak': sio_connections.peak},
+        'rooms': {
+            'count': len(room_ids),
+            'participants': sum(sizes),
+            'max_participants': max(sizes, default=0),
+            'size_distribution': distribution,
+        },
+        'events': sio_event_metrics.snapshot(),
+        'emits': sio_emit_metrics.snapshot(),
+        'rate_limit_rejections': dict(rate_limiter.rejections),
+        'proctor_log_buffer': proctor_log_buffer.stats(),
+        'whiteboards': len(whiteboards),
+        'proctor_aggregates': len(proctor_aggregates),
+    }
+
+# ------------------------------------------------------------------
+# Grading Result Push (per-assignment rooms)
+# ------------------------------------------------------------------
+
+ASSIGNMENT_ROOM_PREFIX = "assignment:"
+
+def assignment_room(assignment_id) -> str:
+    """Socket.IO room that receives grading updates for one assignment"""
+    return f"{ASSIGNMENT_ROOM_PREFIX}{assignment_id}"
+
+def _authorize_assignment_subscription(assignment_id: str, uid: int, user_role: str) -> bool:
+    """Blocking DB check: candidate owns the assignment, or recruiter owns the test. Run via asyncio.to_thread."""
+    from core.database import RealtimeSessionLocal
+    from models.test_system import TestAssignment, Test
+
+    db = RealtimeSessionLocal()
+    try:
+        row = db.query(TestAssignment.candidate_id, Test.recruiter_id)\
+            .join(Test, Test.id == TestAssignment.test_id)\
+            .filter(TestAssignment.id == assignment_id)\
+            .first()
+        if not row:
+            return False
+        if user_role == 'candidate':
+            return uid == int(row.candidate_id)
+        if user_role == 'recruiter':
+            return uid == int(row.recruiter_id)
+        return user_role == 'admin'
+    finally:
+        db.close()
+
+@sio.event
+async def join_assignment(sid, data):
+    """Subscribe to grading_progress / grading_result pushes for an assignment"""
+    assignment_id = data.get('assignment_id')
+    if not assignment_id:
+        await sio.emit('join_denied', {'reason': 'missing_assignment_id'}, room=sid)
+        return
+
+    user_id, user_role = await _identity(sid)
+    try:
+        uuid.UUID(str(assignment_id))
+        allowed = await asyncio.to_thread(_authorize_assignment_subscription, assignment_id, user_id, user_role)
+    except Exception as e:
+        logger.warning(f"JOIN_ASSIGNMENT check failed for {sid}: {e}")
+        allowed = False
+
+    if not allowed:
+        await sio.emit('join_denied', {'reason': 'unauthorized', 'assignment_id': assignment_id}, room=sid)
+        return
+
+    await sio.enter_room(sid, assignment_room(assignment_id))
+    await sio.emit('assignment_joined', {'assignment_id': assignment_id}, room=sid)
+    if user_role in ('recruiter', 'admin'):
+        aggregate = proctor_aggregates.get(assignment_room(assignment_id))
+        if aggregate is not None:
+            await sio.emit('proctor_summary', {'assignment_id': assignment_id, **aggregate.summary()}, room=sid)
+
+@sio.event
+async def leave_assignment(sid, data):
+    """Unsubscribe from an assignment's grading updates"""
+    assignment_id = data.get('assignment_id')
+    if assignment_id:
+        await sio.leave_room(sid, assignment_room(assignment_id))
+
+async def publish_grading_event(assignment_id, event: str, payload: dict):
+    """
+    Push a grading update to everyone subscribed to the assignment.
+    Never raises: a failed push must not fail grading (results are persisted regardless).
+    """
+    try:
+        await sio.emit(event, payload, room=assignment_room(assignment_id))
+    except Exception as e:
+        logger.warning(f"Failed to publish {event} for assignment {assignment_id}: {e}")
+
 # ------------------------------------------------------------------
 # Whiteboard Events
 # ------------------------------------------------------------------
 
+# Coalesced draw points are broadcast as one wb_batch per room per tick
+WHITEBOARD_TICK_SECONDS = 0.05
+WHITEBOARD_IDLE_SWEEP_SECONDS = 60
+_whiteboard_ticker_task = None
+
+async def _whiteboard_ticker():
+    last_sweep = asyncio.get_running_loop().time()
+    while True:
+        await asyncio.sleep(WHITEBOARD_TICK_SECONDS)
+        try:
+            emits = []
+            for room_id, by_sender in whiteboards.flush_all().items():
+                for sender_sid, strokes in by_sender.items():
+                    # Sender already drew these locally
+                    emits.append(sio.emit('wb_batch', {'room_id': room_id, 'strokes': strokes},
+                                          room=room_id, skip_sid=sender_sid))
+            if emits:
+                await asyncio.gather(*emits)
+
+            now = asyncio.get_running_loop().time()
+            if now - last_sweep > WHITEBOARD_IDLE_SWEEP_SECONDS:
+                whiteboards.drop_idle()
+                last_sweep = now
+        except Exception as e:
+            logger.error(f"❌ Whiteboard tick failed: {e}", exc_info=True)
+
+def _ensure_whiteboard_ticker():
+    global _whiteboard_ticker_task
+    if _whiteboard_ticker_task is None or _whiteboard_ticker_task.done():
+        _whiteboard_ticker_task = asyncio.create_task(_whiteboard_ticker())
+
+async def _send_whiteboard_snapshot(sid, room_id):
+    board = whiteboards.get(room_id)
+    if board is None:
+        return
+    payload = board.snapshot_payload()
+    payload['room_id'] = room_id
+    await sio.emit('wb_snapshot', payload, room=sid)
+
 @sio.event
+@sio_event_metrics.instrumented()
 async def wb_draw(sid, data):
-    """Broadcast drawing events to room"""
+    """Queue a drawn segment; it reaches the room in the next wb_batch"""
     room_id = data.get('room_id')
-    if not room_id:
+    if not room_id or not _in_interview_room(sid, room_id):
         return
-    
-    # Broadcast to everyone ELSE in the room
-    await sio.emit('wb_draw', data, room=room_id, skip_sid=sid)
+
+    segment = parse_segment(data)
+    if segment is None:
+        return
+
+    # Created in join_room; re-created here only if it was dropped as idle while members stayed
+    whiteboards.board(room_id).add_segment(sid, segment)
+    _ensure_whiteboard_ticker()
+
+@sio.event
+async def wb_sync(sid, data):
+    """Send the current board to a client that just opened the whiteboard"""
+    room_id = data.get('room_id')
+    if not room_id or not _in_interview_room(sid, room_id):
+        return
+    await _send_whiteboard_snapshot(sid, room_id)
 
 @sio.event
 async def wb_clear(sid, data):
     """Broadcast clear board event"""
     room_id = data.get('room_id')
-    if not room_id:
+    if not room_id or not _in_interview_room(sid, room_id):
         return
-        
+
+    board = whiteboards.get(room_id)
+    if board is not None:
+        board.clear()
     await sio.emit('wb_clear', data, room=room_id, skip_sid=sid)
 
 # ------------------------------------------------------------------
 # Proctoring Events
 # ------------------------------------------------------------------
 
-def save_proctor_log(room_id: str, event_type: str, payload: dict):
-    """
-    Save proctoring event to database asynchronously.
-    IMPORTANT: Only saves METADATA, never saves images/snapshots.
-    Handles both TestAssignments (assignment_id) and InterviewSessions (interview_room_id).
-    """
-    try:
-        # SECURITY: Never save image data, only metadata
-        # Strip any image fields from payload
-        safe_payload = {k: v for k, v in payload.items() 
-                       if k not in ['image', 'snapshot', 'screenshot', 'base64', 'blob', 'buffer']}
-        
-        from core.database import SessionLocal
-        db = SessionLocal()
+PROCTOR_WATCH_PREFIX = "proctor:"
+
+def proctor_watch_room(room_id) -> str:
+    """Socket.IO room of the recruiters/admins watching an interview (test sessions use assignment_room)"""
+    return f"{PROCTOR_WATCH_PREFIX}{room_id}"
+
+_proctor_summary_ticker_task = None
+
+async def _proctor_summary_ticker():
+    while True:
+        await asyncio.sleep(PROCTOR_SUMMARY_INTERVAL_SECONDS)
         try:
-            from models.interview import InterviewSession
-            from models.test_system import ProctorLog
-            from sqlalchemy.exc import IntegrityError
-            
-            interview = db.query(InterviewSession).filter(InterviewSession.room_id == room_id).first()
-            
-            log_entry = ProctorLog(
-                event_type=event_type,
-                payload=safe_payload  # Use safe_payload, not payload
-            )
-
-            if interview:
-                log_entry.interview_room_id = room_id
-                db.add(log_entry)
-                db.commit()
-            else:
-                # For assignments, just silently skip if room not found
-                # Don't throw errors for orphaned sessions
-                try:
-                    uuid.UUID(room_id)
-                    log_entry.assignment_id = room_id
-                    db.add(log_entry)
-                    db.commit()
-                except (ValueError, IntegrityError):
-                    # Room/assignment not found - this is ok for orphaned sessions
-                    # Just don't save it
-                    pass
+            emits = []
+            for key, summary in proctor_aggregates.take_dirty():
+                if key.startswith(ASSIGNMENT_ROOM_PREFIX):
+                    # Test sessions: recruiters subscribed via join_assignment
+                    message = {'assignment_id': key[len(ASSIGNMENT_ROOM_PREFIX):], **summary}
+                    emits.append(sio.emit('proctor_summary', message, room=key))
+                else:
+                    message = {'room_id': key, **summary}
+                    emits.append(sio.emit('proctor_summary', message, room=proctor_watch_room(key)))
+            if emits:
+                await asyncio.gather(*emits)
+            proctor_aggregates.drop_idle()
         except Exception as e:
-            db.rollback()
-            # Don't spam logs with proctor save errors
-            pass
-        finally:
-            db.close()
-    except Exception as e:
-        # Silently fail for proctor logs - don't crash the interview
-        pass
+            logger.error(f"❌ Proctor summary tick failed: {e}", exc_info=True)
+
+def _ensure_proctor_summary_ticker():
+    global _proctor_summary_ticker_task
+    if _proctor_summary_ticker_task is None or _proctor_summary_ticker_task.done():
+        _proctor_summary_ticker_task = asyncio.create_task(_proctor_summary_ticker())
+
+def record_assignment_proctor_events(assignment_id, events):
+    """
+    Folds test-session events, logged over HTTP by api/routers/proctoring.py, into the assignment's aggregate.
+    events: (event_type, payload) pairs. Subscribers of assignment_room() get its proctor_summary.
+    """
+    key = assignment_room(assignment_id)
+    for event_type, payload in events:
+        proctor_aggregates.record(key, event_type, payload or {})
+    _ensure_proctor_summary_ticker()
+
+async def _send_proctor_summary(sid, room_id):
+    aggregate = proctor_aggregates.get(room_id)
+    if aggregate is not None:
+        await sio.emit('proctor_summary', {'room_id': room_id, **aggregate.summary()}, room=sid)
+
+async def _reject_proctor_event(sid, data, retry_after):
+    logger.warning(f"⚠️ PROCTOR_EVENT RATE LIMIT: {sid} exceeded {PROCTOR_EVENT_LIMIT.capacity} events per {PROCTOR_EVENT_LIMIT.per_seconds}s")
+    await sio.emit('proctor_event_rejected', {'reason': 'rate_limit_exceeded', 'retry_after': round(retry_after, 2)}, room=sid)
 
 @sio.event
+@sio_event_metrics.instrumented()
+@sio_rate_limited("proctor_event", PROCTOR_EVENT_LIMIT, on_reject=_reject_proctor_event)
 async def proctor_event(sid, data):
     """
     Handle proctoring events (tab switch, face detection, etc.)
-    SECURITY: Only broadcast sanitized metadata (no images/blobs).
-    Validate event type and enforce rate limiting.
+    SECURITY: Only sanitized metadata (no images/blobs) is aggregated and persisted.
+    Validate event type (rate limiting is applied by the decorator, per socket).
     """
     room_id = data.get('room_id')
     event_type = data.get('type')
@@ -422,25 +580,22 @@ async def proctor_event(sid, data):
     if not room_id or not event_type:
         logger.warning(f"⚠️ PROCTOR_EVENT: Missing room_id or event_type from {sid}")
         return
-    
-    # RATE LIMITING: Check if socket exceeded event limit
-    now = asyncio.get_event_loop().time()
-    if sid not in proctor_event_limits:
-        proctor_event_limits[sid] = {'count': 0, 'window_start': now}
-    
-    limit_entry = proctor_event_limits[sid]
-    if now - limit_entry['window_start'] > 10:
-        # Window expired, reset
-        limit_entry['count'] = 0
-        limit_entry['window_start'] = now
-    
-    if limit_entry['count'] >= MAX_PROCTOR_EVENTS_PER_10S:
-        logger.warning(f"⚠️ PROCTOR_EVENT RATE LIMIT: {sid} exceeded {MAX_PROCTOR_EVENTS_PER_10S} events in 10s")
-        await sio.emit('proctor_event_rejected', {'reason': 'rate_limit_exceeded'}, room=sid)
+
+    # Only the room's scheduled candidate, once joined, reports proctoring events for it
+    # (test sessions report over REST, so only interview rooms are accepted here)
+    uid, user_role = await _identity(sid)
+    interview = None
+    if user_role == 'candidate' and _in_interview_room(sid, room_id):
+        try:
+            interview = await room_auth_cache.get(room_id)
+        except Exception as e:
+            logger.error(f"❌ PROCTOR_EVENT DB error for {sid}: {e}", exc_info=True)
+            return
+    if not interview or uid != interview.candidate_id:
+        logger.warning(f"⛔ PROCTOR_EVENT DENIED: sid={sid} user_id={uid} role={user_role} - not the candidate of room {room_id}")
+        await sio.emit('proctor_event_rejected', {'reason': 'unauthorized'}, room=sid)
         return
     
-    limit_entry['count'] += 1
-    
     # VALIDATION: Ensure event_type is known
     from core.proctor_constants import validate_event_type
     if not validate_event_type(event_type):
@@ -467,8 +622,9 @@ async def proctor_event(sid, data):
     # Log the event (only safe_payload, never include images)
     logger.info(f"🚨 PROCTOR_EVENT: room={room_id} type={event_type} payload={safe_payload}")
     
-    # Broadcast ONLY the safe_payload to room (recruiters receive metadata only)
-    await sio.emit('proctor_event', safe_payload, room=room_id, skip_sid=sid)
+    # Fold into the room aggregate; recruiters get a compact proctor_summary on the next tick
+    proctor_aggregates.record(room_id, event_type, safe_payload)
+    _ensure_proctor_summary_ticker()
     
-    # Persist to DB asynchronously (pass data to save_proctor_log, which will strip images again for safety)
-    await asyncio.to_thread(save_proctor_log, room_id, event_type, data)
\ No newline at end of file
+    # Persist via the write-behind buffer (bulk INSERT per batch; strips images again for safety)
+    await proctor_log_buffer.submit(room_id, event_type, data)
\ No newline at end of file
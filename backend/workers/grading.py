@@ -1,27 +1,98 @@
 import asyncio
-import json
+from typing import Optional
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from core.database import SessionLocal
-from models.test_system import Submission, TestAssignment, TestQuestion
+from core.database import WorkerSessionLocal
+from models.test_system import Submission, TestAssignment, TestQuestion, AssignmentQuestionScore
 from services.judge_service import judge_service
-from core.security_utils import decrypt_payload
+from core.security_utils import decrypt_question_payload
 from core.logging import get_logger
+from sio import publish_grading_event
 
 logger = get_logger()
 
-async def grade_submission(submission_id: str):
+def _upsert(db: Session):
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+def record_question_score(db: Session, submission: Submission, score: float):
     """
-    Background task to grade a submission against hidden test cases.
+    Upserts the per-question aggregate and shifts TestAssignment.total_score by the delta.
+    Does NOT commit: callers commit together with the submission so the aggregate never drifts.
+
+    The row is claimed with INSERT ... ON CONFLICT DO UPDATE (a SELECT ... FOR UPDATE locks nothing while
+    the row doesn't exist, so two graders of the same question could both insert). The conflict branch
+    only takes the row lock and RETURNs the score as it is, i.e. the previous score; a fresh row returns
+    its 0 placeholder. A concurrent grader of the same question waits on that lock until we commit.
+    The total is updated with a SQL expression so concurrent graders of the assignment don't lose writes.
+    """
+    table = AssignmentQuestionScore.__table__
+    claim = _upsert(db)(table).values(
+        assignment_id=submission.assignment_id,
+        question_id=submission.question_id,
+        score=0.0
+    )
+    claim = claim.on_conflict_do_update(
+        index_elements=[table.c.assignment_id, table.c.question_id],
+        set_={"submission_id": table.c.submission_id}
+    ).returning(table.c.score)
+    previous = db.execute(claim).scalar_one()
+
+    db.execute(table.update().where(
+        table.c.assignment_id == submission.assignment_id,
+        table.c.question_id == submission.question_id
+    ).values(score=score, submission_id=submission.id))
+
+    delta = score - (previous or 0.0)
+    if delta:
+        db.query(TestAssignment).filter(TestAssignment.id == submission.assignment_id).update(
+            {TestAssignment.total_score: func.coalesce(TestAssignment.total_score, 0.0) + delta},
+            synchronize_session=False
+        )
+
+def _case_progress(submission_id: str, question_id: str, index: int, result: dict, passed_count: int, total: int) -> dict:
+    """Compact per-case payload. Never includes stdin/stdout/expected so hidden tests stay hidden."""
+    return {
+        "submission_id": submission_id,
+        "question_id": question_id,
+        "case": index,
+        "type": result.get("type"),
+        "verdict": result.get("verdict"),
+        "time": result.get("time"),
+        "memory": result.get("memory"),
+        "passed_count": passed_count,
+        "total": total
+    }
+
+async def _publish_error(assignment_id, submission_id: str, question_id: str):
+    await publish_grading_event(assignment_id, "grading_result", {
+        "submission_id": submission_id,
+        "question_id": question_id,
+        "grading_status": "error"
+    })
+
+def _start_grading(submission_id: str) -> Optional[dict]:
+    """
+    Blocking: loads the submission and its question, marks it processing and commits.
+    Returns what the Judge0 phase needs ({"error": True} if the question is unusable), or None if the
+    submission is gone. Run via asyncio.to_thread.
     """
-    db: Session = SessionLocal()
+    db: Session = WorkerSessionLocal()
     try:
         submission = db.query(Submission).filter(Submission.id == submission_id).first()
         if not submission:
             logger.error(f"Submission {submission_id} not found for grading")
-            return
+            return None
 
-        submission.grading_status = "processing"
-        db.commit()
+        job = {
+            "assignment_id": submission.assignment_id,
+            "question_id": str(submission.question_id),
+            "language": submission.language,
+            "code": submission.code,
+        }
 
         # Fetch Question and Hidden Tests
         question = db.query(TestQuestion).filter(TestQuestion.id == submission.question_id).first()
@@ -29,30 +100,112 @@ async def grade_submission(submission_id: str):
             logger.error(f"Question {submission.question_id} not found")
             submission.grading_status = "error"
             db.commit()
-            return
+            return {**job, "error": True}
 
         try:
-            decrypted_hidden = decrypt_payload(question.encrypted_hidden_tests_payload)
-            hidden_data = json.loads(decrypted_hidden.decode())
+            # Served from the in-process payload cache: each question is decrypted once per worker
+            hidden_data = decrypt_question_payload(question.id, question.encrypted_hidden_tests_payload)
             
             # Also decrypt problem payload for sample tests
-            decrypted_problem = decrypt_payload(question.encrypted_problem_payload)
-            problem_data = json.loads(decrypted_problem.decode())
+            problem_data = decrypt_question_payload(question.id, question.encrypted_problem_payload)
         except Exception as e:
             logger.error(f"Failed to decrypt payloads: {e}")
             submission.grading_status = "error"
             db.commit()
+            return {**job, "error": True}
+
+        submission.grading_status = "processing"
+        db.commit()
+        return {**job, "q_type": question.q_type, "hidden_data": hidden_data, "problem_data": problem_data}
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def _finish_grading(submission_id: str, execution_summary: dict, score: float) -> float:
+    """Blocking: persists the verdict and the materialized scores in one transaction. Returns the assignment total."""
+    db: Session = WorkerSessionLocal()
+    try:
+        submission = db.query(Submission).filter(Submission.id == submission_id).first()
+        if not submission:
+            raise LookupError(f"Submission {submission_id} was deleted during grading")
+
+        # Update Submission + materialized scores in one transaction
+        submission.execution_summary = execution_summary
+        submission.score = score
+        # Edited or resubmitted while we graded: leave "draft"/"queued" so the newer code gets graded too
+        if submission.grading_status == "processing":
+            submission.grading_status = "completed"
+        record_question_score(db, submission, score)
+        db.flush()
+        total_score = db.query(TestAssignment.total_score).filter(TestAssignment.id == submission.assignment_id).scalar()
+        db.commit()
+        return total_score or 0.0
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def _mark_error(submission_id: str) -> Optional[dict]:
+    """Blocking: marks the submission errored. Returns its assignment/question for the push, or None if it's gone."""
+    db: Session = WorkerSessionLocal()
+    try:
+        submission = db.query(Submission).filter(Submission.id == submission_id).first()
+        if not submission:
+            return None
+        submission.grading_status = "error"
+        target = {"assignment_id": submission.assignment_id, "question_id": str(submission.question_id)}
+        db.commit()
+        return target
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+async def grade_submission(submission_id: str):
+    """
+    Background task to grade a submission against hidden test cases.
+    Progress is pushed to the assignment's Socket.IO room (see sio.join_assignment):
+    'grading_progress' per test case and 'grading_result' once the verdict is persisted.
+
+    The DB work before and after the Judge0 phase runs in worker threads, on short sessions from the
+    worker pool, so no connection is held while awaiting Judge0. The event loop never blocks on a DB
+    call: a blocked loop would also stall async requests, which can hold locks on the same rows
+    (submissions, the assignment) while they await their own commit.
+    """
+    job = None
+    try:
+        job = await asyncio.to_thread(_start_grading, submission_id)
+        if job is None:
+            return
+
+        assignment_id = job["assignment_id"]
+        question_id = job["question_id"]
+        if job.get("error"):
+            await _publish_error(assignment_id, submission_id, question_id)
             return
 
+        await publish_grading_event(assignment_id, "grading_progress", {
+            "submission_id": submission_id,
+            "question_id": question_id,
+            "grading_status": "processing"
+        })
+
+        language, code = job["language"], job["code"]
+        hidden_data, problem_data = job["hidden_data"], job["problem_data"]
+
         # Grading Logic
         execution_details = []
         passed_count = 0
         total_tests = 0
 
-        if question.q_type == "mcq":
+        if job["q_type"] == "mcq":
             correct_option = hidden_data.get("correct_option", 0)
             try:
-                selected_option = int(submission.code)
+                selected_option = int(code)
                 is_correct = selected_option == correct_option
                 passed_count = 1 if is_correct else 0
                 total_tests = 1
@@ -66,24 +219,25 @@ async def grade_submission(submission_id: str):
             
             # 1. Run Sample Tests (Visible)
             sample_tests = problem_data.get("sample_tests", [])
-            for test in sample_tests:
+            for i, test in enumerate(sample_tests):
                 result = await judge_service.execute_code(
-                    language=submission.language,
-                    code=submission.code,
+                    language=language,
+                    code=code,
                     stdin=test["input"],
                     expected_output=test["output"]
                 )
                 result["type"] = "sample"
                 execution_details.append(result)
+                await publish_grading_event(assignment_id, "grading_progress", _case_progress(submission_id, question_id, i, result, 0, len(sample_tests)))
 
             # 2. Run Hidden Tests (Grading)
             hidden_tests = hidden_data.get("hidden_tests", [])
             total_tests = len(hidden_tests)
             
-            for test in hidden_tests:
+            for i, test in enumerate(hidden_tests):
                 result = await judge_service.execute_code(
-                    language=submission.language,
-                    code=submission.code,
+                    language=language,
+                    code=code,
                     stdin=test["input"],
                     expected_output=test["output"]
                 )
@@ -91,32 +245,33 @@ async def grade_submission(submission_id: str):
                 execution_details.append(result)
                 if result["verdict"] == "passed":
                     passed_count += 1
+                await publish_grading_event(assignment_id, "grading_progress", _case_progress(submission_id, question_id, i, result, passed_count, total_tests))
         
         score = (passed_count / total_tests) * 100 if total_tests > 0 else 0
         
-        # Update Submission
-        submission.execution_summary = {"details": execution_details, "passed_count": passed_count, "total": total_tests}
-        submission.score = score
-        submission.grading_status = "completed"
-        db.commit()
+        total_score = await asyncio.to_thread(
+            _finish_grading, submission_id,
+            {"details": execution_details, "passed_count": passed_count, "total": total_tests}, score
+        )
 
-        # Update Assignment Status (Check if all questions submitted)
-        assignment = db.query(TestAssignment).filter(TestAssignment.id == submission.assignment_id).first()
-        if assignment:
-            all_submissions = db.query(Submission).filter(Submission.assignment_id == assignment.id).all()
-            latest_scores = {}
-            for s in all_submissions:
-                latest_scores[s.question_id] = s.score # Takes latest submission for question
-            
-            # If we have a score for every question, mark as completed? 
-            # Or just leave it to explicit submit? 
-            # The user wants "Final Submit" button. 
-            # So we might not auto-complete assignment here, but we can update scores.
-            pass
+        await publish_grading_event(assignment_id, "grading_result", {
+            "submission_id": submission_id,
+            "question_id": question_id,
+            "grading_status": "completed",
+            "score": score,
+            "passed_count": passed_count,
+            "total": total_tests,
+            "assignment_score": total_score
+        })
 
     except Exception as e:
+        # Whichever phase failed (including _start_grading, before `job` exists), the submission must not
+        # stay queued/processing and the candidate must get the error push
         logger.error(f"Error grading submission {submission_id}: {e}")
-        submission.grading_status = "error"
-        db.commit()
-    finally:
-        db.close()
+        target = job
+        try:
+            target = await asyncio.to_thread(_mark_error, submission_id) or job
+        except Exception as mark_error:
+            logger.error(f"Could not mark submission {submission_id} as errored: {mark_error}")
+        if target is not None:
+            await _publish_error(target["assignment_id"], submission_id, target["question_id"])
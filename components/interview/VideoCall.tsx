@@ -40,6 +40,7 @@ export function VideoCall({ roomId, userId, isInitiator, onLeave, scheduledAt, p
         isScreenSharing,
         socket,
         proctorEvents,
+        proctorSummary,
         sendProctorEvent,
         proctoringEnabled
     } = useWebRTC({
@@ -315,10 +316,13 @@ export function VideoCall({ roomId, userId, isInitiator, onLeave, scheduledAt, p
                 >
                     <div className="p-3 border-b border-white/10 flex items-center justify-between gap-4">
                         <div className="flex items-center gap-2">
-                            <AlertCircle className={cn("w-4 h-4", proctorEvents.length > 0 ? "text-red-500 animate-pulse" : "text-green-500")} />
+                            <AlertCircle className={cn("w-4 h-4", (proctorSummary?.total ?? 0) > 0 ? "text-red-500 animate-pulse" : "text-green-500")} />
                             <span className="text-xs font-semibold text-white/90">
-                                {showLogDetails ? "Activity Log" : `${proctorEvents.length} Events`}
+                                {showLogDetails ? "Activity Log" : `${proctorSummary?.total ?? 0} Events`}
                             </span>
+                            {proctorSummary && (
+                                <span className="text-xs text-white/50">Risk {proctorSummary.risk_score}</span>
+                            )}
                         </div>
                         {showLogDetails && (
                             <Button variant="ghost" size="sm" className="h-6 w-6 p-0 text-white/50 hover:text-white" onClick={(e) => { e.stopPropagation(); setShowLogDetails(false); }}>
@@ -340,8 +344,8 @@ export function VideoCall({ roomId, userId, isInitiator, onLeave, scheduledAt, p
                                         </span>
                                         <span className={cn(
                                             "font-medium",
-                                            event.type === 'tab_switch' || event.type === 'window_blur' || event.type === 'print_screen' || event.type === 'virtual_device' ? "text-red-400" :
-                                                event.type === 'screen_share_denied' ? "text-orange-400" :
+                                            event.severity === 'critical' || event.severity === 'high' ? "text-red-400" :
+                                                event.severity === 'medium' ? "text-orange-400" :
                                                     "text-green-400"
                                         )}>
                                             {event.message || event.type}
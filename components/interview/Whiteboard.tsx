@@ -22,6 +22,13 @@ interface DrawEvent {
     width: number;
 }
 
+// Server-coalesced polyline: points are flat [x0, y0, x1, y1, ...]
+interface Stroke {
+    color: string;
+    width: number;
+    points: number[];
+}
+
 export function Whiteboard({ roomId, socket, onClose, isReadOnly = false }: WhiteboardProps) {
     const canvasRef = useRef<HTMLCanvasElement>(null);
     const [isDrawing, setIsDrawing] = useState(false);
@@ -77,18 +84,22 @@ export function Whiteboard({ roomId, socket, onClose, isReadOnly = false }: Whit
     useEffect(() => {
         if (!socket) return;
 
-        const handleRemoteDraw = (data: any) => {
-            const { prev, curr, color, width } = data;
+        const drawStrokes = (strokes: Stroke[]) => {
             const ctx = canvasRef.current?.getContext('2d');
             if (!ctx) return;
 
-            ctx.beginPath();
-            ctx.strokeStyle = color;
-            ctx.lineWidth = width;
-            ctx.moveTo(prev.x, prev.y);
-            ctx.lineTo(curr.x, curr.y);
-            ctx.stroke();
-            ctx.closePath();
+            for (const { color, width, points } of strokes) {
+                if (points.length < 4) continue;
+                ctx.beginPath();
+                ctx.strokeStyle = color;
+                ctx.lineWidth = width;
+                ctx.moveTo(points[0], points[1]);
+                for (let i = 2; i < points.length; i += 2) {
+                    ctx.lineTo(points[i], points[i + 1]);
+                }
+                ctx.stroke();
+                ctx.closePath();
+            }
         };
 
         const handleRemoteClear = () => {
@@ -100,14 +111,28 @@ export function Whiteboard({ roomId, socket, onClose, isReadOnly = false }: Whit
             }
         };
 
-        socket.on('wb_draw', handleRemoteDraw);
+        // Batched strokes from other participants (one message per server tick)
+        const handleRemoteBatch = (data: { strokes: Stroke[] }) => drawStrokes(data.strokes || []);
+
+        // Full board for late joiners / reconnects
+        const handleSnapshot = (data: { strokes: Stroke[] }) => {
+            handleRemoteClear();
+            drawStrokes(data.strokes || []);
+        };
+
+        socket.on('wb_batch', handleRemoteBatch);
+        socket.on('wb_snapshot', handleSnapshot);
         socket.on('wb_clear', handleRemoteClear);
 
+        // Board may already have content if it was opened mid-interview
+        socket.emit('wb_sync', { room_id: roomId });
+
         return () => {
-            socket.off('wb_draw', handleRemoteDraw);
+            socket.off('wb_batch', handleRemoteBatch);
+            socket.off('wb_snapshot', handleSnapshot);
             socket.off('wb_clear', handleRemoteClear);
         };
-    }, [socket]);
+    }, [socket, roomId]);
 
     const startDrawing = (e: React.MouseEvent<HTMLCanvasElement> | React.TouchEvent<HTMLCanvasElement>) => {
         if (isReadOnly) return;
@@ -1,6 +1,7 @@
 import { useEffect, useRef, useState, useCallback } from 'react';
 import io, { Socket } from 'socket.io-client';
 import SimplePeer, { Instance } from 'simple-peer';
+import { apiClient } from '@/lib/api-client';
 
 interface UseWebRTCProps {
     roomId: string;
@@ -10,6 +11,16 @@ interface UseWebRTCProps {
     enableProctoring?: boolean; // if true, emit proctor_event messages
 }
 
+export interface ProctorSummary {
+    room_id: string;
+    total: number;
+    by_severity: Record<string, number>;
+    by_type: Record<string, number>;
+    last_seen: Record<string, string>;
+    risk_score: number;
+    recent: { type: string; severity: string; message: string | null; timestamp: string }[];
+}
+
 export const useWebRTC = ({ roomId, userId, userRole, isInitiator = false, enableProctoring = false }: UseWebRTCProps) => {
     const [isConnected, setIsConnected] = useState(false);
     const [error, setError] = useState<string | null>(null);
@@ -41,8 +52,9 @@ export const useWebRTC = ({ roomId, userId, userRole, isInitiator = false, enabl
     const appliedAnswerHashRef = useRef<Record<string, string>>({});
     const creatingTargetRef = useRef<Record<string, boolean>>({});
 
-    // Proctoring State
+    // Proctoring State (recruiters receive server-side aggregates, see proctor_summary)
     const [proctorEvents, setProctorEvents] = useState<any[]>([]);
+    const [proctorSummary, setProctorSummary] = useState<ProctorSummary | null>(null);
 
     const setConnectedState = (status: boolean) => {
         setIsConnected(status);
@@ -555,13 +567,24 @@ export const useWebRTC = ({ roomId, userId, userRole, isInitiator = false, enabl
                     transports: ['websocket'], // Skip polling, websocket is faster
                     upgrade: false, // Don't try to upgrade, stay on websocket
                     reconnectionAttempts: 5,
-                    reconnectionDelay: 1000
+                    reconnectionDelay: 1000,
+                    // Server verifies the JWT once at handshake and takes identity from it
+                    auth: (cb) => cb({ token: apiClient.getToken() })
                 });
 
                 socketRef.current.on('connect', () => {
                     console.log('✅ Socket connected');
-                    // Send authenticated user info so backend can authorize join
-                    socketRef.current?.emit('join_room', { room_id: roomId, user_id: userId, user_role: userRole });
+                    socketRef.current?.emit('join_room', { room_id: roomId });
+                });
+
+                // Handshake rejected (missing/expired token): retrying won't help
+                socketRef.current.on('connect_error', (err: Error) => {
+                    if (err.message === 'missing_auth' || err.message === 'invalid_token') {
+                        const friendly = 'Your session has expired. Please sign in again to join the interview.';
+                        setJoinError(friendly);
+                        setError(friendly);
+                        socketRef.current?.disconnect();
+                    }
                 });
 
                 // Handle authorization rejection from server
@@ -638,10 +661,10 @@ export const useWebRTC = ({ roomId, userId, userRole, isInitiator = false, enabl
                     if (isConnectedRef.current) cleanupPeer();
                 });
 
-                // Attach Proctor Event Listener
-                socketRef.current.on('proctor_event', (data: any) => {
-                    console.log('🚨 Proctor Event:', data);
-                    setProctorEvents(prev => [data, ...prev]);
+                // Periodic per-room proctoring aggregate (counts, risk score, recent events)
+                socketRef.current.on('proctor_summary', (summary: ProctorSummary) => {
+                    setProctorSummary(summary);
+                    setProctorEvents(summary.recent || []);
                 });
 
             } catch (err: any) {
@@ -904,6 +927,7 @@ export const useWebRTC = ({ roomId, userId, userRole, isInitiator = false, enabl
         isScreenSharing,
         socket: socketRef.current,
         proctorEvents,
+        proctorSummary,
         createPeer,
         activeParticipants,
         // expose helper and flag
@@ -879,6 +879,17 @@ Use this exact schema:
         }
     }
 
+    async getAssignmentProctorLogs(assignmentId: string, params: { cursor?: string | null; limit?: number; severity?: string; event_type?: string; include_summary?: boolean } = {}) {
+        try {
+            const response = await this.client.get(`/v1/recruiter/assignments/${assignmentId}/proctor-logs`, {
+                params: Object.fromEntries(Object.entries(params).filter(([, v]) => v !== undefined && v !== null && v !== ''))
+            });
+            return response.data;
+        } catch (error) {
+            throw this.handleError(error);
+        }
+    }
+
     async listAssignments() {
         try {
             const response = await this.client.get("/v1/candidate/assignments/");
@@ -933,17 +944,45 @@ Use this exact schema:
         }
     }
 
-    async logProctorEvent(assignmentId: string, eventType: string, payload: any = {}) {
-        try {
-            const response = await this.client.post("/v1/proctoring/log", {
-                event_type: eventType,
-                payload: payload
-            }, {
-                params: { assignment_id: assignmentId }
-            });
-            return response.data;
-        } catch (error) {
-            throw this.handleError(error);
+    // Proctor events fired in the same burst (blur + tab_switch + focus_lost) share one request
+    private static readonly PROCTOR_BATCH_WINDOW_MS = 100;
+    private static readonly PROCTOR_BATCH_MAX_EVENTS = 50;
+    private proctorQueues: Record<string, {
+        events: { event_type: string; payload: any }[];
+        waiters: { resolve: (value: any) => void; reject: (reason: any) => void }[];
+    }> = {};
+
+    logProctorEvent(assignmentId: string, eventType: string, payload: any = {}): Promise<any> {
+        return new Promise((resolve, reject) => {
+            let queue = this.proctorQueues[assignmentId];
+            if (!queue) {
+                queue = this.proctorQueues[assignmentId] = { events: [], waiters: [] };
+                setTimeout(() => this.flushProctorEvents(assignmentId), ApiClient.PROCTOR_BATCH_WINDOW_MS);
+            }
+            queue.events.push({ event_type: eventType, payload });
+            queue.waiters.push({ resolve, reject });
+        });
+    }
+
+    private async flushProctorEvents(assignmentId: string) {
+        const queue = this.proctorQueues[assignmentId];
+        delete this.proctorQueues[assignmentId];
+        if (!queue) return;
+
+        for (let start = 0; start < queue.events.length; start += ApiClient.PROCTOR_BATCH_MAX_EVENTS) {
+            const events = queue.events.slice(start, start + ApiClient.PROCTOR_BATCH_MAX_EVENTS);
+            const waiters = queue.waiters.slice(start, start + ApiClient.PROCTOR_BATCH_MAX_EVENTS);
+            try {
+                const response = await this.client.post("/v1/proctoring/log/batch", { events }, {
+                    params: { assignment_id: assignmentId }
+                });
+                // Each caller gets the final enforcement state plus its own event's severity
+                const { severities, ...state } = response.data;
+                waiters.forEach((w, i) => w.resolve({ ...state, severity: severities?.[i] }));
+            } catch (error) {
+                const handled = this.handleError(error);
+                waiters.forEach(w => w.reject(handled));
+            }
         }
     }
 